@@ -1,12 +1,199 @@
+import json
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import Config
+from utils.latency import LatencyTracker
+from utils.metrics import REGISTRY
+
+HEDGES = REGISTRY.counter("agent_hedges_total", "Backup LLM calls fired after the hedge delay, and how many won", ("agent", "outcome"))
+MODEL_FALLBACKS = REGISTRY.counter("agent_model_fallbacks_total", "LLM replies served by a fallback model", ("agent", "model"))
+
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+def get_hedge_pool():
+    """Returns the process-wide pool that runs hedged LLM calls."""
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=Config.AGENT_HEDGE_POOL_SIZE, thread_name_prefix="hedge")
+        return _hedge_pool
 
 class BaseAgent(ABC):
-    def __init__(self, name, model, role, weight, temperature):
+    def __init__(self, name, model, role, weight, temperature, fallbacks=None):
         self.name = name
         self.model = model
         self.role = role
         self.weight = weight
         self.temperature = temperature
+        # Tried in order when the primary model fails or is hedged: [{"model", "temperature", "base_url"}, ...]
+        self.fallbacks = list(fallbacks or [])
+        self.cache = None # Optional ResponseCache shared by all agents
+        self.latency = LatencyTracker(Config.AGENT_LATENCY_WINDOW) # Primary model call latencies
+        self._llm = None
+        self._llm_created = False
+        self._fallback_llms = {}
+        self._llm_lock = threading.Lock()
+
+    def _create_llm(self, model=None, temperature=None, base_url=None):
+        """
+        Builds an LLM client, or returns None if the agent has none (e.g. missing API key).
+        Without arguments this is the primary model; fallbacks pass their overrides.
+        """
+        return None
+
+    @property
+    def llm(self):
+        """
+        The LLM client, built on first use so importing and constructing agents
+        stays cheap; Orchestrator.warm_up builds it ahead of the first request.
+        """
+        if not self._llm_created:
+            with self._llm_lock:
+                if not self._llm_created:
+                    self._llm = self._create_llm()
+                    self._llm_created = True
+        return self._llm
+
+    def _chain_llm(self, index):
+        """The client at position `index` of [primary] + fallbacks, built on first use."""
+        if index == 0:
+            return self.llm
+        with self._llm_lock:
+            if index not in self._fallback_llms:
+                self._fallback_llms[index] = self._create_llm(**self.fallbacks[index - 1])
+            return self._fallback_llms[index]
+
+    def _chain_model(self, index):
+        return self.model if index == 0 else self.fallbacks[index - 1].get('model', self.model)
+
+    def hedge_delay(self):
+        """
+        Seconds a call may run before a backup is fired: the primary model's
+        AGENT_HEDGE_PERCENTILE latency (at least AGENT_HEDGE_MIN_DELAY). None
+        while hedging is off or too few calls have been observed.
+        """
+        if not Config.AGENT_HEDGE_ENABLED or len(self.latency) < Config.AGENT_HEDGE_MIN_SAMPLES:
+            return None
+        return max(Config.AGENT_HEDGE_MIN_DELAY, self.latency.percentile(Config.AGENT_HEDGE_PERCENTILE))
+
+    def _call_llm(self, index, messages):
+        llm = self._chain_llm(index)
+        if llm is None:
+            raise RuntimeError(f"No client for {self._chain_model(index)}")
+        start = time.perf_counter()
+        response = llm.invoke(messages)
+        if index == 0:
+            # Recorded when the call finishes, even if a hedge already won, so the window sees the real tail
+            self.latency.record(time.perf_counter() - start)
+        return response
+
+    def _invoke(self, messages):
+        """
+        Calls the primary model and moves down the fallback chain on errors.
+        With a hedge delay, a call still running after it gets one backup (the
+        next model in the chain, or the primary again when there is none) and
+        the first successful reply wins. The delay counts from when the call
+        starts running, so time spent queued behind a busy hedge pool never
+        fires a backup. Returns (response, chain index).
+        """
+        chain = 1 + len(self.fallbacks)
+        delay = self.hedge_delay()
+        if delay is None:
+            for index in range(chain):
+                try:
+                    return self._call_llm(index, messages), index
+                except Exception:
+                    if index + 1 == chain:
+                        raise
+
+        started = threading.Event()
+
+        def primary():
+            started.set()
+            return self._call_llm(0, messages)
+
+        pool = get_hedge_pool()
+        pending = {pool.submit(primary): 0}
+        started.wait()
+        next_index = 1
+        backup = None
+        error = None
+        while pending:
+            done, _ = wait(pending, timeout=None if backup else delay, return_when=FIRST_COMPLETED)
+            if not done:
+                index = next_index if next_index < chain else 0
+                next_index += index > 0
+                backup = pool.submit(self._call_llm, index, messages)
+                pending[backup] = index
+                HEDGES.inc(agent=self.name, outcome="fired")
+                continue
+            for future in done:
+                index = pending.pop(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                # The losing call keeps running in the pool; its reply is discarded
+                for other in pending:
+                    other.cancel()
+                if future is backup:
+                    HEDGES.inc(agent=self.name, outcome="won")
+                return future.result(), index
+            if not pending and next_index < chain:
+                pending[pool.submit(self._call_llm, next_index, messages)] = next_index
+                next_index += 1
+        raise error
+
+    def stats(self):
+        """Primary model latency, the current hedge delay and the fallback chain."""
+        delay = self.hedge_delay()
+        return {
+            "latency": self.latency.stats(),
+            "hedge_delay": round(delay, 4) if delay is not None else None,
+            "fallbacks": [self._chain_model(i) for i in range(1, 1 + len(self.fallbacks))]
+        }
+
+    @property
+    def is_active(self):
+        """False when the agent can only return its fixed disabled reply (e.g. no API key)."""
+        return self.llm is not None
+
+    @staticmethod
+    def _to_json(data):
+        """Uses the serialization attached once per debate when present (see context_builder)."""
+        serialized = getattr(data, 'serialized', None)
+        return serialized if serialized is not None else json.dumps(data)
+
+    def _query_llm(self, prompt):
+        """
+        Sends the prompt through the model chain (see _invoke) and parses the JSON reply.
+        Byte-identical prompts are served from the response cache when one is
+        attached; only replies that parse successfully are cached.
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(self.name, self.model, self.temperature, prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+
+        from langchain_core.messages import HumanMessage
+        response, index = self._invoke([HumanMessage(content=prompt)])
+        if index > 0:
+            MODEL_FALLBACKS.inc(agent=self.name, model=self._chain_model(index))
+        # Naive parsing, in production use OutputParsers
+        content = response.content.strip()
+        # Attempt to extract JSON if wrapped in markdown
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0]
+        result = json.loads(content)
+
+        # Only the configured model's replies are cached under its key
+        if key is not None and index == 0:
+            self.cache.set(key, content)
+        return result
 
     @abstractmethod
     def analyze(self, market_data):
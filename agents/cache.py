@@ -0,0 +1,63 @@
+import hashlib
+import threading
+from config import Config
+from utils.ttl_cache import TTLCache
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM responses.
+    Keys are derived from agent, model, temperature and a hash of the prompt, so
+    only byte-identical prompts to the same model configuration share an entry.
+    The in-process tier is always used; when a RedisClient is given it acts as
+    a second, shared tier. It may be given as a callable that returns the
+    client, so nothing connects before the first lookup.
+    """
+    KEY_PREFIX = "llm_cache:"
+
+    def __init__(self, ttl=None, max_entries=None, redis=None):
+        self.ttl = ttl if ttl is not None else Config.LLM_CACHE_TTL
+        self.local = TTLCache(
+            max_entries=max_entries or Config.LLM_CACHE_MAX_ENTRIES,
+            ttl=self.ttl
+        )
+        self._redis = redis
+        self._lock = threading.Lock()
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+    @property
+    def redis(self):
+        if callable(self._redis):
+            self._redis = self._redis()
+        return self._redis
+
+    def make_key(self, agent_name, model, temperature, prompt):
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return f"{self.KEY_PREFIX}{agent_name}:{model}:{temperature}:{digest}"
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None or self.redis is None:
+            return value
+
+        value = self.redis.get_value(key)
+        with self._lock:
+            if value is None:
+                self.redis_misses += 1
+            else:
+                self.redis_hits += 1
+        if value is not None:
+            # Promote to the local tier so the next lookup skips Redis
+            self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.redis is not None:
+            self.redis.set_value(key, value, int(self.ttl))
+
+    def stats(self):
+        stats = {"local": self.local.stats()}
+        if self._redis is not None:
+            stats["redis"] = {"hits": self.redis_hits, "misses": self.redis_misses}
+        return stats
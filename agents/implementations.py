@@ -1,38 +1,38 @@
 import json
-import os
+import numpy as np
 from agents.base import BaseAgent
+from agents.local_model import SIGNALS, create_engine, debate_features, market_features
 from config import Config
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from utils.micro_batch import MicroBatcher
 
 class ChatGPTAgent(BaseAgent):
-    def __init__(self, name, model, role, weight, temperature):
-        super().__init__(name, model, role, weight, temperature)
-        api_key = Config.OPENAI_API_KEY
-        if api_key:
-            self.llm = ChatOpenAI(model=model, temperature=temperature, api_key=api_key)
-        else:
-            self.llm = None
+    def __init__(self, name, model, role, weight, temperature, fallbacks=None):
+        super().__init__(name, model, role, weight, temperature, fallbacks)
+        if not Config.OPENAI_API_KEY:
             print(f"⚠️ {name}: OPENAI_API_KEY not found. Agent disabled.")
 
+    def _create_llm(self, model=None, temperature=None, base_url=None):
+        if not Config.OPENAI_API_KEY:
+            return None
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model or self.model,
+            temperature=self.temperature if temperature is None else temperature,
+            api_key=Config.OPENAI_API_KEY,
+            base_url=base_url
+        )
+
     def analyze(self, market_data):
         if not self.llm:
             return {"signal": "HOLD", "confidence": 0.0, "reasoning": "Agent disabled (Missing API Key)"}
             
         prompt = f"""
         Role: {self.role}
-        Analyze the following market data: {json.dumps(market_data)}
+        Analyze the following market data: {self._to_json(market_data)}
         Provide a trading decision in JSON format with keys: signal (BUY/SELL/HOLD), confidence (0.0-1.0), reasoning.
         """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            # Naive parsing, in production use OutputParsers
-            content = response.content.strip()
-            # Attempt to extract JSON if wrapped in markdown
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            return json.loads(content)
+            return self._query_llm(prompt)
         except Exception as e:
             return {"signal": "HOLD", "confidence": 0.0, "reasoning": f"Error: {str(e)}"}
 
@@ -43,35 +43,33 @@ class ChatGPTAgent(BaseAgent):
         prompt = f"""
         Role: {self.role}
         Context: {context}
-        History: {json.dumps(round_history)}
+        History: {self._to_json(round_history)}
         Critique the opinions and revise your stance if necessary.
         Return JSON: revised_signal, revised_confidence, response.
         """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            return json.loads(content)
+            return self._query_llm(prompt)
         except Exception as e:
             return {"revised_signal": "HOLD", "revised_confidence": 0.0, "response": f"Error: {str(e)}"}
 
 class GrokAgent(BaseAgent):
-    def __init__(self, name, model, role, weight, temperature):
-        super().__init__(name, model, role, weight, temperature)
-        api_key = Config.XAI_API_KEY
-        if api_key:
-            # Assuming xAI compatible with OpenAI client
-            self.llm = ChatOpenAI(
-                model=model, 
-                temperature=temperature, 
-                api_key=api_key,
-                base_url="https://api.x.ai/v1" 
-            )
-        else:
-            self.llm = None
+    def __init__(self, name, model, role, weight, temperature, fallbacks=None):
+        super().__init__(name, model, role, weight, temperature, fallbacks)
+        if not Config.XAI_API_KEY:
             print(f"⚠️ {name}: XAI_API_KEY not found. Agent disabled.")
 
+    def _create_llm(self, model=None, temperature=None, base_url=None):
+        if not Config.XAI_API_KEY:
+            return None
+        from langchain_openai import ChatOpenAI
+        # Assuming xAI compatible with OpenAI client
+        return ChatOpenAI(
+            model=model or self.model,
+            temperature=self.temperature if temperature is None else temperature,
+            api_key=Config.XAI_API_KEY,
+            base_url=base_url or "https://api.x.ai/v1"
+        )
+
     def analyze(self, market_data):
         if not self.llm:
             return {"signal": "HOLD", "confidence": 0.0, "reasoning": "Agent disabled (Missing API Key)"}
@@ -79,15 +77,11 @@ class GrokAgent(BaseAgent):
         # Similar logic to ChatGPT but prompt tailored for Social Sentiment
         prompt = f"""
         Role: {self.role}
-        Focus on social sentiment and hype in this data: {json.dumps(market_data)}
+        Focus on social sentiment and hype in this data: {self._to_json(market_data)}
         Provide JSON: signal, confidence, reasoning.
         """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            return json.loads(content)
+            return self._query_llm(prompt)
         except Exception as e:
             return {"signal": "HOLD", "confidence": 0.0, "reasoning": f"Error: {str(e)}"}
 
@@ -98,44 +92,43 @@ class GrokAgent(BaseAgent):
         prompt = f"""
         Role: {self.role}
         Context: {context}
-        History: {json.dumps(round_history)}
+        History: {self._to_json(round_history)}
         Debate based on social momentum.
         Return JSON: revised_signal, revised_confidence, response.
         """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            return json.loads(content)
+            return self._query_llm(prompt)
         except Exception as e:
             return {"revised_signal": "HOLD", "revised_confidence": 0.0, "response": f"Error: {str(e)}"}
 
 class GeminiAgent(BaseAgent):
-    def __init__(self, name, model, role, weight, temperature):
-        super().__init__(name, model, role, weight, temperature)
-        api_key = Config.GOOGLE_API_KEY
-        if api_key:
-            self.llm = ChatGoogleGenerativeAI(model=model, temperature=temperature, google_api_key=api_key)
-        else:
-            self.llm = None
+    def __init__(self, name, model, role, weight, temperature, fallbacks=None):
+        super().__init__(name, model, role, weight, temperature, fallbacks)
+        if not Config.GOOGLE_API_KEY:
             print(f"⚠️ {name}: GOOGLE_API_KEY not found. Agent disabled.")
 
+    def _create_llm(self, model=None, temperature=None, base_url=None):
+        if not Config.GOOGLE_API_KEY:
+            return None
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        # base_url does not apply to the Google client
+        return ChatGoogleGenerativeAI(
+            model=model or self.model,
+            temperature=self.temperature if temperature is None else temperature,
+            google_api_key=Config.GOOGLE_API_KEY
+        )
+
     def analyze(self, market_data):
         if not self.llm:
             return {"signal": "HOLD", "confidence": 0.0, "reasoning": "Agent disabled (Missing API Key)"}
             
         prompt = f"""
         Role: {self.role}
-        Focus on technical indicators in this data: {json.dumps(market_data)}
+        Focus on technical indicators in this data: {self._to_json(market_data)}
         Provide JSON: signal, confidence, reasoning.
         """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            return json.loads(content)
+            return self._query_llm(prompt)
         except Exception as e:
             return {"signal": "HOLD", "confidence": 0.0, "reasoning": f"Error: {str(e)}"}
 
@@ -146,55 +139,74 @@ class GeminiAgent(BaseAgent):
         prompt = f"""
         Role: {self.role}
         Context: {context}
-        History: {json.dumps(round_history)}
+        History: {self._to_json(round_history)}
         Debate based on technicals.
         Return JSON: revised_signal, revised_confidence, response.
         """
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            content = response.content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            return json.loads(content)
+            return self._query_llm(prompt)
         except Exception as e:
             return {"revised_signal": "HOLD", "revised_confidence": 0.0, "response": f"Error: {str(e)}"}
 
 class MachineAgent(BaseAgent):
-    def __init__(self, name, model, role, weight, temperature):
-        super().__init__(name, model, role, weight, temperature)
-        self.model_path = Config.AGENTS['machine'].get('model_path')
-        self.model_loaded = False
-        
-        if os.path.exists(self.model_path):
-            print(f"✅ {name}: Found fine-tuned model at {self.model_path}. Loading...")
-            # Placeholder for actual model loading (e.g., llama_cpp or transformers)
-            # self.llm = Llama(model_path=self.model_path, ...)
-            self.model_loaded = True
-        else:
-            print(f"⚠️ {name}: Fine-tuned model not found at {self.model_path}.")
-            print("   Please follow 'fine_tuning_guide.md' to train and place the model.")
+    """
+    Risk agent scored locally by an InferenceEngine (agents/local_model.py),
+    without any API calls. Calls from concurrent debates are grouped by a
+    MicroBatcher into one forward pass per batch.
+    """
+    def __init__(self, name, model, role, weight, temperature, fallbacks=None):
+        super().__init__(name, model, role, weight, temperature, fallbacks)
+        conf = Config.AGENTS['machine']
+        self.engine = None
+        try:
+            self.engine = create_engine(conf.get('engine', 'numpy'), conf.get('weights_path'))
+        except Exception as e:
+            print(f"⚠️ {name}: Local inference engine unavailable: {e}")
+        self.model_loaded = self.engine is not None
+        if self.model_loaded:
+            self.analyze_batcher = MicroBatcher(
+                self.engine.analyze_batch, Config.MACHINE_BATCH_MAX, Config.MACHINE_BATCH_WINDOW, name="machine-analyze")
+            self.debate_batcher = MicroBatcher(
+                self.engine.debate_batch, Config.MACHINE_BATCH_MAX, Config.MACHINE_BATCH_WINDOW, name="machine-debate")
+
+    @property
+    def is_active(self):
+        return self.model_loaded
+
+    @staticmethod
+    def _describe(probs):
+        return ", ".join(f"P({signal})={p:.2f}" for signal, p in zip(SIGNALS, probs))
 
     def analyze(self, market_data):
         if not self.model_loaded:
-            return {
-                "signal": "HOLD", 
-                "confidence": 0.0, 
-                "reasoning": "Model not loaded. Please fine-tune Llama 3.1 and save to 'models/machine_finetuned.gguf'."
-            }
-        
-        # Real inference logic would go here
+            return {"signal": "HOLD", "confidence": 0.0, "reasoning": "Local inference engine not loaded."}
+
+        probs = self.analyze_batcher.submit(market_features(market_data))
+        best = int(np.argmax(probs))
         return {
-            "signal": "BUY", # Mock for now until model is present
-            "confidence": 0.9,
-            "reasoning": "Model inference result (Simulated)"
+            "signal": SIGNALS[best],
+            "confidence": round(float(probs[best]), 2),
+            "reasoning": f"Local model ({self.engine.source}): {self._describe(probs)}"
         }
 
     def debate(self, context, round_history):
         if not self.model_loaded:
-            return {"revised_signal": "HOLD", "revised_confidence": 0.0, "response": "Model not loaded."}
-            
+            return {"revised_signal": "HOLD", "revised_confidence": 0.0, "response": "Local inference engine not loaded."}
+
+        probs = self.debate_batcher.submit(debate_features(context, self.name))
+        best = int(np.argmax(probs))
         return {
-            "revised_signal": "BUY",
-            "revised_confidence": 0.95,
-            "response": "Model debate inference result (Simulated)"
+            "revised_signal": SIGNALS[best],
+            "revised_confidence": round(float(probs[best]), 2),
+            "response": f"Local model revision: {self._describe(probs)}"
         }
+
+    def stats(self):
+        stats = super().stats()
+        if self.model_loaded:
+            stats["engine"] = {
+                "source": self.engine.source,
+                "analyze_batches": self.analyze_batcher.stats(),
+                "debate_batches": self.debate_batcher.stats()
+            }
+        return stats
@@ -0,0 +1,153 @@
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+
+SIGNALS = ("BUY", "SELL", "HOLD")
+MARKET_FEATURES = (
+    "change_24h",     # 24h change, in units of 5%
+    "rsi",            # (RSI - 50) / 25
+    "macd_hist",      # MACD histogram as % of price
+    "bb_position",    # Bollinger %B centred on 0 (-1 lower band, +1 upper band)
+    "volatility",     # ATR 14 as % of price
+    "ema_trend",      # EMA 12 over EMA 26, in %
+    "price_vs_ema50"  # Price over EMA 50, in %
+)
+# Debate inputs: own opinion then the peers' confidence-weighted vote, one column per signal
+DEBATE_FEATURES = tuple(f"own_{s.lower()}" for s in SIGNALS) + tuple(f"peer_{s.lower()}" for s in SIGNALS)
+
+ANALYZE_COLUMNS = 1 + len(MARKET_FEATURES)
+WEIGHTS_SHAPE = (len(SIGNALS), ANALYZE_COLUMNS + 1 + len(DEBATE_FEATURES))
+
+# Rows BUY/SELL/HOLD. Analyze head: bias then MARKET_FEATURES (momentum with an
+# overbought/oversold brake; volatility favours HOLD). Debate head: bias, then
+# the agent's own opinion weighted twice as much as its peers'.
+DEFAULT_WEIGHTS = np.array([
+    [0.0, 0.6, -0.8, 0.8, -0.6, -0.2, 0.7, 0.4,    0.0, 2.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+    [0.0, -0.6, 0.8, -0.8, 0.6, -0.2, -0.7, -0.4,  0.0, 0.0, 2.0, 0.0, 0.0, 1.0, 0.0],
+    [0.3, 0.0, 0.0, 0.0, 0.0, 0.4, 0.0, 0.0,       0.2, 0.0, 0.0, 2.0, 0.0, 0.0, 1.0]
+], dtype=np.float32)
+
+# Matches the "Name: SIGNAL (Conf: x)" lines of the debate context summary
+OPINION_LINE = re.compile(r"^(.+?): (BUY|SELL|HOLD) \(Conf: ([0-9.]+)\)", re.MULTILINE)
+
+def market_features(market_data):
+    """MARKET_FEATURES for one quote; indicators that are missing count as neutral (0)."""
+    price = float(market_data.get('price') or 0.0)
+    indicators = market_data.get('indicators') or {}
+    rsi = market_data.get('rsi', indicators.get('rsi_14'))
+
+    def pct(value, base):
+        return (float(value) / base - 1.0) * 100 if value is not None and base else 0.0
+
+    features = [
+        float(market_data.get('change_24h') or 0.0) / 5.0,
+        (float(rsi) - 50.0) / 25.0 if rsi is not None else 0.0,
+        float(indicators.get('macd_hist', 0.0)) / price * 100 if price else 0.0,
+        (float(indicators['bb_percent_b']) - 0.5) * 2 if 'bb_percent_b' in indicators else 0.0,
+        float(indicators.get('atr_14', 0.0)) / price * 100 if price else 0.0,
+        pct(indicators.get('ema_12'), indicators.get('ema_26')),
+        pct(price, indicators.get('ema_50')) if 'ema_50' in indicators else 0.0
+    ]
+    return np.array(features, dtype=np.float32)
+
+def debate_features(context, agent_name):
+    """
+    DEBATE_FEATURES from the opinion summary in the debate context: the
+    agent's own signal one-hot scaled by its confidence, and the share of the
+    peers' total confidence behind each signal.
+    """
+    own = np.zeros(len(SIGNALS), dtype=np.float32)
+    peers = np.zeros(len(SIGNALS), dtype=np.float32)
+    for name, signal, confidence in OPINION_LINE.findall(context):
+        target = own if name.strip() == agent_name else peers
+        target[SIGNALS.index(signal)] += float(confidence)
+    if peers.sum() > 0:
+        peers /= peers.sum()
+    return np.concatenate([own, peers])
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+_weights = {}
+_weights_lock = threading.Lock()
+
+def load_weights(path):
+    """
+    Memory-maps a weights file once per process. Every worker maps the same
+    file, so the OS keeps a single copy of it in the page cache.
+    """
+    with _weights_lock:
+        weights = _weights.get(path)
+        if weights is None:
+            weights = np.load(path, mmap_mode='r')
+            if weights.shape != WEIGHTS_SHAPE:
+                raise ValueError(f"{path} has shape {weights.shape}, expected {WEIGHTS_SHAPE}")
+            _weights[path] = weights
+        return weights
+
+def save_weights(path, weights=None):
+    """Writes weights (default: DEFAULT_WEIGHTS) in the .npy layout load_weights expects."""
+    weights = np.asarray(DEFAULT_WEIGHTS if weights is None else weights, dtype=np.float32)
+    if weights.shape != WEIGHTS_SHAPE:
+        raise ValueError(f"Weights must have shape {WEIGHTS_SHAPE}")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.save(path, weights)
+
+class InferenceEngine(ABC):
+    """Batched local scoring behind MachineAgent. Both methods return (n, 3) BUY/SELL/HOLD probabilities."""
+    @abstractmethod
+    def analyze_batch(self, features):
+        """features: (n, len(MARKET_FEATURES))"""
+        pass
+
+    @abstractmethod
+    def debate_batch(self, features):
+        """features: (n, len(DEBATE_FEATURES))"""
+        pass
+
+class NumpyEngine(InferenceEngine):
+    """
+    Two softmax-regression heads in one float32 matrix of shape WEIGHTS_SHAPE:
+    columns [bias, MARKET_FEATURES...] score the initial analysis and
+    [bias, DEBATE_FEATURES...] score debate revisions. Reads `weights_path`
+    memory-mapped when it exists, otherwise uses DEFAULT_WEIGHTS.
+    """
+    def __init__(self, weights_path=None):
+        if weights_path and os.path.exists(weights_path):
+            self.weights = load_weights(weights_path)
+            self.source = weights_path
+        else:
+            self.weights = DEFAULT_WEIGHTS
+            self.source = "default"
+        self._analyze = self.weights[:, :ANALYZE_COLUMNS]
+        self._debate = self.weights[:, ANALYZE_COLUMNS:]
+
+    @staticmethod
+    def _score(head, features):
+        features = np.asarray(features, dtype=np.float32)
+        return _softmax(head[:, 0] + features @ head[:, 1:].T)
+
+    def analyze_batch(self, features):
+        return self._score(self._analyze, features)
+
+    def debate_batch(self, features):
+        return self._score(self._debate, features)
+
+ENGINES = {
+    'numpy': NumpyEngine
+}
+
+def create_engine(name, weights_path=None):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown inference engine: {name}")
+    return ENGINES[name](weights_path)
+
+if __name__ == '__main__':
+    # python -m agents.local_model PATH - writes the default weights to PATH
+    import sys
+    save_weights(sys.argv[1])
+    print(f"Wrote {WEIGHTS_SHAPE} weights to {sys.argv[1]}")
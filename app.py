@@ -1,14 +1,99 @@
-from flask import Flask, jsonify, request
+import json
+import math
+import threading
+import time
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from orchestrator import Orchestrator
+from scheduler import DebateScheduler
+from jobs import JobQueue, JobStore, QueueFullError, PRIORITIES, webhook_url_error
 from config import Config
+from utils.metrics import REGISTRY
 
 app = Flask(__name__)
 app.config.from_object(Config)
+
+HTTP_SECONDS = REGISTRY.histogram("http_request_seconds", "HTTP request latency", ("endpoint", "status"))
 orchestrator = Orchestrator()
+scheduler = DebateScheduler(orchestrator)
+jobs = JobQueue(orchestrator, store=JobStore(
+    redis=(lambda: orchestrator.rag_engine.redis) if Config.JOB_STORE_REDIS else None
+))
+
+if Config.WARM_UP == 'blocking':
+    orchestrator.warm_up()
+elif Config.WARM_UP == 'background':
+    # Serve /status right away; readiness flips once clients and the index are loaded
+    threading.Thread(target=orchestrator.warm_up, name="warm-up", daemon=True).start()
+
+def _normalize_ticker(ticker):
+    """Returns the upper-cased ticker, or None if it fails the basic format check."""
+    if not isinstance(ticker, str):
+        return None
+    ticker = ticker.strip().upper()
+    if not ticker or len(ticker) > 20:
+        return None
+    return ticker
+
+def _without_timings(result, data):
+    """Drops the per-stage timing breakdown unless the client asked for it."""
+    if data.get('timings') or request.args.get('timings') in ('1', 'true'):
+        return result
+    return {k: v for k, v in result.items() if k != 'timings'}
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_latency(response):
+    # Streams are timed until headers are sent; the debate itself shows up in debate_stage_seconds
+    if request.url_rule is not None and 'request_start' in g:
+        HTTP_SECONDS.observe(time.perf_counter() - g.request_start,
+                             endpoint=request.url_rule.rule, status=response.status_code)
+    return response
+
+def _parse_max_age(data):
+    """Returns (max_age, error) for the optional freshness window in seconds."""
+    max_age = data.get('max_age')
+    if max_age is None:
+        return None, None
+    if isinstance(max_age, bool) or not isinstance(max_age, (int, float)) or max_age < 0:
+        return None, "max_age must be a non-negative number of seconds"
+    return max_age, None
 
 @app.route('/status', methods=['GET'])
 def status():
-    return jsonify({"status": "online", "system": "Multi-Agent Trading Consensus"})
+    response = {
+        "status": "online",
+        "system": "Multi-Agent Trading Consensus",
+        "ready": orchestrator.ready,
+        "warm_up": {
+            "seconds": orchestrator.warm_up_seconds,
+            "error": orchestrator.warm_up_error,
+            "loaded": orchestrator.rag_engine.loaded()
+        }
+    }
+    if orchestrator.response_cache is not None:
+        response["llm_cache"] = orchestrator.response_cache.stats()
+    if orchestrator.rag_engine.loaded()["redis"]:
+        response["redis"] = orchestrator.rag_engine.redis.stats()
+    response["agents"] = {agent.name: agent.stats() for agent in orchestrator.agents}
+    response["jobs"] = jobs.stats()
+    response["data_feed"] = orchestrator.data_feed.stats()
+    response["single_flight"] = orchestrator.in_flight.stats()
+    return jsonify(response)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of debate, agent, Redis, vector store and HTTP metrics."""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 503 until warm-up has finished."""
+    if orchestrator.ready:
+        return jsonify({"ready": True})
+    return jsonify({"ready": False, "error": orchestrator.warm_up_error}), 503
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
@@ -22,11 +107,15 @@ def analyze():
             return jsonify({"error": "Ticker is required"}), 400
 
         # Validate ticker format (basic check)
-        ticker = ticker.strip().upper()
-        if not ticker or len(ticker) > 20:
+        ticker = _normalize_ticker(ticker)
+        if not ticker:
             return jsonify({"error": "Invalid ticker format"}), 400
 
-        result = orchestrator.run_debate(ticker)
+        max_age, error = _parse_max_age(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        result = orchestrator.run_debate(ticker, max_age=max_age)
 
         # Check if orchestrator returned an error
         if "error" in result:
@@ -42,7 +131,7 @@ def analyze():
             "status": "success",
             "consensus": result.get('decision', 'UNKNOWN'),
             "confidence": result.get('confidence', 0.0),
-            "details": result
+            "details": _without_timings(result, data)
         })
 
     except Exception as e:
@@ -52,5 +141,217 @@ def analyze():
             "error": str(e)
         }), 500
 
+@app.route('/analyze/stream', methods=['GET', 'POST'])
+def analyze_stream():
+    """
+    Streams debate progress as server-sent events: one `opinion` event per agent
+    per round, a `consensus` event after each round, then `complete` or `error`.
+    Every payload carries `elapsed` seconds since the request started.
+    GET takes ?ticker=, so the endpoint works with a browser EventSource.
+    """
+    data = request.get_json(silent=True) or {}
+    ticker = request.args.get('ticker') or data.get('ticker')
+    if not ticker:
+        return jsonify({"error": "Ticker is required"}), 400
+
+    ticker = _normalize_ticker(ticker)
+    if not ticker:
+        return jsonify({"error": "Invalid ticker format"}), 400
+
+    def events():
+        started = time.monotonic()
+        for event, payload in orchestrator.stream_debate(ticker):
+            if event == "complete":
+                payload = {
+                    "status": "success",
+                    "consensus": payload.get('decision', 'UNKNOWN'),
+                    "confidence": payload.get('confidence', 0.0),
+                    "details": payload
+                }
+            elif event == "error":
+                payload = {
+                    "status": "error",
+                    "error": payload.get("error"),
+                    "details": payload.get("details", "Unknown error")
+                }
+            payload = {**payload, "ticker": ticker, "elapsed": round(time.monotonic() - started, 3)}
+            yield f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    try:
+        data = request.json
+        if not data:
+            return jsonify({"error": "Invalid JSON payload"}), 400
+
+        tickers = data.get('tickers')
+        if not tickers or not isinstance(tickers, list):
+            return jsonify({"error": "Tickers must be a non-empty list"}), 400
+        if len(tickers) > Config.BATCH_MAX_TICKERS:
+            return jsonify({"error": f"At most {Config.BATCH_MAX_TICKERS} tickers per batch"}), 400
+
+        normalized = []
+        for raw in tickers:
+            ticker = _normalize_ticker(raw)
+            if not ticker:
+                return jsonify({"error": f"Invalid ticker format: {raw}"}), 400
+            if ticker not in normalized:
+                normalized.append(ticker)
+
+        timeout = data.get('timeout', Config.BATCH_TIMEOUT)
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            return jsonify({"error": "Timeout must be a positive number of seconds"}), 400
+        timeout = min(timeout, Config.BATCH_TIMEOUT)
+
+        max_age, error = _parse_max_age(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        results = {}
+        for ticker, result in scheduler.run_batch(normalized, timeout=timeout, max_age=max_age).items():
+            if "error" in result:
+                results[ticker] = {
+                    "status": "timeout" if result["error"] == "timeout" else "error",
+                    "error": result.get("error"),
+                    "details": result.get("details", "Unknown error")
+                }
+            else:
+                results[ticker] = {
+                    "status": "success",
+                    "consensus": result.get('decision', 'UNKNOWN'),
+                    "confidence": result.get('confidence', 0.0),
+                    "details": _without_timings(result, data)
+                }
+
+        completed = sum(1 for r in results.values() if r["status"] == "success")
+        return jsonify({
+            "message": f"Batch analysis completed for {completed}/{len(results)} tickers",
+            "status": "success" if completed == len(results) else "partial",
+            "results": results
+        })
+
+    except Exception as e:
+        return jsonify({
+            "message": "Internal server error",
+            "status": "error",
+            "error": str(e)
+        }), 500
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    try:
+        data = request.json
+        if not data:
+            return jsonify({"error": "Invalid JSON payload"}), 400
+
+        ticker = _normalize_ticker(data.get('ticker'))
+        if not ticker:
+            return jsonify({"error": "A valid ticker is required"}), 400
+
+        priority = data.get('priority', 'normal')
+        if priority not in PRIORITIES:
+            return jsonify({"error": f"Priority must be one of {list(PRIORITIES)}"}), 400
+
+        webhook_url = data.get('webhook_url')
+        if webhook_url is not None:
+            error = webhook_url_error(webhook_url)
+            if error:
+                return jsonify({"error": error}), 400
+
+        max_age, error = _parse_max_age(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        try:
+            job = jobs.submit(ticker, priority=priority, webhook_url=webhook_url, max_age=max_age)
+        except QueueFullError as e:
+            response = jsonify({"status": "error", "error": str(e)})
+            response.headers["Retry-After"] = "5"
+            return response, 429
+
+        return jsonify({
+            "message": f"Analysis queued for {ticker}",
+            "status": job["status"],
+            "job_id": job["job_id"]
+        }), 202
+
+    except Exception as e:
+        return jsonify({
+            "message": "Internal server error",
+            "status": "error",
+            "error": str(e)
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(job)
+
+def _parse_history_args(args):
+    """Returns (filters, error) for the /history query string."""
+    filters = {}
+    if args.get('ticker') is not None:
+        filters['ticker'] = _normalize_ticker(args['ticker'])
+        if not filters['ticker']:
+            return None, "Invalid ticker"
+    if args.get('decision') is not None:
+        filters['decision'] = args['decision'].strip().upper()
+        if filters['decision'] not in ("BUY", "SELL", "HOLD"):
+            return None, "decision must be BUY, SELL or HOLD"
+    for name in ('since', 'until'):
+        if args.get(name) is not None:
+            try:
+                filters[name] = float(args[name])
+            except ValueError:
+                filters[name] = math.nan
+            if not math.isfinite(filters[name]):
+                return None, f"{name} must be epoch seconds"
+    try:
+        filters['limit'] = int(args.get('limit', 50))
+    except ValueError:
+        return None, "limit must be an integer"
+    if not 1 <= filters['limit'] <= Config.ARCHIVE_PAGE_MAX:
+        return None, f"limit must be between 1 and {Config.ARCHIVE_PAGE_MAX}"
+    if args.get('cursor'):
+        filters['cursor'] = args['cursor']
+    filters['full'] = args.get('full') in ('1', 'true')
+    return filters, None
+
+@app.route('/history', methods=['GET'])
+def history():
+    """
+    Archived debates, newest first. Filters: ticker, decision, since/until
+    (epoch seconds); `limit` per page, `full=1` for the complete discussion
+    logs. Pass `next_cursor` back as `cursor` for the next page.
+    """
+    if not Config.ARCHIVE_ENABLED:
+        return jsonify({"error": "The debate archive is disabled"}), 404
+    filters, error = _parse_history_args(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        records, next_cursor = orchestrator.rag_engine.archive.query(**filters)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    return jsonify({"debates": records, "next_cursor": next_cursor})
+
+@app.route('/history/<int:archive_id>', methods=['GET'])
+def history_entry(archive_id):
+    if not Config.ARCHIVE_ENABLED:
+        return jsonify({"error": "The debate archive is disabled"}), 404
+    record = orchestrator.rag_engine.archive.get(archive_id)
+    if record is None:
+        return jsonify({"error": "Unknown debate"}), 404
+    return jsonify(record)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
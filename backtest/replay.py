@@ -0,0 +1,204 @@
+import itertools
+import json
+import numpy as np
+from config import Config
+
+# Same order as Orchestrator._calculate_consensus, so argmax ties break the same way
+SIGNALS = ("BUY", "SELL", "HOLD")
+SIGNAL_INDEX = {s: i for i, s in enumerate(SIGNALS)}
+
+def _opinion_sets(log):
+    """
+    Splits a discussion_log into its opinion sets: the initial round followed by
+    each debate round. Logs written before history entries carried a round
+    number are split wherever an agent repeats.
+    """
+    sets = []
+    if log.get('initial_opinions'):
+        sets.append(log['initial_opinions'])
+
+    rounds = {}
+    current, seen = [], set()
+    for entry in log.get('history', []):
+        if 'round' in entry:
+            rounds.setdefault(entry['round'], []).append(entry)
+            continue
+        if entry['agent'] in seen:
+            sets.append(current)
+            current, seen = [], set()
+        current.append(entry)
+        seen.add(entry['agent'])
+    if current:
+        sets.append(current)
+    sets.extend(rounds[r] for r in sorted(rounds))
+    return sets
+
+class ReplayEngine:
+    """
+    Re-evaluates the consensus rule over archived debate logs without calling any LLM.
+    Logs are packed into arrays of shape (logs, opinion sets, agents): signals
+    (-1 where an agent is missing) and confidences. `evaluate` then scores many
+    weight vectors and CONSENSUS_THRESHOLD / MAX_DEBATE_ROUNDS settings at once.
+    Scores are summed in float64 agent by agent, as _calculate_consensus does,
+    so with agents in the debate's order a threshold right at a confidence
+    splits the same way it did live.
+
+    A replay can only use the rounds that were actually debated. If a setting
+    would have kept debating past the last recorded round, the final recorded
+    round is used and the result is flagged as truncated.
+    """
+    def __init__(self, logs, agent_names=None):
+        logs = [log for log in logs if 'error' not in log]
+        names = list(agent_names or [conf['name'] for conf in Config.AGENTS.values()])
+        for log in logs:
+            for opinion_set in _opinion_sets(log):
+                for entry in opinion_set:
+                    if entry['agent'] not in names:
+                        names.append(entry['agent'])
+        self.agents = names
+        agent_index = {name: i for i, name in enumerate(names)}
+
+        all_sets = [_opinion_sets(log) for log in logs]
+        n_logs = len(logs)
+        n_sets = max((len(s) for s in all_sets), default=1)
+        self.tickers = [log.get('ticker') for log in logs]
+        self.recorded_decisions = np.array([SIGNAL_INDEX.get(log.get('decision'), -1) for log in logs], dtype=np.int8)
+        self.set_counts = np.array([len(s) for s in all_sets], dtype=np.int32)
+        self.signals = np.full((n_logs, n_sets, len(names)), -1, dtype=np.int8)
+        self.confidences = np.zeros((n_logs, n_sets, len(names)), dtype=np.float64)
+        self.recorded_weights = np.zeros(len(names), dtype=np.float64)
+
+        for n, sets in enumerate(all_sets):
+            for r, opinion_set in enumerate(sets):
+                for entry in opinion_set:
+                    a = agent_index[entry['agent']]
+                    signal = SIGNAL_INDEX.get(str(entry['opinion'].get('signal', '')).upper())
+                    if signal is None:
+                        continue
+                    self.signals[n, r, a] = signal
+                    self.confidences[n, r, a] = float(entry['opinion'].get('confidence', 0.0) or 0.0)
+                    self.recorded_weights[a] = entry.get('weight', self.recorded_weights[a])
+            # Agents keep their last opinion in rounds they did not record
+            for r in range(1, len(sets)):
+                missing = self.signals[n, r] < 0
+                self.signals[n, r, missing] = self.signals[n, r - 1, missing]
+                self.confidences[n, r, missing] = self.confidences[n, r - 1, missing]
+
+        # Weighted one-hot votes: (logs, sets, agents, signals)
+        present = self.signals >= 0
+        self._votes = np.zeros(self.signals.shape + (len(SIGNALS),), dtype=np.float64)
+        np.put_along_axis(
+            self._votes,
+            np.maximum(self.signals, 0)[..., None].astype(np.int64),
+            (self.confidences * present)[..., None],
+            axis=-1
+        )
+        self._present = present.astype(np.float64)
+
+    @classmethod
+    def from_jsonl(cls, path, agent_names=None):
+        """Loads one discussion_log per line."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls((json.loads(line) for line in f if line.strip()), agent_names)
+
+    @classmethod
+    def from_archive(cls, archive=None, agent_names=None, **filters):
+        """
+        Loads logs streamed from a DebateArchive (default: ARCHIVE_PATH), optionally
+        filtered by ticker, decision, since and until.
+        """
+        from memory.debate_archive import DebateArchive
+        archive = archive if archive is not None else DebateArchive()
+        return cls(archive.iter_logs(**filters), agent_names)
+
+    def evaluate(self, weights=None, thresholds=None, max_rounds=None, chunk_size=None):
+        """
+        Replays every log under M configurations.
+        Args:
+            weights: (M, agents) weight vectors; defaults to the recorded weights.
+            thresholds: scalar or (M,) consensus thresholds; defaults to Config.
+            max_rounds: scalar or (M,) debate round limits; defaults to Config.
+        Returns:
+            dict of (M, logs) arrays: decision (index into SIGNALS), confidence,
+            rounds (as run_debate reports them) and truncated.
+        """
+        weights = np.atleast_2d(np.asarray(self.recorded_weights if weights is None else weights, dtype=np.float64))
+        m = len(weights)
+        thresholds = np.broadcast_to(np.asarray(
+            Config.CONSENSUS_THRESHOLD if thresholds is None else thresholds, dtype=np.float64), (m,))
+        max_rounds = np.broadcast_to(np.asarray(
+            Config.MAX_DEBATE_ROUNDS if max_rounds is None else max_rounds, dtype=np.int32), (m,))
+
+        n_logs, n_sets = self.signals.shape[:2]
+        if chunk_size is None:
+            # Keep the (chunk, logs, sets, signals) score tensor around 64 MB
+            chunk_size = max(1, int(8e6 // max(1, n_logs * n_sets * len(SIGNALS))))
+
+        out = {
+            "decision": np.empty((m, n_logs), dtype=np.int8),
+            "confidence": np.empty((m, n_logs), dtype=np.float64),
+            "rounds": np.empty((m, n_logs), dtype=np.int32),
+            "truncated": np.empty((m, n_logs), dtype=bool)
+        }
+        set_index = np.arange(n_sets)
+        last_recorded = self.set_counts - 1
+        for start in range(0, m, chunk_size):
+            w = weights[start:start + chunk_size]
+            thr = thresholds[start:start + chunk_size]
+            mr = max_rounds[start:start + chunk_size]
+
+            # Agent by agent, in the order and precision of _calculate_consensus's sums
+            scores = np.zeros((len(w), n_logs, n_sets, len(SIGNALS)))
+            total = np.zeros((len(w), n_logs, n_sets))
+            for a in range(len(self.agents)):
+                scores += self._votes[None, :, :, a, :] * w[:, a, None, None, None]
+                total += self._present[None, :, :, a] * w[:, a, None, None]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = np.where(total[..., None] > 0, scores / total[..., None], 0.0)
+            decision = scores.argmax(axis=-1)
+            confidence = scores.max(axis=-1)
+
+            # run_debate checks consensus before rounds 1..max_rounds and stops at the first hit
+            cap = np.minimum(mr[:, None], last_recorded[None, :])
+            eligible = (set_index[None, None, :] < mr[:, None, None]) & (set_index[None, None, :] <= cap[..., None])
+            hit = (confidence >= thr[:, None, None]) & eligible
+            any_hit = hit.any(axis=-1)
+            final = np.where(any_hit, hit.argmax(axis=-1), cap)
+
+            rows = np.arange(len(w))[:, None]
+            cols = np.arange(n_logs)[None, :]
+            out["decision"][start:start + len(w)] = decision[rows, cols, final]
+            out["confidence"][start:start + len(w)] = confidence[rows, cols, final]
+            out["rounds"][start:start + len(w)] = np.where(any_hit, final + 1, mr[:, None])
+            out["truncated"][start:start + len(w)] = ~any_hit & (mr[:, None] > last_recorded[None, :])
+        return out
+
+    def accuracy(self, result, labels):
+        """Fraction of logs per configuration whose replayed decision matches `labels` (signal names or indices)."""
+        labels = np.array([SIGNAL_INDEX.get(l, -1) if isinstance(l, str) else l for l in labels])
+        valid = labels >= 0
+        return (result["decision"][:, valid] == labels[None, valid]).mean(axis=1)
+
+    def agreement(self, result):
+        """Fraction of logs per configuration that reproduce the recorded decision."""
+        return (result["decision"] == self.recorded_decisions[None, :]).mean(axis=1)
+
+def weight_grid(values, n_agents):
+    """All combinations of `values` for each agent: (len(values) ** n_agents, n_agents)."""
+    return np.array(list(itertools.product(values, repeat=n_agents)), dtype=np.float32)
+
+if __name__ == '__main__':
+    # python -m backtest.replay logs.jsonl | python -m backtest.replay archive.db
+    import sys
+    if sys.argv[1].endswith('.db'):
+        from memory.debate_archive import DebateArchive
+        engine = ReplayEngine.from_archive(DebateArchive(sys.argv[1]))
+    else:
+        engine = ReplayEngine.from_jsonl(sys.argv[1])
+    grid = weight_grid([0.5, 1.0, 1.5], len(engine.agents))
+    result = engine.evaluate(grid)
+    agreement = engine.agreement(result)
+    print(f"{len(engine.tickers)} logs, {len(grid)} weight vectors, agents: {engine.agents}")
+    for i in np.argsort(-agreement)[:5]:
+        print(f"weights={grid[i].tolist()} agreement={agreement[i]:.3f} "
+              f"mean_rounds={result['rounds'][i].mean():.2f} truncated={result['truncated'][i].mean():.3f}")
@@ -0,0 +1,84 @@
+"""
+Measures worker boot time in fresh interpreters.
+
+    python benchmarks/import_time.py [--runs N] [--json]
+
+For each run a new Python process imports `app` with warm-up disabled (what a
+worker pays before it can accept requests), then runs Orchestrator.warm_up
+(what it pays before it reports ready). The slowest modules from
+`python -X importtime` (at any depth, including those loaded lazily during
+warm-up) are listed for the last run.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+start = time.perf_counter()
+app.orchestrator.warm_up()
+print("RESULT " + json.dumps({"import": imported, "warm_up": time.perf_counter() - start}))
+"""
+
+def run_once():
+    env = {**os.environ, "WARM_UP": "off", "PYTHONPATH": ROOT}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    result = next(json.loads(line[len("RESULT "):]) for line in proc.stdout.splitlines() if line.startswith("RESULT "))
+    return result, proc.stderr
+
+def slowest_modules(importtime_log, top=10):
+    """Parses -X importtime output into [(module, cumulative seconds)], slowest first."""
+    modules = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cumulative.isdigit():
+            modules.append((name, int(cumulative) / 1e6))
+    return sorted(modules, key=lambda m: -m[1])[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results, log = [], ""
+    for _ in range(args.runs):
+        result, log = run_once()
+        results.append(result)
+
+    summary = {
+        phase: {
+            "median": statistics.median(r[phase] for r in results),
+            "min": min(r[phase] for r in results),
+            "max": max(r[phase] for r in results)
+        }
+        for phase in ("import", "warm_up")
+    }
+    summary["runs"] = args.runs
+    summary["slowest_modules"] = slowest_modules(log)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    for phase in ("import", "warm_up"):
+        s = summary[phase]
+        print(f"{phase:8s} median {s['median'] * 1000:8.1f} ms   min {s['min'] * 1000:8.1f} ms   max {s['max'] * 1000:8.1f} ms")
+    print("\nSlowest imports (cumulative):")
+    for name, seconds in summary["slowest_modules"]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+if __name__ == '__main__':
+    main()
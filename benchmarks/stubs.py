@@ -0,0 +1,213 @@
+"""
+Offline stand-ins used by the benchmark suite: agents with configurable
+latency, failures and signal behaviour, and an in-memory Redis. Nothing here
+touches the network.
+"""
+import random
+import re
+import threading
+import time
+from collections import Counter
+from agents.base import BaseAgent
+
+SIGNALS = ("BUY", "SELL", "HOLD")
+# Matches the "Name: SIGNAL (Conf: x)" lines of the debate context summary
+OPINION_LINE = re.compile(r"^(.+?): (BUY|SELL|HOLD) \(Conf: ([0-9.]+)\)", re.MULTILINE)
+
+def parse_latency(spec):
+    """
+    Parses a latency distribution, in seconds:
+        "constant:0.05"          always 50 ms
+        "uniform:0.01:0.2"       uniform between 10 and 200 ms
+        "exponential:0.05"       mean 50 ms
+        "lognormal:0.05:0.5"     median 50 ms, sigma 0.5 (a long tail, like real LLM APIs)
+    Returns a function rng -> seconds.
+    """
+    kind, *params = spec.split(":")
+    params = [float(p) for p in params]
+    if kind == "constant" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "exponential" and len(params) == 1:
+        return lambda rng: rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+    if kind == "lognormal" and len(params) == 2:
+        return lambda rng: params[0] * rng.lognormvariate(0.0, params[1])
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+class StubAgent(BaseAgent):
+    """
+    Agent that answers without an LLM.
+    Each call sleeps for a latency drawn from `latency` and raises with
+    probability `failure_rate`, so the orchestrator's fallback and timeout
+    paths run as they do in production. Initial signals are drawn from
+    `signal_bias` ({signal: probability}); in debate rounds the agent adopts
+    the other agents' majority signal with probability `convergence` and
+    grows more confident each round. Seeded, so runs are repeatable.
+    """
+    def __init__(self, name, weight=1.0, role="Benchmark", latency="lognormal:0.02:0.5",
+                 failure_rate=0.0, signal_bias=None, convergence=0.6, seed=0):
+        super().__init__(name, "stub", role, weight, 0.0)
+        # Not `latency`: that is BaseAgent's LatencyTracker, which /status and hedging read
+        self._sample_latency = parse_latency(latency) if isinstance(latency, str) else latency
+        self.failure_rate = failure_rate
+        self.signal_bias = signal_bias or {"BUY": 0.4, "SELL": 0.3, "HOLD": 0.3}
+        self.convergence = convergence
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def is_active(self):
+        return True
+
+    def _draw(self):
+        """Draws (latency, fails, sample, confidence) under one lock, so each agent's sequence is reproducible."""
+        with self._rng_lock:
+            self.calls += 1
+            fails = self._rng.random() < self.failure_rate
+            if fails:
+                self.failures += 1
+            return max(0.0, self._sample_latency(self._rng)), fails, self._rng.random(), self._rng.uniform(0.5, 0.9)
+
+    def _respond(self):
+        delay, fails, sample, confidence = self._draw()
+        time.sleep(delay)
+        if fails:
+            raise RuntimeError(f"{self.name}: injected failure")
+        return sample, confidence
+
+    def analyze(self, market_data):
+        sample, confidence = self._respond()
+        cumulative = 0.0
+        signal = SIGNALS[-1]
+        for candidate in SIGNALS:
+            cumulative += self.signal_bias.get(candidate, 0.0)
+            if sample < cumulative:
+                signal = candidate
+                break
+        return {"signal": signal, "confidence": round(confidence, 2), "reasoning": f"Stub analysis of {market_data['ticker']}"}
+
+    def debate(self, context, round_history):
+        sample, _ = self._respond()
+        opinions = {name: (signal, float(conf)) for name, signal, conf in OPINION_LINE.findall(context)}
+        own_signal, own_confidence = opinions.pop(self.name, ("HOLD", 0.5))
+        signal, confidence = own_signal, own_confidence
+        if opinions:
+            majority, _ = Counter(s for s, _ in opinions.values()).most_common(1)[0]
+            if majority != own_signal and sample < self.convergence:
+                signal = majority
+                confidence = max(c for s, c in opinions.values() if s == majority)
+        confidence = min(0.95, confidence + 0.1)
+        return {
+            "revised_signal": signal,
+            "revised_confidence": round(confidence, 2),
+            "response": f"Stub revision: {own_signal} -> {signal}"
+        }
+
+class FakeRedis:
+    """
+    In-memory replacement for redis.Redis covering the commands RedisClient
+    uses (get/setex/mget/hset/hgetall/expire and pipelines), with expiry.
+    Values come back as bytes, as they do from a real server. `latency`
+    adds a simulated round-trip per command or pipeline execute.
+    """
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self._data = {} # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _sleep(self):
+        # Commands replayed by a pipeline share its single round-trip
+        if self.latency and not getattr(self._local, 'pipelined', False):
+            time.sleep(self.latency)
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[0]
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode('utf-8')
+
+    def ping(self):
+        self._sleep()
+        return True
+
+    def get(self, key):
+        self._sleep()
+        with self._lock:
+            value = self._live(key)
+            return value if isinstance(value, bytes) else None
+
+    def mget(self, keys):
+        self._sleep()
+        with self._lock:
+            return [v if isinstance(v, bytes) else None for v in (self._live(k) for k in keys)]
+
+    def setex(self, key, ttl, value):
+        self._sleep()
+        with self._lock:
+            self._data[key] = (self._encode(value), time.monotonic() + ttl)
+        return True
+
+    def hset(self, key, mapping):
+        self._sleep()
+        with self._lock:
+            current = self._live(key)
+            current = dict(current) if isinstance(current, dict) else {}
+            current.update({self._encode(k): self._encode(v) for k, v in mapping.items()})
+            expires = self._data[key][1] if key in self._data else None
+            self._data[key] = (current, expires)
+        return len(mapping)
+
+    def hgetall(self, key):
+        self._sleep()
+        with self._lock:
+            value = self._live(key)
+            return dict(value) if isinstance(value, dict) else {}
+
+    def expire(self, key, ttl):
+        self._sleep()
+        with self._lock:
+            if self._live(key) is None:
+                return False
+            self._data[key] = (self._data[key][0], time.monotonic() + ttl)
+            return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+class FakePipeline:
+    """Queues commands and runs them on execute(), paying FakeRedis.latency once."""
+    def __init__(self, redis):
+        self.redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        self.redis._sleep()
+        self.redis._local.pipelined = True
+        try:
+            return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self._commands]
+        finally:
+            self.redis._local.pipelined = False
+            self._commands = []
@@ -0,0 +1,485 @@
+"""
+Offline benchmark suite. Agents are stubs with seeded latency, failures and
+signal behaviour, Redis is an in-memory fake and market data comes from the
+mock provider, so nothing calls an LLM, a server or the network.
+
+    python -m benchmarks.suite [--suites debate,vector,consensus,http] [--quick]
+                               [--output results.json] [--compare baseline.json]
+
+Suites:
+    debate     run_debate latency percentiles and throughput, sequential and concurrent
+    vector     VectorStore bulk load, single adds and searches at each --sizes
+    consensus  _calculate_consensus and the vectorized backtest ReplayEngine
+    http       POST /analyze through the Flask test client under concurrent load
+
+Results are printed as a table (or JSON with --json) and can be saved with
+--output. Every run records the environment and a flat "metrics" map; with
+--compare, metrics that got worse than the baseline by more than --tolerance
+are reported and the exit status is 1.
+"""
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config import Config
+from benchmarks.stubs import StubAgent, FakeRedis
+
+SUITES = ("debate", "vector", "consensus", "http")
+AGENT_CONFIGS = list(Config.AGENTS.values())
+SIGNAL_BIASES = [
+    {"BUY": 0.5, "SELL": 0.2, "HOLD": 0.3},
+    {"BUY": 0.3, "SELL": 0.4, "HOLD": 0.3},
+    {"BUY": 0.4, "SELL": 0.2, "HOLD": 0.4},
+    {"BUY": 0.35, "SELL": 0.35, "HOLD": 0.3}
+]
+DEFAULTS = {
+    # option: (full run, --quick)
+    "debates": (100, 20),
+    "concurrency": (8, 4),
+    "sizes": ("10000,100000", "10000"),
+    "queries": (500, 100),
+    "single_adds": (100, 20),
+    "consensus_calls": (100000, 20000),
+    "replay_logs": (5000, 1000),
+    "requests": (200, 40)
+}
+
+@contextlib.contextmanager
+def patched_config(**overrides):
+    """Temporarily overrides Config attributes."""
+    saved = {name: getattr(Config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+def summarize(seconds):
+    """Latency percentiles in milliseconds."""
+    if not len(seconds):
+        return {"count": 0}
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3)
+    }
+
+def run_concurrently(fn, items, concurrency):
+    """Runs fn over items on `concurrency` threads; returns (results, wall seconds)."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fn, items))
+    return results, time.perf_counter() - start
+
+def make_agents(args):
+    return [
+        StubAgent(
+            conf['name'],
+            weight=conf['weight'],
+            role=conf['role'],
+            latency=args.latency,
+            failure_rate=args.failure_rate,
+            signal_bias=SIGNAL_BIASES[i % len(SIGNAL_BIASES)],
+            convergence=args.convergence,
+            seed=args.seed + i
+        )
+        for i, conf in enumerate(AGENT_CONFIGS)
+    ]
+
+def attach_stubs(orchestrator, agents, workdir, args):
+    """Points an Orchestrator at stub agents, a fake Redis, a scratch vector store and archive, and the mock feed."""
+    from data.feed import DataFeed, MockProvider
+    from memory.debate_archive import DebateArchive
+    from memory.rag_engine import RAGEngine
+    from memory.redis_client import RedisClient
+    from memory.vector_store import VectorStore
+
+    with patched_config(VECTOR_DB_PATH=os.path.join(workdir, "memory", "vector_store.index")):
+        vector_store = VectorStore()
+    orchestrator.agents = agents
+    orchestrator.rag_engine = RAGEngine(
+        redis=RedisClient(client=FakeRedis(latency=args.redis_latency)),
+        vector_store=vector_store,
+        archive=DebateArchive(os.path.join(workdir, "memory", "debate_archive.db"))
+    )
+    orchestrator.data_feed = DataFeed(MockProvider(), ttl=0)
+    orchestrator.response_cache = None
+    orchestrator.agent_timeout = args.agent_timeout
+    if args.adaptive:
+        orchestrator.adaptive_rounds = True
+    orchestrator.rag_engine.warm_up()
+    return orchestrator
+
+def _debate_stats(results, latencies, wall):
+    completed = [r for r in results if r and 'error' not in r]
+    stages = {}
+    for result in completed:
+        for stage, seconds in result.get('timings', {}).items():
+            stages.setdefault(stage, []).append(seconds)
+    return {
+        "latency": summarize(latencies),
+        "throughput_per_s": round(len(results) / wall, 3) if wall else None,
+        "errors": len(results) - len(completed),
+        "rounds_mean": round(float(np.mean([r['rounds'] for r in completed])), 3) if completed else None,
+        "consensus_rate": round(sum(r['confidence'] >= Config.CONSENSUS_THRESHOLD for r in completed) / len(completed), 3)
+                          if completed else None,
+        "stage_mean_ms": {stage: round(float(np.mean(v)) * 1000, 3) for stage, v in sorted(stages.items())}
+    }
+
+def bench_debate(args, workdir):
+    from orchestrator import Orchestrator
+    agents = make_agents(args)
+    orchestrator = attach_stubs(Orchestrator(), agents, os.path.join(workdir, "debate"), args)
+
+    def one(ticker):
+        start = time.perf_counter()
+        result = orchestrator.run_debate(ticker)
+        return result, time.perf_counter() - start
+
+    for i in range(2):
+        one(f"WARM{i}")
+
+    details = {}
+    start = time.perf_counter()
+    sequential = [one(f"SEQ{i:05d}") for i in range(args.debates)]
+    wall = time.perf_counter() - start
+    details["sequential"] = _debate_stats([r for r, _ in sequential], [s for _, s in sequential], wall)
+
+    concurrent, wall = run_concurrently(one, [f"CON{i:05d}" for i in range(args.debates)], args.concurrency)
+    details["concurrent"] = {"concurrency": args.concurrency,
+                             **_debate_stats([r for r, _ in concurrent], [s for _, s in concurrent], wall)}
+    details["agents"] = {a.name: {"calls": a.calls, "failures": a.failures} for a in agents}
+    details["settings"] = {
+        "latency": args.latency,
+        "failure_rate": args.failure_rate,
+        "agent_timeout": args.agent_timeout,
+        "parallel": orchestrator.parallel,
+        "context_delta": orchestrator.context_delta,
+        "adaptive_rounds": orchestrator.adaptive_rounds
+    }
+    details["agent_calls_per_debate"] = round(sum(a.calls for a in agents) / (2 * args.debates + 2), 3)
+    orchestrator.rag_engine.vector_store.flush()
+
+    metrics = {
+        "debate.sequential.p50_ms": (details["sequential"]["latency"]["p50_ms"], "lower"),
+        "debate.sequential.p95_ms": (details["sequential"]["latency"]["p95_ms"], "lower"),
+        "debate.concurrent.p95_ms": (details["concurrent"]["latency"]["p95_ms"], "lower"),
+        "debate.concurrent.throughput_per_s": (details["concurrent"]["throughput_per_s"], "higher"),
+        "debate.agent_calls_per_debate": (details["agent_calls_per_debate"], "lower")
+    }
+    return details, metrics
+
+def _disk_bytes(directory):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(directory) for f in files)
+
+def bench_vector(args, workdir):
+    from memory.vector_store import VectorStore
+    rng = np.random.default_rng(args.seed)
+    tickers = [f"T{i:03d}" for i in range(args.tickers)]
+    details, metrics = {}, {}
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        directory = os.path.join(workdir, f"vectors-{size}")
+        with patched_config(
+            VECTOR_DB_PATH=os.path.join(directory, "vector_store.index"),
+            EMBEDDING_DIM=args.dim,
+            VECTOR_INDEX_TYPE=args.index_type,
+            # Rebuilds are timed explicitly below rather than started in the background
+            VECTOR_ANN_THRESHOLD=size + args.single_adds + 1,
+            VECTOR_FLUSH_INTERVAL=0
+        ):
+            store = VectorStore()
+            print(f"vector: loading {size} x {args.dim} ({args.index_type})", file=sys.stderr)
+            now = time.time()
+            start = time.perf_counter()
+            for offset in range(0, size, args.chunk):
+                n = min(args.chunk, size - offset)
+                ids = range(offset, offset + n)
+                store.add_memories(
+                    rng.standard_normal((n, args.dim), dtype=np.float32),
+                    [f"Ticker: {tickers[i % len(tickers)]}, memory {i}" for i in ids],
+                    tickers=[tickers[i % len(tickers)] for i in ids],
+                    timestamps=[now - size + i for i in ids]
+                )
+            store.flush()
+            load_seconds = time.perf_counter() - start
+
+            build_seconds = None
+            if args.index_type != 'flat':
+                start = time.perf_counter()
+                store.rebuild_index(args.index_type, background=False)
+                build_seconds = round(time.perf_counter() - start, 3)
+
+            adds = []
+            for i in range(args.single_adds):
+                vector = rng.standard_normal(args.dim, dtype=np.float32)
+                start = time.perf_counter()
+                store.add_memory(vector, f"single add {i}", ticker=tickers[i % len(tickers)], timestamp=now + i)
+                adds.append(time.perf_counter() - start)
+
+            queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+            searches = {"global": [], "partition": []}
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                store.search_memory(query, k=3)
+                searches["global"].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                store.search_memory(query, k=3, ticker=tickers[i % len(tickers)])
+                searches["partition"].append(time.perf_counter() - start)
+
+            store.flush()
+            # The store is discarded with its directory; don't flush it again at exit
+            atexit.unregister(store.flush)
+            details[str(size)] = {
+                "load_seconds": round(load_seconds, 3),
+                "load_per_s": round(size / load_seconds, 1),
+                "build_seconds": build_seconds,
+                "single_add": summarize(adds),
+                "search_global": summarize(searches["global"]),
+                "search_partition": summarize(searches["partition"]),
+                "recall": store.recall_report(k=10) if args.index_type != 'flat' else None,
+                "ntotal": store.ntotal,
+                "disk_bytes": _disk_bytes(directory)
+            }
+            del store
+        shutil.rmtree(directory, ignore_errors=True)
+
+        entry = details[str(size)]
+        metrics[f"vector.{size}.load_per_s"] = (entry["load_per_s"], "higher")
+        metrics[f"vector.{size}.single_add.p95_ms"] = (entry["single_add"]["p95_ms"], "lower")
+        metrics[f"vector.{size}.search_global.p95_ms"] = (entry["search_global"]["p95_ms"], "lower")
+        metrics[f"vector.{size}.search_partition.p95_ms"] = (entry["search_partition"]["p95_ms"], "lower")
+    details["settings"] = {"dim": args.dim, "index_type": args.index_type, "tickers": args.tickers, "chunk": args.chunk}
+    return details, metrics
+
+def _random_opinions(rng, names, weights):
+    return [
+        {"agent": name, "weight": weight, "opinion": {
+            "signal": rng.choice(("BUY", "SELL", "HOLD")), "confidence": round(rng.uniform(0.0, 1.0), 2)}}
+        for name, weight in zip(names, weights)
+    ]
+
+def bench_consensus(args, workdir):
+    from orchestrator import Orchestrator
+    from backtest.replay import ReplayEngine, weight_grid
+    rng = random.Random(args.seed)
+    names = [conf['name'] for conf in AGENT_CONFIGS]
+    weights = [conf['weight'] for conf in AGENT_CONFIGS]
+    orchestrator = Orchestrator()
+
+    opinion_sets = [_random_opinions(rng, names, weights) for _ in range(args.consensus_calls)]
+    start = time.perf_counter()
+    for opinions in opinion_sets:
+        orchestrator._calculate_consensus(opinions)
+    calc_seconds = time.perf_counter() - start
+
+    logs = []
+    for i in range(args.replay_logs):
+        rounds = rng.randint(0, 3)
+        history = [{**op, "round": r} for r in range(1, rounds + 1) for op in _random_opinions(rng, names, weights)]
+        logs.append({"ticker": f"R{i:05d}", "decision": rng.choice(("BUY", "SELL", "HOLD")),
+                     "initial_opinions": _random_opinions(rng, names, weights), "history": history})
+    start = time.perf_counter()
+    engine = ReplayEngine(logs, names)
+    pack_seconds = time.perf_counter() - start
+    grid = weight_grid([0.5, 1.0, 1.5], len(names))
+    start = time.perf_counter()
+    engine.evaluate(grid)
+    evaluate_seconds = time.perf_counter() - start
+
+    details = {
+        "calculate_consensus": {
+            "calls": args.consensus_calls,
+            "per_call_us": round(calc_seconds / args.consensus_calls * 1e6, 3),
+            "calls_per_s": round(args.consensus_calls / calc_seconds, 1)
+        },
+        "replay": {
+            "logs": args.replay_logs,
+            "configurations": len(grid),
+            "pack_seconds": round(pack_seconds, 3),
+            "evaluate_seconds": round(evaluate_seconds, 3),
+            "decisions_per_s": round(len(grid) * args.replay_logs / evaluate_seconds, 1)
+        }
+    }
+    metrics = {
+        "consensus.per_call_us": (details["calculate_consensus"]["per_call_us"], "lower"),
+        "consensus.replay.decisions_per_s": (details["replay"]["decisions_per_s"], "higher")
+    }
+    return details, metrics
+
+def bench_http(args, workdir):
+    import app as app_module
+    agents = make_agents(args)
+    attach_stubs(app_module.orchestrator, agents, os.path.join(workdir, "http"), args)
+    local = threading.local()
+
+    def one(ticker):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app_module.app.test_client()
+        start = time.perf_counter()
+        response = client.post('/analyze', json={"ticker": ticker})
+        return response.status_code, time.perf_counter() - start
+
+    one("WARMHTTP")
+    results, wall = run_concurrently(one, [f"H{i:05d}" for i in range(args.requests)], args.http_concurrency)
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    app_module.orchestrator.rag_engine.vector_store.flush()
+    # /status reads every attached agent's stats, so the stubs must stay compatible with it
+    status = app_module.app.test_client().get('/status')
+    if status.status_code != 200:
+        raise RuntimeError(f"GET /status failed with stub agents attached: HTTP {status.status_code}")
+
+    details = {
+        "concurrency": args.http_concurrency,
+        "latency": summarize([s for _, s in results]),
+        "throughput_per_s": round(len(results) / wall, 3),
+        "statuses": statuses
+    }
+    metrics = {
+        "http.analyze.p95_ms": (details["latency"]["p95_ms"], "lower"),
+        "http.analyze.throughput_per_s": (details["throughput_per_s"], "higher")
+    }
+    return details, metrics
+
+BENCHMARKS = {
+    "debate": bench_debate,
+    "vector": bench_vector,
+    "consensus": bench_consensus,
+    "http": bench_http
+}
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import faiss
+    return {
+        "timestamp": time.time(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "faiss": getattr(faiss, "__version__", None)
+    }
+
+def compare(metrics, baseline, tolerance):
+    """Rows of {metric, baseline, value, change, regression} for metrics present in both runs."""
+    rows = []
+    for name, metric in metrics.items():
+        base = baseline.get(name)
+        if not base or not base.get("value") or metric["value"] is None:
+            continue
+        change = metric["value"] / base["value"] - 1.0
+        regression = change > tolerance if metric["better"] == "lower" else change < -tolerance
+        rows.append({"metric": name, "baseline": base["value"], "value": metric["value"],
+                     "change": round(change, 4), "regression": regression})
+    return rows
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", default=",".join(SUITES), help="Comma-separated subset of: " + ", ".join(SUITES))
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads, for smoke runs and CI")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    parser.add_argument("--seed", type=int, default=7)
+    # Stub agents and backends
+    parser.add_argument("--latency", default="lognormal:0.02:0.5", help="Agent latency distribution (see benchmarks/stubs.py)")
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--convergence", type=float, default=0.6, help="Chance an agent adopts the majority each round")
+    parser.add_argument("--agent-timeout", type=float, default=2.0)
+    parser.add_argument("--adaptive", action="store_true", help="Enable adaptive debate rounds (DEBATE_ADAPTIVE)")
+    parser.add_argument("--redis-latency", type=float, default=0.0005, help="Simulated Redis round-trip (seconds)")
+    # Workload sizes; defaults depend on --quick
+    parser.add_argument("--debates", type=int)
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--sizes", help="Vector store sizes, e.g. 10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=Config.EMBEDDING_DIM)
+    parser.add_argument("--index-type", default="flat", choices=("flat", "ivfpq", "hnsw"))
+    parser.add_argument("--tickers", type=int, default=100, help="Ticker partitions in the vector store")
+    parser.add_argument("--chunk", type=int, default=50000, help="Vectors per add_memories call while loading")
+    parser.add_argument("--queries", type=int)
+    parser.add_argument("--single-adds", type=int)
+    parser.add_argument("--consensus-calls", type=int)
+    parser.add_argument("--replay-logs", type=int)
+    parser.add_argument("--requests", type=int)
+    parser.add_argument("--http-concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+    for name, (full, quick) in DEFAULTS.items():
+        if getattr(args, name) is None:
+            setattr(args, name, quick if args.quick else full)
+    unknown = set(args.suites.split(",")) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+    return args
+
+def print_report(report):
+    for name, metric in report["metrics"].items():
+        print(f"{name:45s} {metric['value']:>14,.3f}  ({metric['better']} is better)")
+    if report.get("comparison"):
+        print("\nAgainst baseline:")
+        for row in report["comparison"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['metric']:45s} {row['baseline']:>14,.3f} -> {row['value']:>14,.3f} ({row['change']:+.1%}){flag}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    report = {"environment": environment(), "settings": vars(args), "suites": {}, "metrics": {}}
+    try:
+        # No agent LLM clients, background warm-up or shared caches: only the stubs run
+        with patched_config(AGENTS={}, WARM_UP='off', LLM_CACHE_ENABLED=False, JOB_STORE_REDIS=False), \
+                contextlib.redirect_stdout(sys.stderr):
+            for name in args.suites.split(","):
+                print(f"Running {name} benchmark...")
+                start = time.perf_counter()
+                details, metrics = BENCHMARKS[name](args, workdir)
+                details["seconds"] = round(time.perf_counter() - start, 3)
+                report["suites"][name] = details
+                report["metrics"].update({k: {"value": v, "better": better} for k, (v, better) in metrics.items()})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            report["comparison"] = compare(report["metrics"], json.load(f).get("metrics", {}), args.tolerance)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if any(row["regression"] for row in report.get("comparison", [])) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,7 @@ class Config:
     # System Settings
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     DEBUG = os.getenv('DEBUG', 'True') == 'True'
+    WARM_UP = os.getenv('WARM_UP', 'background') # background | blocking | off: when app.py builds LLM clients, Redis and the index
     
     # API Keys
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -17,10 +18,53 @@ class Config:
     REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
     REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
     REDIS_DB = int(os.getenv('REDIS_DB', 0))
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 64)) # Shared pool size per process
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 1.0))
+    REDIS_BREAKER_FAILURES = int(os.getenv('REDIS_BREAKER_FAILURES', 3)) # Consecutive errors before using the fallback
+    REDIS_BREAKER_RESET = float(os.getenv('REDIS_BREAKER_RESET', 5.0)) # Seconds between reconnect probes
+    REDIS_FALLBACK_MAX_ENTRIES = int(os.getenv('REDIS_FALLBACK_MAX_ENTRIES', 10000)) # Bound on the in-process fallback
+    REDIS_COMPRESSION_LEVEL = int(os.getenv('REDIS_COMPRESSION_LEVEL', 6)) # zlib level for stored discussion logs
     
     # Vector DB (Long-term Memory)
     VECTOR_DB_PATH = os.getenv('VECTOR_DB_PATH', 'memory/vector_store.index')
+    EMBEDDER = os.getenv('EMBEDDER', 'market_state') # See memory/embeddings.py EMBEDDERS
+    EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', 768))
+    EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 4096)) # 0 disables the content-hash cache
+    VECTOR_INDEX_TYPE = os.getenv('VECTOR_INDEX_TYPE', 'flat') # flat | ivfpq | hnsw
+    VECTOR_ANN_THRESHOLD = int(os.getenv('VECTOR_ANN_THRESHOLD', 50000)) # Migrate from Flat once this many memories exist
+    VECTOR_IVF_NLIST = int(os.getenv('VECTOR_IVF_NLIST', 4096))
+    VECTOR_IVF_NPROBE = int(os.getenv('VECTOR_IVF_NPROBE', 16))
+    VECTOR_PQ_M = int(os.getenv('VECTOR_PQ_M', 48)) # PQ sub-quantizers; must divide EMBEDDING_DIM
+    VECTOR_HNSW_M = int(os.getenv('VECTOR_HNSW_M', 32))
+    VECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv('VECTOR_HNSW_EF_CONSTRUCTION', 80))
+    VECTOR_HNSW_EF_SEARCH = int(os.getenv('VECTOR_HNSW_EF_SEARCH', 64))
+    VECTOR_PARTITION_EXACT_MAX = int(os.getenv('VECTOR_PARTITION_EXACT_MAX', 20000)) # Exact-scan ticker partitions up to this size
+    VECTOR_FLUSH_BATCH = int(os.getenv('VECTOR_FLUSH_BATCH', 64)) # Journaled memories per index compaction
+    VECTOR_CHECKPOINT_GROWTH = float(os.getenv('VECTOR_CHECKPOINT_GROWTH', 1.25)) # Rewrite an ANN index file once the base grows this much (rows past it are re-added at load)
+    VECTOR_FLUSH_INTERVAL = float(os.getenv('VECTOR_FLUSH_INTERVAL', 60)) # Seconds between background flushes (0 = only when a flush batch fills)
+    VECTOR_JOURNAL_FSYNC = os.getenv('VECTOR_JOURNAL_FSYNC', 'False') == 'True' # fsync every journal append
+    VECTOR_MULTIPROCESS = os.getenv('VECTOR_MULTIPROCESS', 'False') == 'True' # Share one store between worker processes (file lock + version counter)
+    VECTOR_REFRESH_INTERVAL = float(os.getenv('VECTOR_REFRESH_INTERVAL', 1.0)) # Seconds between checks for other workers' writes (0 = every search)
     
+    # Market Data
+    DATA_PROVIDER = os.getenv('DATA_PROVIDER', 'mock') # mock | replay (see data/feed.py PROVIDERS)
+    DATA_CACHE_TTL = float(os.getenv('DATA_CACHE_TTL', 15)) # Seconds quotes/news are shared between debates (0 disables)
+    DATA_CACHE_MAX_ENTRIES = int(os.getenv('DATA_CACHE_MAX_ENTRIES', 4096))
+    DATA_REPLAY_PATH = os.getenv('DATA_REPLAY_PATH', 'data/replay') # Directory of <ticker>.npy/.parquet and .news.jsonl files
+    DATA_REPLAY_TIMESTAMP = float(os.environ['DATA_REPLAY_TIMESTAMP']) if os.getenv('DATA_REPLAY_TIMESTAMP') else None # Replay clock (epoch seconds); unset = latest bar
+
+    INDICATORS_ENABLED = os.getenv('INDICATORS_ENABLED', 'True') == 'True' # Attach RSI/MACD/EMA/ATR/Bollinger snapshots
+    INDICATOR_HISTORY = int(os.getenv('INDICATOR_HISTORY', 250)) # Bars used to seed a ticker's indicators
+    INDICATOR_MAX_TICKERS = int(os.getenv('INDICATOR_MAX_TICKERS', 10000)) # Per-ticker indicator states kept in memory
+
+    RAG_PARTITION_BY_TICKER = os.getenv('RAG_PARTITION_BY_TICKER', 'True') == 'True' # Retrieve only the same ticker's memories
+    RAG_LOOKBACK_DAYS = float(os.getenv('RAG_LOOKBACK_DAYS', 0)) # Limit retrieval to recent memories (0 = all history)
+
+    ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', 'True') == 'True' # Keep every full discussion log in the local debate archive
+    ARCHIVE_PATH = os.getenv('ARCHIVE_PATH', 'memory/debate_archive.db')
+    ARCHIVE_COMPRESSION_LEVEL = int(os.getenv('ARCHIVE_COMPRESSION_LEVEL', 6)) # zlib level for archived logs
+    ARCHIVE_PAGE_MAX = int(os.getenv('ARCHIVE_PAGE_MAX', 500)) # Largest page GET /history returns
+
     # Agent Configuration
     AGENTS = {
         'chatgpt': {
@@ -28,26 +72,30 @@ class Config:
             'model': 'gpt-4-turbo',  # Updated to real GPT-4 Turbo model
             'role': 'Fundamental Analysis',
             'weight': 1.0,
-            'temperature': 0.7
+            'temperature': 0.7,
+            'fallbacks': [{'model': 'gpt-4o-mini'}] # Tried in order on errors and as the hedge target
         },
         'grok': {
             'name': 'Grok Agent',
             'model': 'grok-beta',  # Updated to real Grok model (verify with xAI docs)
             'role': 'Social Sentiment',
             'weight': 1.0,
-            'temperature': 0.7
+            'temperature': 0.7,
+            'fallbacks': [] # e.g. [{'model': ..., 'base_url': ...}] for an alternate endpoint
         },
         'gemini': {
             'name': 'Gemini Agent',
             'model': 'gemini-pro',  # Updated to real Gemini Pro model
             'role': 'Technical Analysis',
             'weight': 1.2, # Higher weight for technicals as per user req
-            'temperature': 0.7
+            'temperature': 0.7,
+            'fallbacks': [{'model': 'gemini-1.5-flash'}]
         },
         'machine': {
             'name': 'Machine Agent',
             'model': 'llama-3.1-finetuned',
-            'model_path': os.getenv('MACHINE_MODEL_PATH', 'models/machine_finetuned.gguf'), # Path to fine-tuned model
+            'engine': os.getenv('MACHINE_ENGINE', 'numpy'), # Local inference engine (see agents/local_model.py ENGINES)
+            'weights_path': os.getenv('MACHINE_WEIGHTS_PATH', 'models/machine_weights.npy'), # Memory-mapped weights; built-in defaults if missing
             'role': 'Risk & Execution',
             'weight': 1.1,
             'temperature': 0.5 # Lower temp for execution logic
@@ -57,3 +105,46 @@ class Config:
     # Consensus Parameters
     CONSENSUS_THRESHOLD = 0.70
     MAX_DEBATE_ROUNDS = 5
+
+    # Debate Context
+    DEBATE_CONTEXT_DELTA = os.getenv('DEBATE_CONTEXT_DELTA', 'True') == 'True' # Send only last round's opinions plus a rolling summary
+    DEBATE_CONTEXT_TOKEN_BUDGET = int(os.getenv('DEBATE_CONTEXT_TOKEN_BUDGET', 1500)) # Estimated tokens per debate prompt payload
+    DEBATE_ADAPTIVE = os.getenv('DEBATE_ADAPTIVE', 'False') == 'True' # Re-query only agents that can still change the outcome
+    DEBATE_SETTLE = os.getenv('DEBATE_SETTLE', 'False') == 'True' # Also freeze agents that look settled (heuristic; can change the outcome)
+    DEBATE_SETTLE_TOLERANCE = float(os.getenv('DEBATE_SETTLE_TOLERANCE', 0.05)) # Confidence change below which a repeated opinion counts as settled
+    DEBATE_SETTLE_CONFIDENCE = float(os.getenv('DEBATE_SETTLE_CONFIDENCE', 0.9)) # Agents backing the leader this confidently are not re-queried (>1 disables)
+
+    # Agent Execution
+    PARALLEL_AGENTS = os.getenv('PARALLEL_AGENTS', 'True') == 'True' # Fan out analyze/debate calls concurrently
+    AGENT_TIMEOUT = float(os.getenv('AGENT_TIMEOUT', 30)) # Per-agent deadline (seconds) in parallel mode
+    AGENT_POOL_SIZE = int(os.getenv('AGENT_POOL_SIZE', 32)) # Shared by all debates; keep >= agents x BATCH_MAX_CONCURRENCY
+    AGENT_HEDGE_ENABLED = os.getenv('AGENT_HEDGE_ENABLED', 'False') == 'True' # Fire a backup LLM call when one runs past the hedge delay
+    AGENT_HEDGE_PERCENTILE = float(os.getenv('AGENT_HEDGE_PERCENTILE', 95)) # Hedge delay = this percentile of the agent's recent latency
+    AGENT_HEDGE_MIN_DELAY = float(os.getenv('AGENT_HEDGE_MIN_DELAY', 1.0)) # Floor on the hedge delay (seconds)
+    AGENT_HEDGE_MIN_SAMPLES = int(os.getenv('AGENT_HEDGE_MIN_SAMPLES', 20)) # Calls observed before hedging starts
+    AGENT_HEDGE_POOL_SIZE = int(os.getenv('AGENT_HEDGE_POOL_SIZE', 64)) # Threads running hedged calls
+    AGENT_LATENCY_WINDOW = int(os.getenv('AGENT_LATENCY_WINDOW', 200)) # Recent calls kept per agent for latency stats
+    MACHINE_BATCH_MAX = int(os.getenv('MACHINE_BATCH_MAX', 64)) # Machine Agent calls scored per forward pass
+    MACHINE_BATCH_WINDOW = float(os.getenv('MACHINE_BATCH_WINDOW', 0.002)) # Seconds a batch waits for concurrent calls
+
+    # LLM Response Cache
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True') == 'True'
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 900)) # Seconds a cached reply stays valid
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 2048)) # In-process LRU bound
+    LLM_CACHE_REDIS = os.getenv('LLM_CACHE_REDIS', 'False') == 'True' # Share cached replies across workers via Redis
+
+    # Batch Analysis
+    BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', 8)) # Global cap on concurrently running debates
+    BATCH_MAX_TICKERS = int(os.getenv('BATCH_MAX_TICKERS', 500))
+    BATCH_TIMEOUT = float(os.getenv('BATCH_TIMEOUT', 300)) # Seconds before unfinished tickers are reported as timed out
+
+    # Job Queue
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4)) # Background threads running queued debates
+    JOB_QUEUE_MAX_DEPTH = int(os.getenv('JOB_QUEUE_MAX_DEPTH', 100)) # Submissions beyond this get HTTP 429
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 3600)) # Seconds job records stay pollable
+    JOB_STORE_MAX_ENTRIES = int(os.getenv('JOB_STORE_MAX_ENTRIES', 10000))
+    JOB_STORE_REDIS = os.getenv('JOB_STORE_REDIS', 'False') == 'True' # Mirror job records to Redis for multi-worker polling
+    JOB_WEBHOOK_TIMEOUT = float(os.getenv('JOB_WEBHOOK_TIMEOUT', 5))
+    JOB_WEBHOOK_RETRIES = int(os.getenv('JOB_WEBHOOK_RETRIES', 2))
+    JOB_WEBHOOK_WORKERS = int(os.getenv('JOB_WEBHOOK_WORKERS', 2)) # Threads delivering webhooks, apart from the debate workers
+    JOB_WEBHOOK_ALLOWED_HOSTS = {h.strip().lower() for h in os.getenv('JOB_WEBHOOK_ALLOWED_HOSTS', '').split(',') if h.strip()} # Comma-separated; if set, only these hosts (private ones included) get webhooks
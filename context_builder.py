@@ -0,0 +1,106 @@
+import json
+import math
+from config import Config
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return math.ceil(len(text) / 4)
+
+class SerializedDict(dict):
+    """A dict that carries its JSON serialization, computed once and reused by every prompt."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.serialized = json.dumps(self)
+
+class SerializedList(list):
+    """A list of debate entries serialized from pre-encoded JSON fragments."""
+    def __init__(self, entries, fragments):
+        super().__init__(entries)
+        self.serialized = "[" + ", ".join(fragments) + "]"
+
+class DebateContextBuilder:
+    """
+    Builds bounded debate payloads for one debate.
+    Each round sends the shared context (historical context plus a compact
+    summary of every agent's signal trajectory) and only the previous round's
+    opinions from the other agents, instead of the whole history. When the
+    payload would exceed the token budget, reasoning text is trimmed first and
+    the historical context second. Estimated prompt tokens are recorded per round.
+    """
+    def __init__(self, historical_context, token_budget=None):
+        self.historical_context = historical_context
+        self.token_budget = token_budget or Config.DEBATE_CONTEXT_TOKEN_BUDGET
+        self.trajectories = {} # agent -> ["BUY 0.60", ...]
+        self.round_tokens = []
+
+    def record_opinions(self, opinions):
+        for op in opinions:
+            point = f"{op['opinion']['signal']} {float(op['opinion']['confidence'] or 0.0):.2f}"
+            self.trajectories.setdefault(op['agent'], []).append(point)
+
+    def _summary(self, current_opinions):
+        summary = "Current Opinions:\n"
+        for op in current_opinions:
+            earlier = self.trajectories.get(op['agent'], [])[:-1]
+            trail = f" [earlier: {' -> '.join(earlier)}]" if earlier else ""
+            summary += f"{op['agent']}: {op['opinion']['signal']} (Conf: {op['opinion']['confidence']}){trail}\n"
+        return summary
+
+    def build(self, round_num, current_opinions, previous_round, agent_names):
+        """
+        Returns (context, {agent_name: history}) for the next debate round.
+        `previous_round` holds the opinions produced by the last debate round
+        (empty before the first one); each agent receives the others' entries.
+        """
+        summary = self._summary(current_opinions)
+        historical = self.historical_context
+        history_limit = self.token_budget - estimate_tokens(summary)
+
+        # Trim the historical context if it alone would crowd out the round delta
+        if estimate_tokens(historical) > history_limit // 2:
+            historical = historical[:max(0, history_limit // 2) * 4].rstrip() + " ..."
+        context = f"{historical}\n\n{summary}"
+
+        available_chars = max(0, (self.token_budget - estimate_tokens(context)) * 4)
+        reasoning_limit = None
+        if previous_round:
+            full_size = sum(len(json.dumps(entry)) for entry in previous_round)
+            if full_size > available_chars:
+                overhead = full_size - sum(len(str(e['opinion'].get('reasoning', ''))) for e in previous_round)
+                reasoning_limit = max(80, (available_chars - overhead) // len(previous_round))
+
+        fragments = []
+        for entry in previous_round:
+            compact = {
+                "agent": entry['agent'],
+                "signal": entry['opinion']['signal'],
+                "confidence": entry['opinion']['confidence'],
+                "reasoning": str(entry['opinion'].get('reasoning', ''))
+            }
+            if reasoning_limit is not None and len(compact['reasoning']) > reasoning_limit:
+                compact['reasoning'] = compact['reasoning'][:reasoning_limit] + "..."
+            fragments.append((compact, json.dumps(compact)))
+
+        histories = {}
+        for name in agent_names:
+            others = [(c, f) for c, f in fragments if c['agent'] != name]
+            histories[name] = SerializedList([c for c, _ in others], [f for _, f in others])
+        self.record_round(round_num + 1, context, histories)
+        return context, histories
+
+    def record_round(self, round_num, shared, payloads):
+        """
+        Records estimated prompt tokens for one round: the shared payload sent to
+        every agent plus each agent's own payload ({agent_name: str or object}).
+        Round 0 is the initial analysis.
+        """
+        shared_tokens = estimate_tokens(shared)
+        per_agent = [
+            shared_tokens + estimate_tokens(p if isinstance(p, str) else (getattr(p, 'serialized', None) or json.dumps(p)))
+            for p in payloads.values()
+        ]
+        self.round_tokens.append({
+            "round": round_num,
+            "total": sum(per_agent),
+            "max": max(per_agent, default=0)
+        })
@@ -1,6 +1,40 @@
 import random
+import time
+from abc import ABC, abstractmethod
+from config import Config
+from data.indicators import IndicatorEngine
+from utils.ttl_cache import TTLCache
 
-class DataFeed:
+class MarketDataProvider(ABC):
+    """
+    Source of quotes and headlines. Providers only need the single-ticker
+    methods; the *_many variants can be overridden with real bulk requests.
+    """
+    @abstractmethod
+    def get_market_data(self, ticker):
+        """
+        Returns:
+            dict: {"ticker", "price", "volume", "change_24h", "timestamp", ...}
+            with optional "high"/"low" for the latest bar.
+        """
+        pass
+
+    @abstractmethod
+    def get_news(self, ticker):
+        """Returns a list of recent headlines."""
+        pass
+
+    def get_market_data_many(self, tickers):
+        return {ticker: self.get_market_data(ticker) for ticker in tickers}
+
+    def get_news_many(self, tickers):
+        return {ticker: self.get_news(ticker) for ticker in tickers}
+
+    def get_history(self, ticker, limit):
+        """Optional: the last `limit` OHLCV bars, used to seed indicators. None if unsupported."""
+        return None
+
+class MockProvider(MarketDataProvider):
     def get_market_data(self, ticker):
         """
         Fetches market data for a given ticker.
@@ -13,7 +47,7 @@ class DataFeed:
             "price": round(base_price, 2),
             "volume": random.randint(100000, 10000000),
             "change_24h": round(random.uniform(-5.0, 5.0), 2),
-            "rsi": round(random.uniform(30, 70), 2)
+            "timestamp": time.time()
         }
 
     def get_news(self, ticker):
@@ -28,3 +62,89 @@ class DataFeed:
             f"Institutional interest in {ticker} is growing."
         ]
         return random.sample(headlines, 2)
+
+def _replay_provider():
+    from data.replay import ReplayProvider
+    return ReplayProvider()
+
+PROVIDERS = {
+    'mock': MockProvider,
+    'replay': _replay_provider
+}
+
+def create_provider(name=None):
+    name = name or Config.DATA_PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown data provider: {name}")
+    return PROVIDERS[name]()
+
+class DataFeed:
+    """
+    Market data access used by the orchestrator.
+    Wraps the configured provider with a per-ticker TTL cache, so debates that
+    need the same quotes within DATA_CACHE_TTL seconds share one fetch, and bulk
+    lookups only ask the provider for the tickers that are missing.
+    Fetched quotes get an indicator snapshot from the IndicatorEngine before
+    they are cached. Callers receive copies and may modify them freely.
+    """
+    def __init__(self, provider=None, ttl=None):
+        self.provider = provider or create_provider()
+        self.indicators = IndicatorEngine() if Config.INDICATORS_ENABLED else None
+        ttl = ttl if ttl is not None else Config.DATA_CACHE_TTL
+        self.cache = TTLCache(max_entries=Config.DATA_CACHE_MAX_ENTRIES, ttl=ttl) if ttl > 0 else None
+
+    def _cached_many(self, kind, fetch_many, tickers):
+        # Replay providers answer as of their clock, so moving the clock misses the cache
+        clock = getattr(self.provider, 'timestamp', None)
+        results = {}
+        missing = []
+        for ticker in tickers:
+            value = self.cache.get((kind, clock, ticker)) if self.cache is not None else None
+            if value is None:
+                missing.append(ticker)
+            else:
+                results[ticker] = value
+        if missing:
+            fetched = fetch_many(missing)
+            for ticker, value in fetched.items():
+                if self.cache is not None:
+                    self.cache.set((kind, clock, ticker), value)
+                results[ticker] = value
+        return results
+
+    def get_market_data(self, ticker):
+        return self.get_market_data_many([ticker])[ticker]
+
+    def get_news(self, ticker):
+        return self.get_news_many([ticker])[ticker]
+
+    def get_market_data_many(self, tickers):
+        """Returns {ticker: market_data} using one provider call for all cache misses."""
+        data = self._cached_many('market', self._fetch_market_data, tickers)
+        return {ticker: dict(value) for ticker, value in data.items()}
+
+    def _fetch_market_data(self, tickers):
+        data = self.provider.get_market_data_many(tickers)
+        if self.indicators is not None:
+            for market_data in data.values():
+                self.indicators.attach(market_data, self.provider.get_history)
+        return data
+
+    def get_news_many(self, tickers):
+        """Returns {ticker: headlines} using one provider call for all cache misses."""
+        news = self._cached_many('news', self.provider.get_news_many, tickers)
+        return {ticker: list(value) for ticker, value in news.items()}
+
+    def prefetch(self, tickers):
+        """Warms the cache for a batch of tickers ahead of their debates."""
+        if self.cache is None:
+            return
+        self.get_market_data_many(tickers)
+        self.get_news_many(tickers)
+
+    def stats(self):
+        return {
+            "provider": type(self.provider).__name__,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "indicators": self.indicators.stats() if self.indicators is not None else None
+        }
@@ -0,0 +1,233 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from config import Config
+
+EMA_PERIODS = (12, 26, 50)
+MACD_SIGNAL_PERIOD = 9
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BB_PERIOD = 20
+BB_STD = 2.0
+
+def _new_state(n):
+    zeros = lambda: np.zeros(n, dtype=np.float64)
+    state = {f"ema_{p}": zeros() for p in EMA_PERIODS}
+    state.update({
+        "count": 0,
+        "prev_close": zeros(),
+        "macd_signal": zeros(),
+        "avg_gain": zeros(),
+        "avg_loss": zeros(),
+        "atr": zeros(),
+        "ring": np.zeros((n, BB_PERIOD), dtype=np.float64)
+    })
+    return state
+
+def _step(state, high, low, close):
+    """
+    Advances `state` by one bar for N series at once (high/low/close of shape (N,))
+    and returns the indicator values for that bar. Every recurrence is O(1) per
+    bar: EMAs, Wilder-smoothed RSI and ATR keep a running average, Bollinger
+    bands read a fixed BB_PERIOD ring buffer.
+    """
+    count = state["count"]
+    if count == 0:
+        for p in EMA_PERIODS:
+            state[f"ema_{p}"][:] = close
+        state["atr"][:] = high - low
+    else:
+        prev = state["prev_close"]
+        delta = close - prev
+        gain, loss = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+        if count == 1:
+            # Wilder averages are seeded with the first change
+            state["avg_gain"][:] = gain
+            state["avg_loss"][:] = loss
+        else:
+            state["avg_gain"] += (gain - state["avg_gain"]) / RSI_PERIOD
+            state["avg_loss"] += (loss - state["avg_loss"]) / RSI_PERIOD
+        true_range = np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+        state["atr"] += (true_range - state["atr"]) / ATR_PERIOD
+        for p in EMA_PERIODS:
+            state[f"ema_{p}"] += (close - state[f"ema_{p}"]) * (2.0 / (p + 1))
+    state["prev_close"][:] = close
+
+    macd = state["ema_12"] - state["ema_26"]
+    if count == 0:
+        state["macd_signal"][:] = macd
+    else:
+        state["macd_signal"] += (macd - state["macd_signal"]) * (2.0 / (MACD_SIGNAL_PERIOD + 1))
+
+    state["ring"][:, count % BB_PERIOD] = close
+    count += 1
+    state["count"] = count
+    window = state["ring"][:, :min(count, BB_PERIOD)]
+    middle = window.mean(axis=1)
+    band = BB_STD * window.std(axis=1)
+
+    avg_gain, avg_loss = state["avg_gain"], state["avg_loss"]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss > 0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss), np.where(avg_gain > 0, 100.0, 50.0))
+        percent_b = np.where(band > 0, (close - (middle - band)) / (2 * band), 0.5)
+
+    values = {f"ema_{p}": state[f"ema_{p}"].copy() for p in EMA_PERIODS}
+    values.update({
+        "macd": macd,
+        "macd_signal": state["macd_signal"].copy(),
+        "macd_hist": macd - state["macd_signal"],
+        "rsi_14": rsi,
+        "atr_14": state["atr"].copy(),
+        "bb_middle": middle,
+        "bb_upper": middle + band,
+        "bb_lower": middle - band,
+        "bb_percent_b": percent_b
+    })
+    return values
+
+def compute_indicators(high, low, close):
+    """
+    Batch mode: full indicator series for many tickers at once.
+    Args:
+        high, low, close: arrays of shape (tickers, bars), aligned in time.
+    Returns:
+        (series, state): series maps each indicator name to a (tickers, bars)
+        array; state can seed IndicatorEngine so live updates continue from the
+        last bar. Values are identical to feeding the bars one by one.
+    """
+    high, low, close = (np.atleast_2d(np.asarray(a, dtype=np.float64)) for a in (high, low, close))
+    n, t = close.shape
+    state = _new_state(n)
+    series = None
+    for i in range(t):
+        values = _step(state, high[:, i], low[:, i], close[:, i])
+        if series is None:
+            series = {name: np.empty((n, t), dtype=np.float64) for name in values}
+        for name, value in values.items():
+            series[name][:, i] = value
+    return series or {}, state
+
+def _snapshot(values, count):
+    snapshot = {name: round(float(value[0]), 4) for name, value in values.items()}
+    snapshot["bars"] = count
+    return snapshot
+
+class IndicatorEngine:
+    """
+    Keeps per-ticker indicator state and updates it incrementally.
+    A ticker seen for the first time is seeded from its history (one batch
+    pass) when a history source is available; after that each new bar costs
+    O(1). With a history source, bars skipped between two quotes are stepped
+    through, and a clock that moves back re-seeds from the history as of the
+    new clock, so the state never holds bars from after the quote. Re-reading
+    the quote at the last processed timestamp never double-counts it. State
+    for at most `max_tickers` tickers is kept, least recently updated first out.
+    """
+    def __init__(self, max_tickers=None, history=None):
+        self.max_tickers = max_tickers or Config.INDICATOR_MAX_TICKERS
+        self.history = history if history is not None else Config.INDICATOR_HISTORY
+        self._states = OrderedDict() # ticker -> (state, last_ts, snapshot)
+        self._lock = threading.Lock()
+
+    def seed(self, ticker, bars):
+        """Replaces the ticker's state with one computed from bars (OHLCV records with ts/high/low/close)."""
+        if len(bars) == 0:
+            return None
+        series, state = compute_indicators(bars['high'][None, :], bars['low'][None, :], bars['close'][None, :])
+        snapshot = _snapshot({name: s[:, -1] for name, s in series.items()}, state["count"])
+        with self._lock:
+            self._store(ticker, state, float(bars['ts'][-1]), snapshot)
+        return snapshot
+
+    def update(self, ticker, ts, high, low, close):
+        """
+        Feeds one bar and returns the ticker's indicator snapshot. A bar older
+        than the last one processed starts the ticker over, since its state was
+        built from later bars (attach re-seeds from history instead).
+        """
+        with self._lock:
+            entry = self._states.get(ticker)
+            if entry is not None and ts == entry[1]:
+                return entry[2]
+            state = entry[0] if entry is not None and ts > entry[1] else _new_state(1)
+            values = _step(state, np.array([high], dtype=np.float64), np.array([low], dtype=np.float64),
+                           np.array([close], dtype=np.float64))
+            snapshot = _snapshot(values, state["count"])
+            self._store(ticker, state, ts, snapshot)
+            return snapshot
+
+    def _store(self, ticker, state, ts, snapshot):
+        self._states[ticker] = (state, ts, snapshot)
+        self._states.move_to_end(ticker)
+        while len(self._states) > self.max_tickers:
+            self._states.popitem(last=False)
+
+    def _catch_up(self, ticker, ts, history_source):
+        """
+        Brings the ticker's state up to the bar at `ts` from history_source:
+        seeds unseen tickers, re-seeds after a rewind or a gap wider than the
+        history window, and otherwise steps through the bars missed since the
+        last update (up to and including `ts`).
+        """
+        with self._lock:
+            entry = self._states.get(ticker)
+        if entry is not None and ts == entry[1]:
+            return
+        bars = history_source(ticker, self.history)
+        if bars is None or not len(bars):
+            return
+        bars = bars[bars['ts'] <= ts]
+        if entry is None or ts < entry[1]:
+            if len(bars):
+                self.seed(ticker, bars)
+            return
+
+        with self._lock:
+            entry = self._states.get(ticker)
+            if entry is None or entry[1] >= ts:
+                return
+            missed = bars[bars['ts'] > entry[1]]
+            # The window must reach back to the last processed bar to step from it
+            contiguous = len(missed) < len(bars)
+            if contiguous and len(missed):
+                state = entry[0]
+                for bar in missed:
+                    values = _step(state, np.array([bar['high']], dtype=np.float64),
+                                   np.array([bar['low']], dtype=np.float64), np.array([bar['close']], dtype=np.float64))
+                self._store(ticker, state, float(missed['ts'][-1]), _snapshot(values, state["count"]))
+        if not contiguous:
+            self.seed(ticker, bars)
+
+    def snapshot(self, ticker):
+        with self._lock:
+            entry = self._states.get(ticker)
+            return entry[2] if entry is not None else None
+
+    def attach(self, market_data, history_source=None):
+        """
+        Adds market_data['indicators'] and sets market_data['rsi'] from the
+        engine. Quotes without OHLC fields are treated as a bar at their price.
+        `history_source(ticker, limit)` (the last `limit` bars as of the quote)
+        is used to seed unseen tickers and to catch up after gaps and rewinds.
+        """
+        ticker = market_data['ticker']
+        ts = float(market_data.get('timestamp') or time.time())
+        if history_source is not None and self.history > 0:
+            self._catch_up(ticker, ts, history_source)
+
+        price = float(market_data['price'])
+        snapshot = self.update(
+            ticker,
+            ts,
+            float(market_data.get('high', price)),
+            float(market_data.get('low', price)),
+            price
+        )
+        market_data['indicators'] = snapshot
+        market_data['rsi'] = round(snapshot['rsi_14'], 2)
+        return market_data
+
+    def stats(self):
+        with self._lock:
+            return {"tickers": len(self._states), "max_tickers": self.max_tickers}
@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+from config import Config
+from data.feed import MarketDataProvider
+
+OHLCV_DTYPE = np.dtype([
+    ('ts', '<f8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8')
+])
+NEWS_LIMIT = 2
+# Tickers name files, so nothing that could leave the data directory (separators, "..") is allowed
+TICKER_PATTERN = re.compile(r"[A-Z0-9.\-^=]+")
+
+def ticker_path(directory, ticker, suffix):
+    """<directory>/<ticker><suffix>; raises ValueError for tickers that are not plain symbols."""
+    if not isinstance(ticker, str) or not TICKER_PATTERN.fullmatch(ticker) or '..' in ticker:
+        raise ValueError(f"Invalid ticker for replay data: {ticker!r}")
+    return os.path.join(directory, f"{ticker}{suffix}")
+
+def save_ohlcv(directory, ticker, bars):
+    """
+    Writes bars (anything convertible to an OHLCV_DTYPE array, e.g. a list of
+    (ts, open, high, low, close, volume) tuples) as <directory>/<ticker>.npy, sorted by ts.
+    """
+    os.makedirs(directory, exist_ok=True)
+    array = np.array(bars, dtype=OHLCV_DTYPE) if not isinstance(bars, np.ndarray) else bars.astype(OHLCV_DTYPE)
+    np.save(ticker_path(directory, ticker, ".npy"), np.sort(array, order='ts'))
+
+def save_news(directory, ticker, items):
+    """Writes [(ts, headline), ...] as <directory>/<ticker>.news.jsonl."""
+    os.makedirs(directory, exist_ok=True)
+    with open(ticker_path(directory, ticker, ".news.jsonl"), 'w', encoding='utf-8') as f:
+        for ts, headline in sorted(items):
+            f.write(json.dumps({"ts": ts, "headline": headline}) + "\n")
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Deterministic market data read from local files as of a chosen timestamp.
+    Per ticker the directory holds either <ticker>.npy (an OHLCV_DTYPE array,
+    memory-mapped so only the pages around the lookup are read) or
+    <ticker>.parquet (ts/open/high/low/close/volume columns; needs pyarrow),
+    plus an optional <ticker>.news.jsonl of {"ts", "headline"} lines.
+    Lookups return the last bar at or before the replay clock; with no clock
+    set, the latest bar. Nothing after the clock is ever visible. RSI and the
+    other indicators are added by DataFeed's IndicatorEngine.
+    """
+    def __init__(self, path=None, timestamp=None):
+        self.path = path or Config.DATA_REPLAY_PATH
+        self.timestamp = timestamp if timestamp is not None else Config.DATA_REPLAY_TIMESTAMP
+        self._bars = {}
+        self._news = {}
+        self._lock = threading.Lock()
+
+    def set_time(self, timestamp):
+        """Moves the replay clock (epoch seconds, or None for the latest bar)."""
+        self.timestamp = timestamp
+
+    def _load_bars(self, ticker):
+        with self._lock:
+            bars = self._bars.get(ticker)
+            if bars is not None:
+                return bars
+            npy_path = ticker_path(self.path, ticker, ".npy")
+            parquet_path = ticker_path(self.path, ticker, ".parquet")
+            if os.path.exists(npy_path):
+                bars = np.load(npy_path, mmap_mode='r')
+            elif os.path.exists(parquet_path):
+                import pandas as pd
+                try:
+                    frame = pd.read_parquet(parquet_path, columns=list(OHLCV_DTYPE.names))
+                except ImportError as e:
+                    raise RuntimeError(f"Reading {parquet_path} requires pyarrow: {e}")
+                bars = np.sort(frame.to_records(index=False).astype(OHLCV_DTYPE), order='ts')
+            else:
+                raise FileNotFoundError(f"No replay data for {ticker} in {self.path}")
+            self._bars[ticker] = bars
+            return bars
+
+    def _load_news(self, ticker):
+        with self._lock:
+            news = self._news.get(ticker)
+            if news is not None:
+                return news
+            news_path = ticker_path(self.path, ticker, ".news.jsonl")
+            items = []
+            if os.path.exists(news_path):
+                with open(news_path, 'r', encoding='utf-8') as f:
+                    items = sorted(
+                        (item['ts'], item['headline'])
+                        for item in (json.loads(line) for line in f if line.strip())
+                    )
+            news = (np.array([ts for ts, _ in items], dtype=np.float64), [h for _, h in items])
+            self._news[ticker] = news
+            return news
+
+    def _position(self, ts_column):
+        """Index one past the last entry at or before the replay clock."""
+        if self.timestamp is None:
+            return len(ts_column)
+        return int(np.searchsorted(ts_column, self.timestamp, side='right'))
+
+    def get_market_data(self, ticker):
+        bars = self._load_bars(ticker)
+        end = self._position(bars['ts'])
+        if end == 0:
+            raise ValueError(f"No replay data for {ticker} at or before {self.timestamp}")
+
+        bar = bars[end - 1]
+        # Bar closest to 24h earlier, for the same change_24h the live feed reports
+        prior = max(0, int(np.searchsorted(bars['ts'][:end], bar['ts'] - 86400, side='right')) - 1)
+        prior_close = float(bars[prior]['close'])
+        change = (float(bar['close']) / prior_close - 1.0) * 100 if prior_close else 0.0
+
+        return {
+            "ticker": ticker,
+            "timestamp": float(bar['ts']),
+            "price": round(float(bar['close']), 2),
+            "high": float(bar['high']),
+            "low": float(bar['low']),
+            "volume": int(bar['volume']),
+            "change_24h": round(change, 2)
+        }
+
+    def get_history(self, ticker, limit):
+        """The last `limit` bars at or before the replay clock (used to seed indicators)."""
+        bars = self._load_bars(ticker)
+        end = self._position(bars['ts'])
+        return np.array(bars[max(0, end - limit):end])
+
+    def get_news(self, ticker):
+        ts_column, headlines = self._load_news(ticker)
+        end = self._position(ts_column)
+        return headlines[max(0, end - NEWS_LIMIT):end][::-1]
+
+if __name__ == '__main__':
+    # python -m data.replay DIR TICKER [TIMESTAMP] - prints what a debate would see
+    import sys
+    provider = ReplayProvider(sys.argv[1], float(sys.argv[3]) if len(sys.argv) > 3 else None)
+    start = time.perf_counter()
+    print(provider.get_market_data(sys.argv[2]), provider.get_news(sys.argv[2]))
+    print(f"{(time.perf_counter() - start) * 1000:.2f} ms")
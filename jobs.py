@@ -0,0 +1,222 @@
+import ipaddress
+import itertools
+import json
+import queue
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from config import Config
+from utils.ttl_cache import TTLCache
+
+# Lower value runs first
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at JOB_QUEUE_MAX_DEPTH."""
+
+def webhook_url_error(url):
+    """
+    Returns why `url` cannot be a webhook, or None if it can. With
+    JOB_WEBHOOK_ALLOWED_HOSTS set only those hosts pass; otherwise the host
+    must resolve to public addresses only, so a job cannot make the server
+    POST to itself, its private network or a cloud metadata endpoint.
+    """
+    if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+        return "webhook_url must be an http(s) URL"
+    try:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port
+    except ValueError:
+        return "webhook_url is malformed"
+    if not host:
+        return "webhook_url has no host"
+    if Config.JOB_WEBHOOK_ALLOWED_HOSTS:
+        if host.lower() not in Config.JOB_WEBHOOK_ALLOWED_HOSTS:
+            return f"webhook host {host} is not in JOB_WEBHOOK_ALLOWED_HOSTS"
+        return None
+    try:
+        infos = socket.getaddrinfo(host, port or (443 if parts.scheme == 'https' else 80), proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return f"webhook host {host} does not resolve"
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split('%')[0])
+        address = getattr(address, 'ipv4_mapped', None) or address
+        if not address.is_global or address.is_multicast:
+            return f"webhook host {host} resolves to a non-public address ({address})"
+    return None
+
+class JobStore:
+    """
+    Keeps job records for polling. Records always live in a bounded in-process
+    cache; when a RedisClient is given they are mirrored there, so any web worker
+    sharing that Redis can answer status polls. The client may be given as a
+    callable that returns it, so nothing connects before the first job.
+    """
+    KEY_PREFIX = "job:"
+
+    def __init__(self, ttl=None, max_entries=None, redis=None):
+        self.ttl = ttl if ttl is not None else Config.JOB_RESULT_TTL
+        self.local = TTLCache(max_entries=max_entries or Config.JOB_STORE_MAX_ENTRIES, ttl=self.ttl)
+        self._redis = redis
+
+    @property
+    def redis(self):
+        if callable(self._redis):
+            self._redis = self._redis()
+        return self._redis
+
+    def save(self, job):
+        self.local.set(job["job_id"], job)
+        if self.redis is not None:
+            self.redis.set_value(self.KEY_PREFIX + job["job_id"], json.dumps(job, default=str), int(self.ttl))
+
+    def get(self, job_id):
+        job = self.local.get(job_id)
+        if job is None and self.redis is not None:
+            raw = self.redis.get_value(self.KEY_PREFIX + job_id)
+            job = json.loads(raw) if raw is not None else None
+        return job
+
+class JobQueue:
+    """
+    Runs debates in the background so HTTP requests only submit and poll.
+    A fixed pool of worker threads takes jobs from a priority queue (FIFO within
+    a priority). Submissions beyond `max_depth` queued jobs are refused with
+    QueueFullError. When a job finishes its record is updated in the JobStore
+    and, if the job has a webhook URL, POSTed there by a separate small pool,
+    so a slow or dead endpoint never holds up the next debate.
+    """
+    def __init__(self, orchestrator, workers=None, max_depth=None, store=None):
+        self.orchestrator = orchestrator
+        self.max_depth = max_depth or Config.JOB_QUEUE_MAX_DEPTH
+        self.store = store or JobStore()
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.webhooks_pending = 0
+        self._webhooks = ThreadPoolExecutor(max_workers=Config.JOB_WEBHOOK_WORKERS, thread_name_prefix="job-webhook")
+        self.workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers or Config.JOB_WORKERS)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, ticker, priority="normal", webhook_url=None, max_age=None):
+        """Queues a debate and returns its job record immediately."""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "ticker": ticker,
+            "priority": priority,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "webhook_url": webhook_url,
+            "max_age": max_age,
+            "result": None
+        }
+        with self._lock:
+            if self._queue.qsize() >= self.max_depth:
+                self.rejected += 1
+                raise QueueFullError(f"Job queue is full ({self.max_depth} queued)")
+            self.store.save(job)
+            self._queue.put((PRIORITIES[priority], next(self._seq), job))
+        return job
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            with self._lock:
+                self.running += 1
+            job = {**job, "status": "running", "started_at": time.time()}
+            self.store.save(job)
+            try:
+                result = self.orchestrator.run_debate(job["ticker"], max_age=job["max_age"])
+            except Exception as e:
+                result = {"error": "Critical system error", "details": str(e)}
+
+            failed = "error" in result
+            job = {
+                **job,
+                "status": "failed" if failed else "completed",
+                "finished_at": time.time(),
+                "result": result
+            }
+            if job["webhook_url"]:
+                job["webhook_status"] = "pending"
+            self.store.save(job)
+            with self._lock:
+                self.running -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                if job["webhook_url"]:
+                    self.webhooks_pending += 1
+
+            if job["webhook_url"]:
+                self._webhooks.submit(self._notify, job)
+            self._queue.task_done()
+
+    def _notify(self, job):
+        """Delivers one webhook on the webhook pool and records the outcome."""
+        try:
+            status = self._deliver(job)
+        except Exception as e:
+            print(f"Warning: Webhook delivery failed for job {job['job_id']}: {e}")
+            status = f"failed ({e})"
+        self.store.save({**job, "webhook_status": status})
+        with self._lock:
+            self.webhooks_pending -= 1
+
+    def _deliver(self, job):
+        """POSTs the finished job record to its webhook, retrying with backoff. Returns the outcome."""
+        import requests
+        payload = json.dumps(job, default=str)
+        for attempt in range(Config.JOB_WEBHOOK_RETRIES + 1):
+            # Checked again per attempt: the host may resolve differently than at submission
+            error = webhook_url_error(job["webhook_url"])
+            if error:
+                print(f"Warning: Webhook for job {job['job_id']} refused: {error}")
+                return f"refused ({error})"
+            try:
+                response = requests.post(
+                    job["webhook_url"],
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=Config.JOB_WEBHOOK_TIMEOUT,
+                    allow_redirects=False # A redirect could point anywhere
+                )
+                if response.status_code < 500:
+                    return f"delivered ({response.status_code})"
+                error = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                error = str(e)
+            if attempt < Config.JOB_WEBHOOK_RETRIES:
+                time.sleep(2 ** attempt)
+        print(f"Warning: Webhook delivery failed for job {job['job_id']}: {error}")
+        return f"failed ({error})"
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "running": self.running,
+                "workers": len(self.workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "webhooks_pending": self.webhooks_pending
+            }
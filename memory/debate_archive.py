@@ -0,0 +1,218 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from config import Config
+from utils.metrics import REGISTRY, timed
+
+OP_SECONDS = REGISTRY.histogram("debate_archive_op_seconds", "DebateArchive operation latency", ("op",))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS debates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticker TEXT NOT NULL,
+    ts REAL NOT NULL,
+    decision TEXT,
+    confidence REAL,
+    rounds INTEGER,
+    log BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS debates_ticker_ts ON debates (ticker, ts);
+CREATE INDEX IF NOT EXISTS debates_decision_ts ON debates (decision, ts);
+CREATE INDEX IF NOT EXISTS debates_ts ON debates (ts);
+"""
+SUMMARY_COLUMNS = ("id", "ticker", "ts", "decision", "confidence", "rounds")
+
+class DebateArchive:
+    """
+    Append-only archive of full discussion logs in SQLite.
+    Each row keeps the indexed columns (ticker, time, decision) next to the
+    zlib-compressed log, which is only decoded when it is asked for. The
+    database runs in WAL mode, so readers never block the writer and several
+    worker processes can share the file. Pages and iteration are keyset
+    paginated on (ts, id): a page costs the same at row 10 and row 10 million,
+    and nothing beyond one batch is held in memory.
+    """
+    def __init__(self, path=None, compression_level=None):
+        self.path = path or Config.ARCHIVE_PATH
+        self.compression_level = compression_level if compression_level is not None else Config.ARCHIVE_COMPRESSION_LEVEL
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """One connection per thread (and per process after a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _encode(self, discussion_log):
+        raw = json.dumps(discussion_log, separators=(',', ':')).encode('utf-8')
+        return zlib.compress(raw, self.compression_level)
+
+    @staticmethod
+    def _decode(blob):
+        return json.loads(zlib.decompress(blob))
+
+    def _row(self, discussion_log, ts):
+        return (
+            discussion_log.get('ticker') or "",
+            ts if ts is not None else time.time(),
+            discussion_log.get('decision'),
+            discussion_log.get('confidence'),
+            discussion_log.get('rounds'),
+            self._encode(discussion_log)
+        )
+
+    @timed(OP_SECONDS, op="append")
+    def append(self, discussion_log, ts=None):
+        """Archives one discussion_log (timestamped now unless `ts` is given) and returns its id."""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO debates (ticker, ts, decision, confidence, rounds, log) VALUES (?, ?, ?, ?, ?, ?)",
+                self._row(discussion_log, ts)
+            )
+            return cursor.lastrowid
+
+    @timed(OP_SECONDS, op="append_many")
+    def append_many(self, discussion_logs, timestamps=None):
+        """Archives many logs in one transaction, for imports; returns how many were written."""
+        timestamps = timestamps if timestamps is not None else [None] * len(discussion_logs)
+        rows = [self._row(log, ts) for log, ts in zip(discussion_logs, timestamps)]
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO debates (ticker, ts, decision, confidence, rounds, log) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def _record(self, row, full):
+        record = dict(zip(SUMMARY_COLUMNS, row))
+        if full:
+            record["log"] = self._decode(row[len(SUMMARY_COLUMNS)])
+        return record
+
+    def get(self, archive_id):
+        """The full record for one id, or None."""
+        row = self._connection().execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)}, log FROM debates WHERE id = ?", (archive_id,)
+        ).fetchone()
+        return self._record(row, full=True) if row else None
+
+    @staticmethod
+    def _filters(ticker, decision, since, until):
+        clauses, params = [], []
+        if ticker is not None:
+            clauses.append("ticker = ?")
+            params.append(ticker)
+        if decision is not None:
+            clauses.append("decision = ?")
+            params.append(decision)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts <= ?")
+            params.append(until)
+        return clauses, params
+
+    @staticmethod
+    def encode_cursor(ts, archive_id):
+        return f"{ts!r}:{archive_id}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Returns (ts, id) for a cursor from encode_cursor; raises ValueError if it is malformed."""
+        ts, _, archive_id = str(cursor).partition(":")
+        ts = float(ts)
+        if not math.isfinite(ts):
+            raise ValueError(f"cursor timestamp must be finite: {ts!r}")
+        return ts, int(archive_id)
+
+    @timed(OP_SECONDS, op="query")
+    def query(self, ticker=None, decision=None, since=None, until=None, limit=50, cursor=None, full=False):
+        """
+        One page of records, newest first, optionally filtered by ticker,
+        decision and [since, until] (epoch seconds). Records carry the summary
+        columns, plus the decoded `log` when `full` is set.
+        Returns (records, next_cursor); next_cursor is None on the last page.
+        """
+        clauses, params = self._filters(ticker, decision, since, until)
+        if cursor is not None:
+            ts, archive_id = self.decode_cursor(cursor)
+            # (ts, id) < cursor, with a plain bound on ts so the index range starts at the cursor
+            clauses.append("ts <= ? AND (ts < ? OR id < ?)")
+            params.extend([ts, ts, archive_id])
+        columns = ", ".join(SUMMARY_COLUMNS) + (", log" if full else "")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT {columns} FROM debates {where} ORDER BY ts DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        records = [self._record(row, full) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = records[-1]
+            next_cursor = self.encode_cursor(last["ts"], last["id"])
+        return records, next_cursor
+
+    def iter_logs(self, ticker=None, decision=None, since=None, until=None, batch_size=1000):
+        """
+        Streams the decoded discussion logs oldest first, `batch_size` rows per
+        query, e.g. as ReplayEngine input. No read transaction stays open
+        between batches, so a long scan never holds back the writer.
+        """
+        clauses, params = self._filters(ticker, decision, since, until)
+        after = None
+        while True:
+            page_clauses, page_params = list(clauses), list(params)
+            if after is not None:
+                page_clauses.append("ts >= ? AND (ts > ? OR id > ?)")
+                page_params.extend([after[0], after[0], after[1]])
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+            rows = self._connection().execute(
+                f"SELECT ts, id, log FROM debates {where} ORDER BY ts, id LIMIT ?",
+                page_params + [batch_size]
+            ).fetchall()
+            for _, _, blob in rows:
+                yield self._decode(blob)
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][:2]
+
+    def stats(self):
+        row = self._connection().execute("SELECT MAX(id), MIN(ts), MAX(ts) FROM debates").fetchone()
+        return {
+            "path": self.path,
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "last_id": row[0],
+            "oldest_ts": row[1],
+            "newest_ts": row[2]
+        }
+
+if __name__ == '__main__':
+    # python -m memory.debate_archive import logs.jsonl [ARCHIVE_PATH] - bulk-loads one discussion_log per line
+    import sys
+    if len(sys.argv) < 3 or sys.argv[1] != 'import':
+        sys.exit("usage: python -m memory.debate_archive import logs.jsonl [ARCHIVE_PATH]")
+    archive = DebateArchive(sys.argv[3] if len(sys.argv) > 3 else None)
+    batch, total = [], 0
+    with open(sys.argv[2], 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                batch.append(json.loads(line))
+            if len(batch) >= 1000:
+                total += archive.append_many(batch)
+                batch = []
+    total += archive.append_many(batch)
+    print(f"Archived {total} logs into {archive.path}")
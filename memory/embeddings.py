@@ -0,0 +1,147 @@
+import hashlib
+import json
+import numpy as np
+import re
+from abc import ABC, abstractmethod
+from config import Config
+from utils.ttl_cache import TTLCache
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-\.]*")
+
+class BaseEmbedder(ABC):
+    def __init__(self, dimension):
+        self.dimension = dimension
+
+    @abstractmethod
+    def embed_batch(self, items):
+        """
+        Embeds a batch of items (market_data dicts or strings).
+        Returns:
+            np.ndarray: float32 array of shape (len(items), dimension)
+        """
+        pass
+
+    def embed(self, item):
+        return self.embed_batch([item])[0]
+
+class MarketStateEmbedder(BaseEmbedder):
+    """
+    Offline, CPU-only embedder using feature hashing.
+    Numeric market_data fields (nested one level, e.g. indicators) hash by name
+    into a numeric block with signed-log scaling. Ticker, news and other text
+    hash by token into a text block. Each block is L2-normalized and weighted,
+    so similar market states land close together without any model download.
+    """
+    def __init__(self, dimension, numeric_dims=128, numeric_weight=0.8):
+        super().__init__(dimension)
+        self.numeric_dims = numeric_dims
+        self.numeric_weight = numeric_weight
+        self.text_weight = float(np.sqrt(1.0 - numeric_weight ** 2))
+        self._hash_cache = {}
+
+    def _hash(self, token):
+        h = self._hash_cache.get(token)
+        if h is None:
+            h = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+            if len(self._hash_cache) < 100000:
+                self._hash_cache[token] = h
+        return h
+
+    def _features(self, item, row, rows, cols, vals):
+        text_dims = self.dimension - self.numeric_dims
+
+        def add_text(text, weight=1.0, prefix=""):
+            for token in TOKEN_PATTERN.findall(str(text).lower()):
+                h = self._hash(prefix + token)
+                rows.append(row)
+                cols.append(self.numeric_dims + h % text_dims)
+                vals.append(weight if (h >> 63) & 1 else -weight)
+
+        def add_fields(data, prefix=""):
+            for key, value in data.items():
+                if isinstance(value, bool):
+                    value = float(value)
+                if isinstance(value, (int, float)):
+                    rows.append(row)
+                    cols.append(self._hash(prefix + key) % self.numeric_dims)
+                    vals.append(float(value))
+                elif isinstance(value, dict) and not prefix:
+                    add_fields(value, prefix=f"{key}.")
+                elif key == 'ticker':
+                    add_text(value, weight=2.0, prefix="ticker=")
+                elif isinstance(value, str):
+                    add_text(value)
+                elif isinstance(value, (list, tuple)):
+                    for entry in value:
+                        if isinstance(entry, str):
+                            add_text(entry)
+
+        if isinstance(item, dict):
+            add_fields(item)
+        else:
+            add_text(item)
+
+    def embed_batch(self, items):
+        rows, cols, vals = [], [], []
+        for row, item in enumerate(items):
+            self._features(item, row, rows, cols, vals)
+
+        out = np.zeros((len(items), self.dimension), dtype='float32')
+        if rows:
+            rows = np.asarray(rows, dtype=np.int64)
+            cols = np.asarray(cols, dtype=np.int64)
+            vals = np.asarray(vals, dtype=np.float64)
+            numeric = cols < self.numeric_dims
+            # Signed log keeps prices, volumes and oscillators on comparable scales
+            vals[numeric] = np.sign(vals[numeric]) * np.log1p(np.abs(vals[numeric]))
+            np.add.at(out, (rows, cols), vals.astype('float32'))
+
+        for block, weight in ((slice(0, self.numeric_dims), self.numeric_weight),
+                              (slice(self.numeric_dims, None), self.text_weight)):
+            norms = np.linalg.norm(out[:, block], axis=1, keepdims=True)
+            out[:, block] *= weight / np.maximum(norms, 1e-12)
+        return out
+
+class CachedEmbedder(BaseEmbedder):
+    """Wraps an embedder with an LRU cache keyed on the content hash of each item."""
+    def __init__(self, embedder, max_entries=None):
+        super().__init__(embedder.dimension)
+        self.embedder = embedder
+        self.cache = TTLCache(max_entries=max_entries or Config.EMBEDDING_CACHE_SIZE, ttl=0)
+
+    @staticmethod
+    def content_key(item):
+        canonical = json.dumps(item, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def embed_batch(self, items):
+        out = np.empty((len(items), self.dimension), dtype='float32')
+        keys = [self.content_key(item) for item in items]
+        missing = {}
+        for i, key in enumerate(keys):
+            vector = self.cache.get(key)
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                out[i] = vector
+
+        if missing:
+            # Identical items within the batch are embedded once
+            firsts = [positions[0] for positions in missing.values()]
+            vectors = self.embedder.embed_batch([items[i] for i in firsts])
+            for (key, positions), vector in zip(missing.items(), vectors):
+                self.cache.set(key, vector.copy())
+                out[positions] = vector
+        return out
+
+EMBEDDERS = {
+    'market_state': MarketStateEmbedder
+}
+
+def create_embedder(name=None, dimension=None):
+    """Builds the configured embedder, wrapped in a content-hash cache."""
+    name = name or Config.EMBEDDER
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder: {name}")
+    embedder = EMBEDDERS[name](dimension or Config.EMBEDDING_DIM)
+    return CachedEmbedder(embedder) if Config.EMBEDDING_CACHE_SIZE > 0 else embedder
@@ -0,0 +1,126 @@
+import faiss
+import numpy as np
+import time
+from config import Config
+
+INDEX_TYPES = ('flat', 'ivfpq', 'hnsw')
+# Header tags faiss.write_index gives IndexFlat files (L2, inner product, other metrics)
+FLAT_FOURCCS = (b"IxF2", b"IxFI", b"IxFl")
+
+class MappedFlatIndex:
+    """
+    Exact L2 search straight over the memory-mapped rows of a RawVectorFile.
+    Stands in for an IndexFlatL2 (which FAISS always loads into RAM), so a
+    Flat base costs no memory and no load time however many rows it has.
+    add() only advances ntotal: the rows must already be in the file.
+    """
+    def __init__(self, vectors, ntotal=0):
+        self.vectors = vectors
+        self.d = vectors.dimension
+        self.ntotal = ntotal
+
+    def add(self, x):
+        if self.ntotal + len(x) > len(self.vectors):
+            raise ValueError("Rows must be in the raw vector file before they are added")
+        self.ntotal += len(x)
+
+    def search(self, x, k):
+        return faiss.knn(np.ascontiguousarray(x, dtype='float32'), self.vectors.array[:self.ntotal], k)
+
+def is_flat_index_file(path):
+    """True if `path` holds an IndexFlat written by faiss.write_index."""
+    with open(path, 'rb') as f:
+        return f.read(4) in FLAT_FOURCCS
+
+def index_kind(index):
+    """Returns the INDEX_TYPES name of a FAISS index."""
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    if isinstance(index, faiss.IndexIVF):
+        return 'ivfpq'
+    return 'flat'
+
+def build_index(kind, dimension, vectors):
+    """
+    Builds an index of the given kind over `vectors`, training it first when needed.
+    IVF-PQ sizes its coarse quantizer to the data (about 4*sqrt(n) lists, capped
+    by VECTOR_IVF_NLIST) and trains on a bounded sample.
+    """
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {kind}")
+    vectors = np.ascontiguousarray(vectors, dtype='float32')
+
+    if kind == 'flat':
+        index = faiss.IndexFlatL2(dimension)
+    elif kind == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, Config.VECTOR_HNSW_M)
+        index.hnsw.efConstruction = Config.VECTOR_HNSW_EF_CONSTRUCTION
+    else:
+        nlist = max(1, min(Config.VECTOR_IVF_NLIST, int(4 * np.sqrt(len(vectors)))))
+        quantizer = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, Config.VECTOR_PQ_M, 8)
+        sample_size = min(len(vectors), max(256 * nlist, 10000))
+        sample = vectors[np.random.default_rng(0).choice(len(vectors), sample_size, replace=False)]
+        index.train(sample)
+
+    if len(vectors):
+        index.add(vectors)
+    configure_search(index)
+    return index
+
+def configure_search(index):
+    """Applies the configured search-time parameters (nprobe, efSearch)."""
+    kind = index_kind(index)
+    if kind == 'ivfpq':
+        faiss.extract_index_ivf(index).nprobe = Config.VECTOR_IVF_NPROBE
+    elif kind == 'hnsw':
+        index.hnsw.efSearch = Config.VECTOR_HNSW_EF_SEARCH
+    return index
+
+def recall_report(index, vectors, queries, k=10):
+    """
+    Compares `index` against exact search over the original `vectors`.
+    Returns recall@k and per-query latency percentiles (ms) for both.
+    """
+    queries = np.ascontiguousarray(queries, dtype='float32')
+
+    def timed(search):
+        latencies, ids = [], []
+        for q in queries:
+            start = time.perf_counter()
+            ids.append(search(q.reshape(1, -1)))
+            latencies.append((time.perf_counter() - start) * 1000)
+        return np.vstack(ids), np.array(latencies)
+
+    exact_ids, exact_ms = timed(lambda q: faiss.knn(q, vectors, k)[1])
+    approx_ids, approx_ms = timed(lambda q: index.search(q, k)[1])
+    hits = sum(len(np.intersect1d(a[a >= 0], e)) for a, e in zip(approx_ids, exact_ids))
+
+    def percentiles(ms):
+        return {"p50": float(np.percentile(ms, 50)), "p99": float(np.percentile(ms, 99))}
+
+    return {
+        "index_type": index_kind(index),
+        "ntotal": int(index.ntotal),
+        "k": k,
+        "queries": len(queries),
+        "recall_at_k": hits / float(exact_ids.size) if exact_ids.size else 1.0,
+        "latency_ms": percentiles(approx_ms),
+        "exact_latency_ms": percentiles(exact_ms)
+    }
+
+if __name__ == '__main__':
+    # Synthetic report: python -m memory.index_factory [n_vectors]
+    import json
+    import sys
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    dimension = Config.EMBEDDING_DIM
+    rng = np.random.default_rng(42)
+    data = rng.standard_normal((n, dimension)).astype('float32')
+    queries = data[rng.choice(n, 200, replace=False)] + 0.05 * rng.standard_normal((200, dimension)).astype('float32')
+    for kind in INDEX_TYPES:
+        start = time.perf_counter()
+        index = build_index(kind, dimension, data)
+        report = recall_report(index, data, queries)
+        report["build_seconds"] = time.perf_counter() - start
+        print(json.dumps(report))
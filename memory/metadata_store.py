@@ -0,0 +1,121 @@
+import json
+import mmap
+import numpy as np
+import os
+import pickle
+import threading
+
+class MetadataStore:
+    """
+    Append-only metadata records kept on disk as a string blob plus an offsets file.
+    `<base>.blob` holds the JSON-encoded records back to back and `<base>.offsets`
+    holds the end offset of each record as uint64. Both are memory-mapped, so
+    opening the store costs O(1) and a record is only decoded when it is read.
+    """
+    def __init__(self, base_path):
+        self.blob_path = base_path + ".blob"
+        self.offsets_path = base_path + ".offsets"
+        self._lock = threading.Lock()
+        self._offsets = None
+        self._blob = None
+        self._blob_file = None
+        self._repair()
+        self._map()
+
+    def _repair(self):
+        """Drops partially written records left behind by a crash during append."""
+        if not os.path.exists(self.offsets_path):
+            return
+        size = os.path.getsize(self.offsets_path)
+        if size % 8:
+            with open(self.offsets_path, 'r+b') as f:
+                f.truncate(size - size % 8)
+            size -= size % 8
+        end = 0
+        if size:
+            with open(self.offsets_path, 'rb') as f:
+                f.seek(size - 8)
+                end = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+        if os.path.exists(self.blob_path) and os.path.getsize(self.blob_path) > end:
+            with open(self.blob_path, 'r+b') as f:
+                f.truncate(end)
+
+    def _map(self):
+        self._close_maps()
+        # Whole offsets only: a writer that died mid-append may have left a torn one
+        count = os.path.getsize(self.offsets_path) // 8 if os.path.exists(self.offsets_path) else 0
+        if count:
+            self._offsets = np.memmap(self.offsets_path, dtype='<u8', mode='r', shape=(count,))
+            self._blob_file = open(self.blob_path, 'rb')
+            if os.path.getsize(self.blob_path):
+                self._blob = mmap.mmap(self._blob_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close_maps(self):
+        self._offsets = None
+        if self._blob is not None:
+            self._blob.close()
+            self._blob = None
+        if self._blob_file is not None:
+            self._blob_file.close()
+            self._blob_file = None
+
+    def refresh(self):
+        """Remaps the files to pick up records appended by another process."""
+        with self._lock:
+            self._map()
+
+    def repair(self):
+        """
+        Drops what another writer left half-written, then remaps. Writers call
+        it before appending, with every other writer locked out.
+        """
+        with self._lock:
+            self._close_maps()
+            self._repair()
+            self._map()
+
+    def __len__(self):
+        offsets = self._offsets
+        return 0 if offsets is None else len(offsets)
+
+    def get(self, i):
+        """Decodes and returns record i."""
+        with self._lock:
+            if i < 0 or i >= len(self):
+                raise IndexError(i)
+            start = int(self._offsets[i - 1]) if i else 0
+            end = int(self._offsets[i])
+            return json.loads(self._blob[start:end].decode('utf-8')) if end > start else None
+
+    def append_many(self, records):
+        """Appends records durably: blob first, then offsets, so a crash never exposes a partial record."""
+        if not records:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.blob_path) or '.', exist_ok=True)
+            end = int(self._offsets[-1]) if len(self) else 0
+            ends = []
+            with open(self.blob_path, 'ab') as f:
+                for record in records:
+                    encoded = json.dumps(record).encode('utf-8')
+                    f.write(encoded)
+                    end += len(encoded)
+                    ends.append(end)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.offsets_path, 'ab') as f:
+                f.write(np.array(ends, dtype='<u8').tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._map()
+
+    @classmethod
+    def migrate_pickle(cls, pickle_path, base_path):
+        """Converts a legacy pickled metadata list into the compact format and removes it."""
+        store = cls(base_path)
+        if os.path.exists(pickle_path):
+            with open(pickle_path, 'rb') as f:
+                records = pickle.load(f)
+            store.append_many(records[len(store):])
+            os.remove(pickle_path)
+        return store
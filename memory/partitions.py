@@ -0,0 +1,137 @@
+import numpy as np
+import os
+import threading
+
+class PartitionIndex:
+    """
+    Ticker and timestamp keys aligned with vector ids, used to restrict searches.
+    `<base>.keys` is a memory-mapped array of (ticker id, timestamp) rows and
+    `<base>.tickers` lists the interned ticker names, one per line. Per-ticker id
+    arrays are grouped once at load and extended on append and refresh.
+    """
+    KEY_DTYPE = np.dtype([('ticker', '<u4'), ('ts', '<f8')])
+
+    def __init__(self, base_path):
+        self.keys_path = base_path + ".keys"
+        self.tickers_path = base_path + ".tickers"
+        self._lock = threading.Lock()
+        self.tickers = []
+        self.ticker_ids = {}
+        self._keys = None
+        self._partitions = {}
+        self._load()
+
+    def _load(self):
+        self._repair()
+        if os.path.exists(self.tickers_path):
+            with open(self.tickers_path, 'rb') as f:
+                self.tickers = f.read().decode('utf-8').splitlines()
+            self.ticker_ids = {t: i for i, t in enumerate(self.tickers)}
+        self._map()
+        if len(self._keys):
+            self._group(0, np.asarray(self._keys['ticker']))
+
+    def _repair(self):
+        """Drops a partially written name or key left behind by a crash during append."""
+        if os.path.exists(self.tickers_path):
+            with open(self.tickers_path, 'rb') as f:
+                data = f.read()
+            complete = data.rfind(b'\n') + 1
+            if complete < len(data):
+                # No key references a partially written name yet
+                with open(self.tickers_path, 'r+b') as f:
+                    f.truncate(complete)
+        if os.path.exists(self.keys_path):
+            size = os.path.getsize(self.keys_path)
+            if size % self.KEY_DTYPE.itemsize:
+                with open(self.keys_path, 'r+b') as f:
+                    f.truncate(size - size % self.KEY_DTYPE.itemsize)
+
+    def _group(self, start, ticker_col):
+        """Adds ids start.. (one per entry of ticker_col) to the per-ticker id arrays."""
+        order = np.argsort(ticker_col, kind='stable')
+        groups, starts = np.unique(ticker_col[order], return_index=True)
+        for tid, ids in zip(groups, np.split(order, starts[1:])):
+            new_ids = start + ids.astype(np.int64)
+            current = self._partitions.get(int(tid))
+            self._partitions[int(tid)] = new_ids if current is None else np.concatenate([current, new_ids])
+
+    def _map(self):
+        # Whole keys only: a writer that died mid-append may have left a torn one
+        rows = os.path.getsize(self.keys_path) // self.KEY_DTYPE.itemsize if os.path.exists(self.keys_path) else 0
+        if rows:
+            self._keys = np.memmap(self.keys_path, dtype=self.KEY_DTYPE, mode='r', shape=(rows,))
+        else:
+            self._keys = np.empty(0, dtype=self.KEY_DTYPE)
+
+    def refresh(self):
+        """Picks up ticker names and keys appended by another process since the last load."""
+        with self._lock:
+            self._refresh()
+
+    def repair(self):
+        """Drops what another writer left half-written, then refreshes; see MetadataStore.repair."""
+        with self._lock:
+            self._repair()
+            self._refresh()
+
+    def _refresh(self):
+        if os.path.exists(self.tickers_path):
+            with open(self.tickers_path, 'rb') as f:
+                data = f.read()
+            for ticker in data[:data.rfind(b'\n') + 1].decode('utf-8').splitlines()[len(self.tickers):]:
+                self.ticker_ids[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+        start = len(self._keys)
+        self._map()
+        if len(self._keys) > start:
+            self._group(start, np.asarray(self._keys['ticker'][start:]))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def append_many(self, keys):
+        """Appends (ticker, timestamp) keys for the next vector ids."""
+        if not keys:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.keys_path) or '.', exist_ok=True)
+            new_tickers = []
+            rows = np.empty(len(keys), dtype=self.KEY_DTYPE)
+            for i, (ticker, ts) in enumerate(keys):
+                ticker = ticker or ""
+                if ticker not in self.ticker_ids:
+                    self.ticker_ids[ticker] = len(self.tickers)
+                    self.tickers.append(ticker)
+                    new_tickers.append(ticker)
+                rows[i] = (self.ticker_ids[ticker], ts or 0.0)
+
+            # Ticker names first so persisted keys never point at an unknown name
+            if new_tickers:
+                with open(self.tickers_path, 'a', encoding='utf-8') as f:
+                    f.write("".join(f"{t}\n" for t in new_tickers))
+                    f.flush()
+                    os.fsync(f.fileno())
+            start = len(self._keys)
+            with open(self.keys_path, 'ab') as f:
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._map()
+            self._group(start, rows['ticker'])
+
+    def ids_for(self, ticker, start_ts=None, end_ts=None):
+        """Returns the vector ids stored for a ticker, optionally within [start_ts, end_ts]."""
+        tid = self.ticker_ids.get(ticker)
+        ids = self._partitions.get(tid) if tid is not None else None
+        if ids is None:
+            return np.empty(0, dtype=np.int64)
+        if start_ts is not None or end_ts is not None:
+            ts = self._keys['ts'][ids]
+            mask = np.ones(len(ids), dtype=bool)
+            if start_ts is not None:
+                mask &= ts >= start_ts
+            if end_ts is not None:
+                mask &= ts <= end_ts
+            ids = ids[mask]
+        return ids
@@ -1,28 +1,94 @@
-from memory.redis_client import RedisClient
-from memory.vector_store import VectorStore
+from config import Config
 import json
+import threading
+import time
 
 class RAGEngine:
-    def __init__(self):
-        self.redis = RedisClient()
-        self.vector_store = VectorStore()
+    """
+    Redis short-term memory, the FAISS long-term store and the debate archive
+    of full discussion logs (when ARCHIVE_ENABLED).
+    Each backend is imported and opened on first use (or by warm_up), so
+    constructing the engine does not pay for faiss, the index load or a
+    Redis round-trip. Any backend can be passed in ready-made instead.
+    """
+    def __init__(self, embedder=None, redis=None, vector_store=None, archive=None):
+        self._redis = redis
+        self._vector_store = vector_store
+        self._embedder = embedder
+        self._archive = archive
+        self._lock = threading.RLock()
 
-    def get_context(self, ticker):
+    @property
+    def redis(self):
+        if self._redis is None:
+            with self._lock:
+                if self._redis is None:
+                    from memory.redis_client import RedisClient
+                    self._redis = RedisClient()
+        return self._redis
+
+    @property
+    def vector_store(self):
+        if self._vector_store is None:
+            with self._lock:
+                if self._vector_store is None:
+                    from memory.vector_store import VectorStore
+                    self._vector_store = VectorStore()
+        return self._vector_store
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            with self._lock:
+                if self._embedder is None:
+                    from memory.embeddings import create_embedder
+                    self._embedder = create_embedder(dimension=self.vector_store.dimension)
+        return self._embedder
+
+    @property
+    def archive(self):
+        if self._archive is None:
+            with self._lock:
+                if self._archive is None:
+                    from memory.debate_archive import DebateArchive
+                    self._archive = DebateArchive()
+        return self._archive
+
+    def loaded(self):
+        """Which backends have been initialized so far."""
+        return {
+            "redis": self._redis is not None,
+            "vector_store": self._vector_store is not None,
+            "embedder": self._embedder is not None,
+            "archive": self._archive is not None
+        }
+
+    def warm_up(self):
+        """Connects to Redis, loads the index and primes the embedder."""
+        self.redis
+        self.vector_store
+        self.embedder.embed({"ticker": "WARMUP"})
+
+    def get_context(self, ticker, market_data=None):
         """
         Retrieves relevant context for the debate.
         Combines short-term memory (Redis) and long-term memory (Vector Store).
         """
         context = []
         
-        # 1. Short-term: Recent discussion for this ticker
-        recent = self.redis.get_discussion(ticker)
+        # 1. Short-term: Recent discussion for this ticker (summary only, not the full log)
+        recent = self.redis.get_summary(ticker)
         if recent:
             context.append(f"Recent Discussion (Last 1h): {recent['decision']} with confidence {recent['confidence']}")
 
-        # 2. Long-term: Similar past situations (Mock embedding for now)
-        # In real app, we'd embed the current market state
-        mock_query_vector = [0.1] * 768 
-        similar_memories = self.vector_store.search_memory(mock_query_vector)
+        # 2. Long-term: Similar past situations, matched on the current market state
+        query_vector = self.embedder.embed(market_data or {"ticker": ticker})
+        start_ts = time.time() - Config.RAG_LOOKBACK_DAYS * 86400 if Config.RAG_LOOKBACK_DAYS > 0 else None
+        similar_memories = self.vector_store.search_memory(
+            query_vector,
+            ticker=ticker if Config.RAG_PARTITION_BY_TICKER else None,
+            start_ts=start_ts
+        )
         
         if similar_memories:
             context.append("Similar Past Situations:")
@@ -33,14 +99,26 @@ class RAGEngine:
 
     def store_experience(self, ticker, discussion_log):
         """
-        Stores the experience in both short-term and long-term memory.
+        Stores the experience in long-term memory. The write only appends to the
+        vector store's journal; compaction happens on its flusher thread.
         """
-        # Short-term
-        self.redis.store_discussion(ticker, discussion_log)
-        
-        # Long-term
         # Create a text summary to embed
         summary = f"Ticker: {ticker}, Decision: {discussion_log['decision']}, Confidence: {discussion_log['confidence']}"
-        # Mock embedding
-        mock_vector = [0.1] * 768 
-        self.vector_store.add_memory(mock_vector, summary)
+        # Key the memory on the market state the decision was made in
+        vector = self.embedder.embed(discussion_log.get('market_data') or {"ticker": ticker})
+        self.vector_store.add_memory(vector, summary, ticker=ticker, timestamp=time.time())
+
+    def record_discussion(self, ticker, discussion_log):
+        """
+        Persists the full log in short-term memory and the debate archive. Called
+        once the log is final, after store_experience, so stored logs carry the
+        complete timing breakdown.
+        """
+        self.redis.store_discussion(ticker, discussion_log)
+
+        # Full log, for /history and replays
+        if Config.ARCHIVE_ENABLED:
+            try:
+                self.archive.append(discussion_log)
+            except Exception as e:
+                print(f"Warning: Failed to archive discussion log: {e}")
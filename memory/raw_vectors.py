@@ -0,0 +1,65 @@
+import numpy as np
+import os
+import threading
+
+class RawVectorFile:
+    """
+    Append-only float32 matrix on disk, memory-mapped for reads.
+    Keeps the original vectors next to the FAISS index so compressed indexes
+    (IVF-PQ) can be retrained and compared against exact search.
+    """
+    def __init__(self, path, dimension):
+        self.path = path
+        self.dimension = dimension
+        self.row_size = dimension * 4
+        self._lock = threading.Lock()
+        self._array = None
+        self._repair()
+        self._map()
+
+    def _repair(self):
+        """Drops a partially written row left behind by a crash during append."""
+        if os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+            if size % self.row_size:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(size - size % self.row_size)
+
+    def _map(self):
+        # Whole rows only: a writer that died mid-append may have left a torn one
+        rows = os.path.getsize(self.path) // self.row_size if os.path.exists(self.path) else 0
+        if rows:
+            self._array = np.memmap(self.path, dtype='float32', mode='r', shape=(rows, self.dimension))
+        else:
+            self._array = np.empty((0, self.dimension), dtype='float32')
+
+    def refresh(self):
+        """Remaps the file to pick up rows appended by another process."""
+        with self._lock:
+            self._map()
+
+    def repair(self):
+        """Drops a row another writer left half-written, then remaps; see MetadataStore.repair."""
+        with self._lock:
+            self._repair()
+            self._map()
+
+    def __len__(self):
+        return len(self._array)
+
+    @property
+    def array(self):
+        """Read-only (n, dimension) view of all stored vectors."""
+        return self._array
+
+    def append(self, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        if not len(vectors):
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._map()
@@ -1,55 +1,221 @@
 import redis
 import json
+import threading
+import time
+import zlib
 from config import Config
+from utils.circuit_breaker import CircuitBreaker
+from utils.metrics import REGISTRY
+from utils.ttl_cache import TTLCache
 
-class RedisClient:
-    def __init__(self):
-        self.use_mock = False
-        self.mock_storage = {}
-        try:
-            self.client = redis.Redis(
+DISCUSSION_TTL = 3600
+# Compressed payloads are tagged so plain-JSON values written by older versions still decode
+COMPRESSED_MAGIC = b'Z1:'
+
+OP_SECONDS = REGISTRY.histogram("redis_op_seconds", "Short-term memory operation latency", ("op", "backend"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Returns the process-wide connection pool shared by every RedisClient."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = redis.ConnectionPool(
                 host=Config.REDIS_HOST,
                 port=Config.REDIS_PORT,
                 db=Config.REDIS_DB,
-                decode_responses=True
+                max_connections=Config.REDIS_MAX_CONNECTIONS,
+                # Bounded timeouts keep a hung server from stalling requests and probes
+                socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT,
+                socket_timeout=Config.REDIS_SOCKET_TIMEOUT
             )
+        return _pool
+
+def encode_payload(data):
+    """Serializes to compact JSON and zlib-compresses it."""
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return COMPRESSED_MAGIC + zlib.compress(raw, Config.REDIS_COMPRESSION_LEVEL)
+
+def decode_payload(blob):
+    if blob is None:
+        return None
+    if isinstance(blob, str):
+        blob = blob.encode('utf-8')
+    if blob.startswith(COMPRESSED_MAGIC):
+        blob = zlib.decompress(blob[len(COMPRESSED_MAGIC):])
+    return json.loads(blob)
+
+def summarize_discussion(discussion_data):
+    """The small summary hash stored next to the full log."""
+    return {
+        "decision": discussion_data.get('decision', 'HOLD'),
+        "confidence": discussion_data.get('confidence', 0.0),
+        "rounds": discussion_data.get('rounds', 0),
+        "timestamp": time.time()
+    }
+
+def _parse_summary(raw):
+    if not raw:
+        return None
+    raw = {(k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v) for k, v in raw.items()}
+    return {
+        "decision": raw.get('decision', 'HOLD'),
+        "confidence": float(raw.get('confidence', 0.0)),
+        "rounds": int(raw.get('rounds', 0)),
+        "timestamp": float(raw.get('timestamp', 0.0))
+    }
+
+class RedisClient:
+    """
+    Redis-backed short-term memory with a circuit breaker.
+    While Redis is unreachable, operations are served by a bounded in-process
+    LRU that honors the same TTLs, and half-open probes reconnect on their own
+    once Redis is back. Values written during an outage stay readable locally.
+    `client` replaces the pooled connection (any object with the redis-py API,
+    e.g. the in-memory fake used by the benchmarks).
+    """
+    def __init__(self, client=None):
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.REDIS_BREAKER_FAILURES,
+            reset_timeout=Config.REDIS_BREAKER_RESET
+        )
+        self.fallback = TTLCache(max_entries=Config.REDIS_FALLBACK_MAX_ENTRIES, ttl=DISCUSSION_TTL)
+        self.fallback_ops = 0
+        self.client = client if client is not None else redis.Redis(connection_pool=get_connection_pool())
+        try:
             self.client.ping()
-        except redis.ConnectionError:
-            print("⚠️ Redis connection failed. Using in-memory mock.")
-            self.use_mock = True
+        except (redis.ConnectionError, redis.TimeoutError):
+            print("⚠️ Redis connection failed. Using in-memory fallback until it recovers.")
+            self.breaker.trip()
+
+    @property
+    def use_mock(self):
+        """True while requests are being served by the in-process fallback."""
+        return self.breaker.state != CircuitBreaker.CLOSED
+
+    def _call(self, op, redis_op, fallback_op):
+        """Runs redis_op through the circuit breaker, or fallback_op when Redis is unavailable."""
+        if self.breaker.allow():
+            start = time.perf_counter()
+            try:
+                result = redis_op()
+                self.breaker.record_success()
+                return result
+            except (redis.ConnectionError, redis.TimeoutError):
+                self.breaker.record_failure()
+            except Exception:
+                # The server answered, so the connection itself is healthy
+                self.breaker.record_success()
+                raise
+            finally:
+                OP_SECONDS.observe(time.perf_counter() - start, op=op, backend="redis")
+        self.fallback_ops += 1
+        with OP_SECONDS.time(op=op, backend="fallback"):
+            return fallback_op()
+
+    @staticmethod
+    def _keys(ticker):
+        return f"discussion:{ticker}", f"discussion:{ticker}:summary"
 
     def store_discussion(self, ticker, discussion_data):
-        """Stores the discussion log for a specific ticker with 1 hour expiry."""
-        if self.use_mock:
-            self.mock_storage[f"discussion:{ticker}"] = json.dumps(discussion_data)
-            return
-            
-        key = f"discussion:{ticker}"
-        try:
-            self.client.setex(key, 3600, json.dumps(discussion_data))
-        except redis.ConnectionError:
-            self.use_mock = True
-            self.mock_storage[key] = json.dumps(discussion_data)
+        """Stores the compressed discussion log and its summary for a ticker with 1 hour expiry."""
+        self.store_discussions({ticker: discussion_data})
+
+    def store_discussions(self, discussions):
+        """Stores {ticker: discussion_log} for many tickers in one pipelined round-trip."""
+        encoded = {}
+        for ticker, data in discussions.items():
+            key, summary_key = self._keys(ticker)
+            encoded[key] = encode_payload(data)
+            encoded[summary_key] = summarize_discussion(data)
+
+        def to_redis():
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in encoded.items():
+                if isinstance(value, dict):
+                    pipe.hset(key, mapping=value)
+                    pipe.expire(key, DISCUSSION_TTL)
+                else:
+                    pipe.setex(key, DISCUSSION_TTL, value)
+            pipe.execute()
+
+        def to_fallback():
+            for key, value in encoded.items():
+                self.fallback.set(key, value, DISCUSSION_TTL)
+
+        self._call("store", to_redis, to_fallback)
 
     def get_discussion(self, ticker):
-        """Retrieves the recent discussion for a ticker."""
-        key = f"discussion:{ticker}"
-        if self.use_mock:
-            data = self.mock_storage.get(key)
-            return json.loads(data) if data else None
-            
-        try:
-            data = self.client.get(key)
-            return json.loads(data) if data else None
-        except redis.ConnectionError:
-            self.use_mock = True
-            data = self.mock_storage.get(key)
-            return json.loads(data) if data else None
+        """Retrieves the recent full discussion log for a ticker."""
+        return self.get_discussions([ticker])[ticker]
+
+    def get_discussions(self, tickers):
+        """Retrieves {ticker: discussion_log or None} for many tickers in one round-trip."""
+        keys = [self._keys(t)[0] for t in tickers]
+        blobs = self._call(
+            "get",
+            lambda: self.client.mget(keys),
+            lambda: [None] * len(keys)
+        )
+        # Logs written during an outage only exist locally
+        blobs = [b if b is not None else self.fallback.get(k) for k, b in zip(keys, blobs)]
+        return {t: decode_payload(b) for t, b in zip(tickers, blobs)}
+
+    def get_summary(self, ticker):
+        """
+        Retrieves only the decision/confidence/rounds/timestamp summary of the
+        recent discussion, without transferring or parsing the full log.
+        """
+        return self.get_summaries([ticker])[ticker]
+
+    def get_summaries(self, tickers):
+        """Retrieves {ticker: summary or None} for many tickers in one pipelined round-trip."""
+        keys = [self._keys(t)[1] for t in tickers]
+
+        def from_redis():
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            return [_parse_summary(raw) for raw in pipe.execute()]
+
+        summaries = self._call("get_summary", from_redis, lambda: [None] * len(keys))
+        return {
+            t: s if s is not None else self.fallback.get(k)
+            for t, k, s in zip(tickers, keys, summaries)
+        }
+
+    def get_value(self, key):
+        """Retrieves a raw string value by key."""
+        value = self._call("get_value", lambda: self.client.get(key), lambda: None)
+        if value is None:
+            return self.fallback.get(key)
+        return value.decode('utf-8')
+
+    def set_value(self, key, value, ttl):
+        """Stores a raw string value with an expiry in seconds."""
+        self._call(
+            "set_value",
+            lambda: self.client.setex(key, ttl, value),
+            lambda: self.fallback.set(key, value, ttl)
+        )
 
     def check_connection(self):
-        if self.use_mock:
+        if not self.breaker.allow():
             return False
         try:
-            return self.client.ping()
-        except redis.ConnectionError:
+            result = self.client.ping()
+            self.breaker.record_success()
+            return result
+        except (redis.ConnectionError, redis.TimeoutError):
+            self.breaker.record_failure()
             return False
+
+    def stats(self):
+        """Circuit breaker state, time spent on the fallback, and fallback cache usage."""
+        return {
+            "breaker": self.breaker.stats(),
+            "fallback_ops": self.fallback_ops,
+            "fallback_cache": self.fallback.stats()
+        }
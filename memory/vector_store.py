@@ -1,57 +1,582 @@
+import atexit
 import faiss
+import json
 import numpy as np
 import os
-import pickle
+import re
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager, nullcontext
 from config import Config
+from memory.index_factory import MappedFlatIndex, build_index, configure_search, index_kind, is_flat_index_file, recall_report
+from memory.metadata_store import MetadataStore
+from memory.partitions import PartitionIndex
+from memory.raw_vectors import RawVectorFile
+from utils.metrics import REGISTRY, timed
+
+# Journal record header: sequence number, metadata length, CRC32 of the payload
+JOURNAL_HEADER = struct.Struct('<QII')
+
+OP_SECONDS = REGISTRY.histogram("vector_store_op_seconds", "VectorStore operation latency", ("op",))
 
 class VectorStore:
+    """
+    Long-term memory made of a base index plus an in-memory delta.
+    New memories go to the journal and the delta until the flusher thread
+    compacts them: the delta is appended to the side files and added to the
+    base index, O(delta) per compaction. Metadata records are decoded lazily
+    from a memory-mapped MetadataStore. The raw vector file is the commit point
+    of a compaction. A Flat base is searched straight over the memory-mapped
+    raw vectors (MappedFlatIndex), so it is neither loaded nor held in RAM and
+    has no index file. An ANN base lives in memory; its index file is only a
+    checkpoint, rewritten geometrically (VECTOR_CHECKPOINT_GROWTH), and loading
+    adds the rows compacted after it from the raw vectors.
+    The base starts as an exact Flat index and is rebuilt in the background as
+    VECTOR_INDEX_TYPE (IVF-PQ or HNSW) once it holds VECTOR_ANN_THRESHOLD vectors.
+    Each memory is keyed by ticker and timestamp so searches can be restricted
+    to one ticker's partition.
+    With VECTOR_MULTIPROCESS, worker processes share the files: writers take an
+    exclusive file lock and catch up with the journal before appending, every
+    compaction bumps the version file, and readers re-read only the new journal
+    tail unless the version changed. After a compaction they add the newly
+    compacted rows to their own index; only an index swap (a rebuild) makes
+    them read the index file again.
+    """
     def __init__(self):
         self.index_path = Config.VECTOR_DB_PATH
-        self.dimension = 768 # Assuming standard embedding size
-        self.index = None
-        self.metadata = [] # To store actual text/context associated with vectors
-        self._load_or_create_index()
+        self.journal_path = self.index_path + ".journal"
+        self.version_path = self.index_path + ".version"
+        self.dimension = Config.EMBEDDING_DIM
+        self.index = None # Base index; compactions add to it in place
+        # Side files aligned with vector ids. The raw vectors are appended last,
+        # so metadata and partitions are each at least as long as they are.
+        self.metadata = None # Compact on-disk metadata
+        self.vectors = None # Original vectors, for rebuilds and exact partition search
+        self.partitions = None # Ticker/timestamp keys
+        self.index_type = Config.VECTOR_INDEX_TYPE
+        self.ann_threshold = Config.VECTOR_ANN_THRESHOLD
+        self.partition_exact_max = Config.VECTOR_PARTITION_EXACT_MAX
+        self.checkpoint_growth = Config.VECTOR_CHECKPOINT_GROWTH
+        self.flush_batch = Config.VECTOR_FLUSH_BATCH
+        self.flush_interval = Config.VECTOR_FLUSH_INTERVAL
+        self.fsync = Config.VECTOR_JOURNAL_FSYNC
+        self.refresh_interval = Config.VECTOR_REFRESH_INTERVAL
+        self._lock = threading.RLock()
+        self._file_lock = None
+        self._rebuild_lock = None
+        if Config.VECTOR_MULTIPROCESS:
+            # Imported here so single-process stores don't depend on fcntl
+            from utils.file_lock import FileLock
+            self._file_lock = FileLock(self.index_path + ".lock")
+            self._rebuild_lock = FileLock(self.index_path + ".rebuild.lock")
+        # Memories with ids >= index.ntotal, not yet compacted into the base index
+        self._delta = np.empty((0, self.dimension), dtype='float32')
+        self._delta_meta = []
+        self._delta_keys = [] # (ticker, timestamp)
+        self._journal = None
+        self._journal_offset = 0 # Journal bytes already applied to the delta
+        self._generation = 0 # Compactions seen, per the version file
+        self._swap_generation = 0 # Generation of the last index swap seen
+        self._last_refresh = 0.0
+        self._rebuilding = False
+        self._checkpoint_ntotal = 0 # Vectors in the index file
+        self._index_version = 0 # Bumped whenever self.index is replaced (not added to)
+        with self._locked():
+            self._load_or_create_index()
+            self._replay_journal()
+            self._generation, self._swap_generation = self._read_generation()
+
+        # Compaction never runs on the request path: adds only wake the flusher thread
+        self._flush_wanted = threading.Event()
+        threading.Thread(target=self._flush_in_background, name="vector-flush", daemon=True).start()
+        atexit.register(self.flush)
+
+    @property
+    def ntotal(self):
+        return self.index.ntotal + len(self._delta)
+
+    @contextmanager
+    def _locked(self, exclusive=True):
+        """Holds the thread lock and, in multi-process mode, the store's file lock."""
+        with self._lock:
+            with self._file_lock.hold(exclusive=exclusive) if self._file_lock else nullcontext():
+                yield
+
+    def _read_generation(self):
+        """Returns (generation, generation of the last index swap) from the version file."""
+        try:
+            with open(self.version_path) as f:
+                fields = f.read().split()
+        except FileNotFoundError:
+            return 0, 0
+        generation = int(fields[0]) if fields else 0
+        # Version files from before swaps were recorded: every bump may have been one
+        return generation, int(fields[1]) if len(fields) > 1 else generation
+
+    def _bump_generation(self, swap=False):
+        """
+        Tells other processes that the base files changed (multi-process mode
+        only); `swap` records that the index itself was replaced, not added to.
+        """
+        if self._file_lock is None:
+            return
+        self._generation += 1
+        if swap:
+            self._swap_generation = self._generation
+        with open(self.version_path + ".tmp", 'w') as f:
+            f.write(f"{self._generation} {self._swap_generation}")
+        os.replace(self.version_path + ".tmp", self.version_path)
+
+    def _catch_up(self):
+        """
+        Applies writes made by other processes; the file lock must be held.
+        A new version means another process compacted: the rows it compacted
+        are added to the index in place and the journal is read again from the
+        start. The index file is only read again after a swap. Otherwise only
+        the records appended since the last call are read.
+        """
+        if self._file_lock is None:
+            return
+        generation, swap_generation = self._read_generation()
+        if swap_generation != self._swap_generation:
+            self._reload_base()
+        elif generation != self._generation:
+            self._apply_compactions()
+        self._generation, self._swap_generation = generation, swap_generation
+        self._read_journal()
+        self._last_refresh = time.monotonic()
+
+    def _reload_base(self):
+        """Another process swapped in a rebuilt index: reads its checkpoint, then the rows after it."""
+        self.index = self._open_base()
+        self._checkpoint_ntotal = self.index.ntotal
+        self._index_version += 1
+        self._apply_compactions()
+
+    def _apply_compactions(self):
+        """Another process compacted: adds the rows it appended to the side files, O(rows)."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self.metadata.refresh()
+        self.vectors.refresh()
+        self.partitions.refresh()
+        self._add_compacted_rows()
+        self._delta = np.empty((0, self.dimension), dtype='float32')
+        self._delta_meta = []
+        self._delta_keys = []
+        self._journal_offset = 0
+
+    def _refresh(self):
+        """Catches up under a shared lock at most every VECTOR_REFRESH_INTERVAL seconds, for readers."""
+        if self._file_lock is None or time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        with self._file_lock.hold(exclusive=False):
+            self._catch_up()
 
     def _load_or_create_index(self):
+        # Legacy pickled `.meta` lists are converted on first load
+        self.metadata = MetadataStore.migrate_pickle(self.index_path + ".meta", self.index_path + ".meta")
+        self.vectors = RawVectorFile(self.index_path + ".vectors", self.dimension)
+        self.partitions = PartitionIndex(self.index_path)
+        if os.path.exists(self.index_path) and is_flat_index_file(self.index_path):
+            # Flat index files from earlier versions: the raw vectors supersede them
+            legacy = faiss.read_index(self.index_path)
+            if len(self.vectors) < legacy.ntotal:
+                # Stores created before the raw vector file existed: Flat vectors are exact
+                start = len(self.vectors)
+                self.vectors.append(legacy.reconstruct_n(start, legacy.ntotal - start))
+            os.remove(self.index_path)
+        self.index = self._open_base()
+        self._checkpoint_ntotal = self.index.ntotal
+        self._add_compacted_rows()
+        if len(self.partitions) < self.index.ntotal:
+            self._backfill_partitions()
+
+    def _open_base(self):
+        """The checkpointed ANN index if there is one, else a Flat index over the mapped raw vectors (rows added after)."""
         if os.path.exists(self.index_path):
-            self.index = faiss.read_index(self.index_path)
-            # Load metadata if exists (simplified for now)
-            if os.path.exists(self.index_path + ".meta"):
-                with open(self.index_path + ".meta", 'rb') as f:
-                    self.metadata = pickle.load(f)
-        else:
-            self.index = faiss.IndexFlatL2(self.dimension)
+            return self._read_index()
+        return MappedFlatIndex(self.vectors)
+
+    def _add_compacted_rows(self):
+        """Adds the rows the raw vector file holds beyond the index (compacted after its checkpoint)."""
+        if len(self.vectors) > self.index.ntotal:
+            self.index.add(np.ascontiguousarray(self.vectors.array[self.index.ntotal:]))
+
+    def _backfill_partitions(self):
+        """Derives ticker keys for memories stored before partitions existed from their summaries."""
+        keys = []
+        for idx in range(len(self.partitions), self.index.ntotal):
+            context = self.metadata.get(idx) if idx < len(self.metadata) else None
+            match = re.match(r"Ticker: ([^,]+),", context) if isinstance(context, str) else None
+            keys.append((match.group(1) if match else "", 0.0))
+        self.partitions.append_many(keys)
+
+    def _read_index(self):
+        return configure_search(faiss.read_index(self.index_path))
+
+    @staticmethod
+    def _encode_record(text_context, ticker, timestamp):
+        return json.dumps({"context": text_context, "ticker": ticker, "ts": timestamp}).encode('utf-8')
+
+    @staticmethod
+    def _decode_record(data):
+        record = json.loads(data.decode('utf-8'))
+        if isinstance(record, dict) and "context" in record:
+            return record["context"], record.get("ticker"), record.get("ts")
+        # Journals written before partitions carried the bare context
+        return record, None, None
+
+    def _replay_journal(self):
+        """
+        Re-applies journaled memories that did not reach the base index.
+        Records are tagged with their position, so records that were already
+        compacted are skipped, and a torn record at the tail is truncated.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        valid_end = self._read_journal()
+        if valid_end < os.path.getsize(self.journal_path):
+            print("⚠️ Vector store journal has a torn tail record. Truncating.")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_end)
+
+    def _read_journal(self):
+        """Applies the journal records past _journal_offset to the delta and returns the end of the last valid one."""
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        vector_size = self.dimension * 4
+        vectors = []
+        valid_end = self._journal_offset
+        with open(self.journal_path, 'rb') as f:
+            f.seek(valid_end)
+            while True:
+                header = f.read(JOURNAL_HEADER.size)
+                if len(header) < JOURNAL_HEADER.size:
+                    break
+                seq, meta_len, crc = JOURNAL_HEADER.unpack(header)
+                payload = f.read(vector_size + meta_len)
+                if len(payload) < vector_size + meta_len or zlib.crc32(payload) != crc:
+                    break
+                next_seq = self.ntotal + len(vectors)
+                if seq > next_seq:
+                    # Gap in the sequence: everything from here on is unusable
+                    break
+
+                if seq == next_seq:
+                    context, ticker, timestamp = self._decode_record(payload[vector_size:])
+                    vectors.append(np.frombuffer(payload[:vector_size], dtype='float32'))
+                    self._delta_meta.append(context)
+                    self._delta_keys.append((ticker, timestamp))
+                valid_end = f.tell()
+
+        if vectors:
+            self._delta = np.vstack([self._delta] + vectors)
+        self._journal_offset = valid_end
+        return valid_end
 
-    def add_memory(self, vector, text_context):
-        """Adds a new memory vector and its context."""
+    def _append_journal(self, first_seq, np_vectors, records):
+        """Appends one journal record per (vector, (context, ticker, timestamp)) in a single write."""
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+            self._journal = open(self.journal_path, 'ab')
+        chunks = []
+        for offset, (np_vector, record) in enumerate(zip(np_vectors, records)):
+            meta = self._encode_record(*record)
+            payload = np_vector.tobytes() + meta
+            chunks.append(JOURNAL_HEADER.pack(first_seq + offset, len(meta), zlib.crc32(payload)) + payload)
+        self._journal.write(b"".join(chunks))
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        # Our own records must not be read back as another process's
+        self._journal_offset = os.fstat(self._journal.fileno()).st_size
+
+    @timed(OP_SECONDS, op="add")
+    def add_memory(self, vector, text_context, ticker=None, timestamp=None):
+        """
+        Adds a new memory vector and its context, keyed by ticker and timestamp.
+        The memory is searchable immediately and appended to the journal; the
+        flusher thread compacts it into the base files once a flush batch has
+        accumulated, so callers never wait for a compaction.
+        """
         if len(vector) != self.dimension:
             raise ValueError("Vector dimension mismatch")
-        
+
         np_vector = np.array([vector], dtype='float32')
-        self.index.add(np_vector)
-        self.metadata.append(text_context)
-        self._save_index()
-
-    def search_memory(self, query_vector, k=3):
-        """Searches for similar memories."""
-        if self.index.ntotal == 0:
-            return []
-            
-        np_vector = np.array([query_vector], dtype='float32')
-        distances, indices = self.index.search(np_vector, k)
-        
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx != -1 and idx < len(self.metadata):
-                results.append({
-                    "context": self.metadata[idx],
-                    "distance": float(distances[0][i])
-                })
-        return results
+        with self._locked():
+            self._catch_up()
+            self._append_journal(self.ntotal, np_vector, [(text_context, ticker, timestamp)])
+            self._delta = np.vstack([self._delta, np_vector])
+            self._delta_meta.append(text_context)
+            self._delta_keys.append((ticker, timestamp))
+            if len(self._delta) >= self.flush_batch:
+                self._flush_wanted.set()
+
+    @timed(OP_SECONDS, op="add_batch")
+    def add_memories(self, vectors, text_contexts, tickers=None, timestamps=None):
+        """
+        Adds many memories with one journal write and at most one compaction,
+        for bulk loads and imports. Arguments are aligned sequences; tickers
+        and timestamps default to None.
+        """
+        np_vectors = np.atleast_2d(np.asarray(vectors, dtype='float32'))
+        if np_vectors.shape[1] != self.dimension:
+            raise ValueError("Vector dimension mismatch")
+        count = len(np_vectors)
+        tickers = tickers if tickers is not None else [None] * count
+        timestamps = timestamps if timestamps is not None else [None] * count
+        if not len(text_contexts) == len(tickers) == len(timestamps) == count:
+            raise ValueError("Vectors, contexts, tickers and timestamps must have the same length")
+        keys = list(zip(tickers, timestamps))
+
+        with self._locked():
+            self._catch_up()
+            self._append_journal(self.ntotal, np_vectors, [(c, t, ts) for c, (t, ts) in zip(text_contexts, keys)])
+            self._delta = np.vstack([self._delta, np_vectors])
+            self._delta_meta.extend(text_contexts)
+            self._delta_keys.extend(keys)
+            if len(self._delta) >= self.flush_batch:
+                self._flush_wanted.set()
+
+    def get_metadata(self, idx):
+        """Returns the metadata record for a global vector id, decoding it on demand."""
+        base = self.index.ntotal
+        if idx < base:
+            return self.metadata.get(idx)
+        return self._delta_meta[idx - base]
+
+    def _delta_ids(self, ticker, start_ts, end_ts):
+        ids = []
+        for i, (key_ticker, ts) in enumerate(self._delta_keys):
+            if key_ticker != ticker:
+                continue
+            if start_ts is not None and (ts or 0.0) < start_ts:
+                continue
+            if end_ts is not None and (ts or 0.0) > end_ts:
+                continue
+            ids.append(i)
+        return np.array(ids, dtype=np.int64)
+
+    def _search_partition(self, np_vector, k, ticker, start_ts, end_ts):
+        """Searches only the ids keyed to `ticker` (and the time window, if given)."""
+        candidates = []
+        base_ids = self.partitions.ids_for(ticker, start_ts, end_ts)
+        base_ids = base_ids[base_ids < self.index.ntotal]
+        kind = index_kind(self.index)
+        if len(base_ids) and (len(base_ids) <= self.partition_exact_max or kind == 'flat'):
+            # Small partitions, or a Flat base: exact scan over just this ticker's original vectors
+            shard = np.ascontiguousarray(self.vectors.array[base_ids])
+            distances, positions = faiss.knn(np_vector, shard, min(k, len(base_ids)))
+            candidates.extend(zip(distances[0], base_ids[positions[0]]))
+        elif len(base_ids):
+            # Large partitions: let the ANN index skip every id outside the partition
+            selector = faiss.IDSelectorBatch(base_ids)
+            if kind == 'ivfpq':
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=Config.VECTOR_IVF_NPROBE)
+            else:
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=Config.VECTOR_HNSW_EF_SEARCH)
+            distances, indices = self.index.search(np_vector, k, params=params)
+            candidates.extend(zip(distances[0], indices[0]))
+
+        delta_ids = self._delta_ids(ticker, start_ts, end_ts)
+        if len(delta_ids):
+            distances, positions = faiss.knn(np_vector, self._delta[delta_ids], min(k, len(delta_ids)))
+            candidates.extend(zip(distances[0], delta_ids[positions[0]] + self.index.ntotal))
+        return candidates
+
+    @timed(OP_SECONDS, op="search")
+    def search_memory(self, query_vector, k=3, ticker=None, start_ts=None, end_ts=None):
+        """
+        Searches for similar memories.
+        With a ticker, only that ticker's partition is searched, optionally
+        limited to memories stored between start_ts and end_ts (epoch seconds).
+        """
+        with self._lock:
+            self._refresh()
+            if self.ntotal == 0:
+                return []
+
+            np_vector = np.array([query_vector], dtype='float32')
+            if ticker is not None:
+                candidates = self._search_partition(np_vector, k, ticker, start_ts, end_ts)
+            else:
+                candidates = []
+                if self.index.ntotal:
+                    distances, indices = self.index.search(np_vector, min(k, self.index.ntotal))
+                    candidates.extend(zip(distances[0], indices[0]))
+                if len(self._delta):
+                    distances, indices = faiss.knn(np_vector, self._delta, min(k, len(self._delta)))
+                    candidates.extend(zip(distances[0], indices[0] + self.index.ntotal))
+            candidates.sort(key=lambda c: c[0])
 
+            results = []
+            for distance, idx in candidates[:k]:
+                if idx != -1 and idx < self.ntotal:
+                    results.append({
+                        "context": self.get_metadata(int(idx)),
+                        "distance": float(distance)
+                    })
+            return results
+
+    def flush(self):
+        """
+        Compacts journaled memories into the base index and side files, then
+        writes an index checkpoint if one is due. A background rebuild adds
+        whatever was compacted meanwhile when it swaps its index in.
+        """
+        with self._locked():
+            self._catch_up()
+            if not len(self._delta):
+                return
+            self._save_index()
+            # Everything journaled is now in the base files
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            open(self.journal_path, 'wb').close()
+            self._journal_offset = 0
+            self._bump_generation()
+
+            if (self.index_type != 'flat' and index_kind(self.index) == 'flat'
+                    and self.index.ntotal >= self.ann_threshold):
+                self.rebuild_index()
+        self._checkpoint()
+
+    @timed(OP_SECONDS, op="checkpoint")
+    def _checkpoint(self):
+        """
+        Rewrites the index file once the base has grown VECTOR_CHECKPOINT_GROWTH-fold
+        since the last checkpoint, so the O(n) write amortizes to O(1) per memory.
+        The index is cloned under the lock and written outside it. A Flat base
+        is skipped: it is searched straight over the raw vector file.
+        """
+        with self._lock:
+            if index_kind(self.index) == 'flat' or self.index.ntotal < self._checkpoint_ntotal * self.checkpoint_growth:
+                return
+            snapshot = faiss.clone_index(self.index)
+            version = self._index_version
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._write_index_file(snapshot, tmp_path)
+        with self._locked():
+            self._catch_up()
+            if version != self._index_version:
+                # Rebuilt or reloaded meanwhile: this snapshot is of an index that is gone
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self.index_path)
+            self._checkpoint_ntotal = snapshot.ntotal
+
+    def rebuild_index(self, kind=None, background=True):
+        """
+        Rebuilds the base index as `kind` (default VECTOR_INDEX_TYPE) from the raw vectors.
+        Searches keep using the current index until the new one is swapped in.
+        """
+        kind = kind or self.index_type
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            generation = self._generation
+        if background:
+            threading.Thread(target=self._rebuild, args=(kind, generation), name="vector-rebuild", daemon=True).start()
+        else:
+            self._rebuild(kind, generation)
+
+    @timed(OP_SECONDS, op="rebuild")
+    def _rebuild(self, kind, generation):
+        try:
+            # Only one process rebuilds at a time; the others pick up its index through the version file
+            with self._rebuild_lock.hold(blocking=False) if self._rebuild_lock else nullcontext(True) as acquired:
+                if not acquired:
+                    return
+                with self._locked():
+                    self._catch_up()
+                    if self._generation != generation and index_kind(self.index) == kind:
+                        # Another process finished the same rebuild while this one was queued
+                        return
+                    count = self.index.ntotal
+                print(f"Rebuilding vector index as {kind} over {count} memories...")
+                tmp_path = None
+                if kind == 'flat':
+                    # Searched over the raw vectors; there is nothing to build or write
+                    index = MappedFlatIndex(self.vectors, count)
+                else:
+                    index = build_index(kind, self.dimension, self.vectors.array[:count])
+                    tmp_path = self.index_path + ".rebuild.tmp"
+                    self._write_index_file(index, tmp_path)
+                with self._locked():
+                    self._catch_up()
+                    if tmp_path is not None:
+                        os.replace(tmp_path, self.index_path)
+                    elif os.path.exists(self.index_path):
+                        os.remove(self.index_path)
+                    # The file checkpoints `count` rows; memories compacted while the
+                    # index was being built are added from the raw vectors
+                    self.index = index
+                    self._checkpoint_ntotal = count
+                    self._index_version += 1
+                    self._add_compacted_rows()
+                    self._bump_generation(swap=True)
+        except Exception as e:
+            print(f"Warning: Vector index rebuild failed: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def recall_report(self, queries=None, k=10, n_queries=100):
+        """
+        Measures the base index against exact search over the original vectors.
+        Without explicit queries, stored vectors with small noise are used.
+        """
+        with self._lock:
+            index = self.index
+            vectors = self.vectors.array[:index.ntotal]
+        if not len(vectors):
+            return {"ntotal": 0}
+        if queries is None:
+            rng = np.random.default_rng(0)
+            picks = vectors[rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)]
+            queries = picks + 0.01 * rng.standard_normal(picks.shape).astype('float32')
+        return recall_report(index, vectors, queries, k=min(k, len(vectors)))
+
+    def _flush_in_background(self):
+        """Compacts once the delta reaches VECTOR_FLUSH_BATCH, and every VECTOR_FLUSH_INTERVAL seconds when set."""
+        while True:
+            self._flush_wanted.wait(self.flush_interval if self.flush_interval > 0 else None)
+            self._flush_wanted.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: Background vector store flush failed: {e}")
+
+    @staticmethod
+    def _write_index_file(index, path):
+        faiss.write_index(index, path)
+        with open(path, 'rb') as f:
+            os.fsync(f.fileno())
+
+    @timed(OP_SECONDS, op="compact")
     def _save_index(self):
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
-        faiss.write_index(self.index, self.index_path)
-        with open(self.index_path + ".meta", 'wb') as f:
-            pickle.dump(self.metadata, f)
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        # A worker that died mid-compaction leaves rows (and maybe a torn tail) this
+        # process has not mapped; append positions must come from the files themselves
+        self.metadata.repair()
+        self.partitions.repair()
+        self.vectors.repair()
+        # Side files are append-only and each catches up from the delta. The raw
+        # vectors go last: once they hold a row the compaction of that row is
+        # durable, and a crash before that is repaired by the journal replay.
+        base = self.index.ntotal
+        self.metadata.append_many(self._delta_meta[len(self.metadata) - base:])
+        self.partitions.append_many(self._delta_keys[len(self.partitions) - base:])
+        self.vectors.append(self._delta[len(self.vectors) - base:])
+
+        self.index.add(self._delta)
+        self._delta = np.empty((0, self.dimension), dtype='float32')
+        self._delta_meta = []
+        self._delta_keys = []
@@ -1,15 +1,61 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
 from agents import ChatGPTAgent, GrokAgent, GeminiAgent, MachineAgent
+from agents.cache import ResponseCache
 from memory.rag_engine import RAGEngine
+from context_builder import DebateContextBuilder, SerializedDict
+from round_scheduler import AdaptiveRoundScheduler
+from utils.clock import PausableClock
+from utils.single_flight import SingleFlight
+from utils.metrics import REGISTRY, StageTimer
 from data.feed import DataFeed
 
+STAGE_SECONDS = REGISTRY.histogram("debate_stage_seconds", "Time spent in each run_debate stage", ("stage",))
+AGENT_CALL_SECONDS = REGISTRY.histogram("agent_call_seconds", "Agent analyze/debate call latency", ("agent", "call"))
+AGENT_FAILURES = REGISTRY.counter(
+    "agent_failures_total", "Agent calls that raised or missed the deadline", ("agent", "call", "reason"))
+AGENT_FALLBACKS = REGISTRY.counter(
+    "agent_fallbacks_total", "Opinions replaced by a default HOLD or the previous opinion", ("agent", "call"))
+AGENT_CALLS_SKIPPED = REGISTRY.counter(
+    "agent_calls_skipped_total", "Debate-round agent calls skipped by the adaptive scheduler", ("agent",))
+DEBATES = REGISTRY.counter("debates_total", "Finished debates by outcome", ("outcome",))
+DEBATE_ROUNDS = REGISTRY.histogram(
+    "debate_rounds", "Rounds reported per completed debate", buckets=tuple(range(1, Config.MAX_DEBATE_ROUNDS + 2)))
+PROMPT_TOKENS = REGISTRY.histogram(
+    "debate_prompt_tokens", "Estimated tokens of the largest prompt per round", ("call",),
+    buckets=(100, 250, 500, 1000, 1500, 2000, 4000, 8000, 16000, 32000))
+
 class Orchestrator:
     def __init__(self):
         self.agents = self._initialize_agents()
         self.rag_engine = RAGEngine()
         self.data_feed = DataFeed()
+        self.response_cache = None
+        if Config.LLM_CACHE_ENABLED:
+            self.response_cache = ResponseCache(
+                # Resolved on first lookup: reading rag_engine.redis here would connect at startup
+                redis=(lambda: self.rag_engine.redis) if Config.LLM_CACHE_REDIS else None
+            )
+            for agent in self.agents:
+                agent.cache = self.response_cache
         self.consensus_threshold = Config.CONSENSUS_THRESHOLD
         self.max_rounds = Config.MAX_DEBATE_ROUNDS
+        self.context_delta = Config.DEBATE_CONTEXT_DELTA
+        self.adaptive_rounds = Config.DEBATE_ADAPTIVE
+        self.in_flight = SingleFlight()
+        self.ready = False
+        self.warm_up_error = None
+        self.warm_up_seconds = None
+        self._warm_up_lock = threading.Lock()
+        self.parallel = Config.PARALLEL_AGENTS
+        self.agent_timeout = Config.AGENT_TIMEOUT
+        self.executor = ThreadPoolExecutor(
+            max_workers=Config.AGENT_POOL_SIZE,
+            thread_name_prefix="agent"
+        ) if self.parallel else None
 
     def _initialize_agents(self):
         agent_map = {
@@ -28,99 +74,250 @@ class Orchestrator:
                     model=conf['model'],
                     role=conf['role'],
                     weight=conf['weight'],
-                    temperature=conf['temperature']
+                    temperature=conf['temperature'],
+                    fallbacks=conf.get('fallbacks')
                 ))
         return agents
 
-    def run_debate(self, ticker):
+    def warm_up(self):
+        """
+        Builds everything that is otherwise created on the first request: the
+        agents' LLM clients, the Redis connection, the vector index and the
+        embedder. Safe to call repeatedly; `ready` turns True once it succeeds.
+        Requests are served before warm-up too, they just pay for it themselves.
+        """
+        with self._warm_up_lock:
+            if self.ready:
+                return True
+            start = time.perf_counter()
+            try:
+                for agent in self.agents:
+                    agent.llm
+                self.rag_engine.warm_up()
+            except Exception as e:
+                print(f"Warning: Warm-up failed: {e}")
+                self.warm_up_error = str(e)
+                return False
+            self.warm_up_seconds = round(time.perf_counter() - start, 3)
+            self.warm_up_error = None
+            self.ready = True
+            return True
+
+    def run_debate(self, ticker, max_age=None):
+        """
+        Runs a full debate and returns the final discussion_log (or an error dict).
+        Concurrent calls for the same ticker share one in-flight debate. With
+        `max_age` (seconds), a stored result at most that old is returned instead
+        of debating again; it is marked with "cached" and its "age".
+        """
+        if max_age is not None:
+            stored = self.get_stored_result(ticker, max_age)
+            if stored is not None:
+                DEBATES.inc(outcome="cached")
+                return stored
+        return self.in_flight.do(ticker, lambda: self._run_debate(ticker))
+
+    def get_stored_result(self, ticker, max_age):
+        """Returns the short-term memory discussion_log for ticker if it is at most max_age seconds old."""
+        try:
+            redis = self.rag_engine.redis
+            # The summary carries the timestamp, so stale logs are never fetched or decoded
+            summary = redis.get_summary(ticker)
+            if not summary:
+                return None
+            age = time.time() - summary['timestamp']
+            if age > max_age:
+                return None
+            log = redis.get_discussion(ticker)
+        except Exception as e:
+            print(f"Warning: Error reading stored discussion: {e}")
+            return None
+        if not log:
+            return None
+        return {**log, "cached": True, "age": round(age, 3)}
+
+    def _run_debate(self, ticker):
+        result = None
+        for event, payload in self.stream_debate(ticker):
+            if event in ("complete", "error"):
+                result = payload
+        return result
+
+    def stream_debate(self, ticker):
+        """
+        Runs a debate as a generator of (event, payload) tuples, emitted as they happen:
+            ("opinion", entry)      each agent's opinion as soon as it arrives (round 0 is the initial analysis)
+            ("consensus", {...})    the running consensus after every completed round
+            ("complete", log)       the final discussion_log
+            ("error", {...})        the debate could not be completed
+        """
+        timer = StageTimer(STAGE_SECONDS)
+        started = time.perf_counter()
         try:
             # 1. Gather Market Data
             try:
-                market_data = self.data_feed.get_market_data(ticker)
-                news = self.data_feed.get_news(ticker)
-                market_data['news'] = news
+                with timer.stage("data_fetch"):
+                    market_data = self.data_feed.get_market_data(ticker)
+                    news = self.data_feed.get_news(ticker)
+                    market_data['news'] = news
+                    # Serialized once here and reused by every agent's prompt
+                    market_data = SerializedDict(market_data)
             except Exception as e:
                 print(f"Warning: Error fetching market data: {e}")
-                return {"error": "Failed to fetch market data", "details": str(e)}
+                DEBATES.inc(outcome="error")
+                yield "error", {"error": "Failed to fetch market data", "details": str(e)}
+                return
 
             # 2. Retrieve Context (RAG)
             try:
-                historical_context = self.rag_engine.get_context(ticker)
+                with timer.stage("rag_retrieval"):
+                    historical_context = self.rag_engine.get_context(ticker, market_data)
             except Exception as e:
                 print(f"Warning: Error retrieving historical context: {e}")
                 historical_context = "No historical context available."
 
+            context_builder = DebateContextBuilder(historical_context)
+            context_builder.record_round(0, "", {agent.name: market_data for agent in self.agents})
+
             # 3. Initial Analysis Round
-            initial_opinions = []
-            for agent in self.agents:
-                try:
-                    opinion = agent.analyze(market_data)
-                    initial_opinions.append({
-                        "agent": agent.name,
-                        "weight": agent.weight,
-                        "opinion": opinion
-                    })
-                except Exception as e:
-                    print(f"Warning: {agent.name} failed initial analysis: {e}")
-                    # Provide default HOLD opinion for failed agent
-                    initial_opinions.append({
-                        "agent": agent.name,
-                        "weight": agent.weight,
-                        "opinion": {
+            arrived = {}
+            failed = set()
+            with timer.stage("analysis"):
+                for agent, opinion in self._iter_agents(lambda agent: agent.analyze(market_data), call="analyze"):
+                    if isinstance(opinion, Exception):
+                        failed.add(agent.name)
+                        print(f"Warning: {agent.name} failed initial analysis: {opinion}")
+                        AGENT_FALLBACKS.inc(agent=agent.name, call="analyze")
+                        # Provide default HOLD opinion for failed agent
+                        opinion = {
                             "signal": "HOLD",
                             "confidence": 0.0,
-                            "reasoning": f"Agent error: {str(e)}"
+                            "reasoning": f"Agent error: {str(opinion)}"
                         }
-                    })
+                    arrived[agent.name] = {
+                        "agent": agent.name,
+                        "weight": agent.weight,
+                        "opinion": opinion
+                    }
+                    with timer.paused():
+                        yield "opinion", {**arrived[agent.name], "round": 0}
+            initial_opinions = [arrived[agent.name] for agent in self.agents if agent.name in arrived]
 
             if not initial_opinions:
-                return {"error": "All agents failed to provide initial analysis"}
+                DEBATES.inc(outcome="error")
+                yield "error", {"error": "All agents failed to provide initial analysis"}
+                return
+
+            with timer.stage("consensus"):
+                decision, confidence = self._calculate_consensus(initial_opinions)
+            yield "consensus", {"round": 0, "decision": decision, "confidence": confidence}
 
             # 4. Debate Loop
             round_history = []
             current_opinions = initial_opinions
+            context_builder.record_opinions(initial_opinions)
+            round_results = []
+            scheduler = AdaptiveRoundScheduler(self.consensus_threshold) if self.adaptive_rounds else None
+            schedule = []
+            stopped_early = None
+            if scheduler is not None:
+                # Default HOLDs stand in for failed agents and are not their opinion
+                scheduler.observe([op for op in initial_opinions if op['agent'] not in failed])
 
             for round_num in range(self.max_rounds):
-                round_results = []
-                # Include historical context in the debate context
-                context = f"{historical_context}\n\n{self._summarize_context(current_opinions)}"
-
                 # Check for consensus
-                decision, confidence = self._calculate_consensus(current_opinions)
                 if confidence >= self.consensus_threshold:
                     break
 
                 # If no consensus, debate continues
-                for agent in self.agents:
-                    try:
-                        others_history = [h for h in round_history if h['agent'] != agent.name]
-                        response = agent.debate(context, others_history)
-
-                        round_results.append({
-                            "agent": agent.name,
-                            "weight": agent.weight,
-                            "opinion": {
-                                "signal": response['revised_signal'],
-                                "confidence": response['revised_confidence'],
-                                "reasoning": response['response']
+                agents = self.agents
+                if scheduler is not None:
+                    # Only agents whose revision can still change the outcome are asked again
+                    agents, stopped_early = scheduler.plan(self.agents, current_opinions)
+                    for agent in self.agents:
+                        if agent not in agents:
+                            AGENT_CALLS_SKIPPED.inc(agent=agent.name)
+                    schedule.append({"round": round_num + 1, "queried": [agent.name for agent in agents]})
+                    if not agents:
+                        break
+
+                if self.context_delta:
+                    # Last round's opinions plus a rolling summary, within the token budget
+                    context, others_history = context_builder.build(
+                        round_num, current_opinions, round_results, [agent.name for agent in agents]
+                    )
+                else:
+                    # Include historical context in the debate context
+                    context = f"{historical_context}\n\n{self._summarize_context(current_opinions)}"
+                    others_history = {
+                        agent.name: [h for h in round_history if h['agent'] != agent.name]
+                        for agent in agents
+                    }
+                    context_builder.record_round(round_num + 1, context, others_history)
+
+                with timer.stage("debate_round"):
+                    arrived = {}
+                    replied = set()
+                    for agent, response in self._iter_agents(
+                        lambda agent: agent.debate(context, others_history[agent.name]), call="debate", agents=agents
+                    ):
+                        try:
+                            if isinstance(response, Exception):
+                                raise response
+
+                            arrived[agent.name] = {
+                                "agent": agent.name,
+                                "weight": agent.weight,
+                                "round": round_num + 1,
+                                "opinion": {
+                                    "signal": response['revised_signal'],
+                                    "confidence": response['revised_confidence'],
+                                    "reasoning": response['response']
+                                }
                             }
-                        })
-                    except Exception as e:
-                        print(f"Warning: {agent.name} failed debate round {round_num + 1}: {e}")
-                        # Keep previous opinion if debate fails
-                        prev_opinion = next((op for op in current_opinions if op['agent'] == agent.name), None)
-                        if prev_opinion:
-                            round_results.append(prev_opinion)
+                            replied.add(agent.name)
+                        except Exception as e:
+                            print(f"Warning: {agent.name} failed debate round {round_num + 1}: {e}")
+                            AGENT_FALLBACKS.inc(agent=agent.name, call="debate")
+                            # Keep previous opinion if debate fails
+                            prev_opinion = next((op for op in current_opinions if op['agent'] == agent.name), None)
+                            if not prev_opinion:
+                                continue
+                            arrived[agent.name] = {**prev_opinion, "round": round_num + 1}
+                        with timer.paused():
+                            yield "opinion", arrived[agent.name]
+                round_results = [arrived[agent.name] for agent in self.agents if agent.name in arrived]
 
                 if not round_results:
                     print("Warning: All agents failed debate round, using initial opinions")
                     break
 
-                current_opinions = round_results
+                if agents is not self.agents:
+                    # Agents that were not asked keep their opinion from the previous round
+                    previous = {op['agent']: op for op in current_opinions}
+                    answered = {op['agent']: op for op in round_results}
+                    current_opinions = [
+                        answered.get(agent.name) or {**previous[agent.name], "round": round_num + 1}
+                        for agent in self.agents
+                        if agent.name in answered or agent.name in previous
+                    ]
+                else:
+                    current_opinions = round_results
                 round_history.extend(round_results)
+                context_builder.record_opinions(round_results)
+                if scheduler is not None:
+                    # A carried-over opinion would look repeated and freeze the agent for good
+                    scheduler.observe([op for op in round_results if op['agent'] in replied])
+
+                with timer.stage("consensus"):
+                    decision, confidence = self._calculate_consensus(current_opinions)
+                yield "consensus", {"round": round_num + 1, "decision": decision, "confidence": confidence}
 
             # 5. Final Decision
-            final_decision, final_confidence = self._calculate_consensus(current_opinions)
+            with timer.stage("consensus"):
+                final_decision, final_confidence = self._calculate_consensus(current_opinions)
+            for tokens in context_builder.round_tokens:
+                PROMPT_TOKENS.observe(tokens["max"], call="analyze" if tokens["round"] == 0 else "debate")
 
             # 6. Store in Memory via RAG Engine
             discussion_log = {
@@ -128,20 +325,122 @@ class Orchestrator:
                 "rounds": round_num + 1,
                 "decision": final_decision,
                 "confidence": final_confidence,
+                "initial_opinions": initial_opinions,
                 "history": round_history,
-                "market_data": market_data
+                "market_data": market_data,
+                "prompt_tokens": context_builder.round_tokens
             }
+            if scheduler is not None:
+                discussion_log["schedule"] = schedule
+                discussion_log["stopped_early"] = stopped_early
 
             try:
-                self.rag_engine.store_experience(ticker, discussion_log)
+                with timer.stage("memory_store"):
+                    self.rag_engine.store_experience(ticker, discussion_log)
             except Exception as e:
                 print(f"Warning: Failed to store experience in memory: {e}")
 
-            return discussion_log
+            timer.timings["total"] = round(time.perf_counter() - started, 6)
+            # A finished copy: the log is persisted below, and later stages must not change it
+            discussion_log["timings"] = dict(timer.timings)
+            try:
+                with timer.stage("log_store"):
+                    self.rag_engine.record_discussion(ticker, discussion_log)
+            except Exception as e:
+                print(f"Warning: Failed to record discussion log: {e}")
+            DEBATE_ROUNDS.observe(discussion_log["rounds"])
+            DEBATES.inc(outcome="consensus" if final_confidence >= self.consensus_threshold else "no_consensus")
+            yield "complete", discussion_log
 
         except Exception as e:
             print(f"Critical error in run_debate: {e}")
-            return {"error": "Critical system error", "details": str(e)}
+            DEBATES.inc(outcome="error")
+            yield "error", {"error": "Critical system error", "details": str(e)}
+
+    def _run_agents(self, task):
+        """
+        Runs task(agent) for every agent and returns {agent.name: result}.
+        A failed call maps to its exception. In parallel mode all agents run
+        concurrently and any call still running AGENT_TIMEOUT seconds after it
+        started maps to a TimeoutError, so callers fall back exactly as they
+        do on errors.
+        """
+        return {agent.name: result for agent, result in self._iter_agents(task)}
+
+    def _iter_agents(self, task, call="call", agents=None):
+        """
+        Like _run_agents, but yields (agent, result) pairs in completion order
+        so callers can act on the fastest agents while the others still run.
+        Each call's latency and failures are recorded under the `call` label.
+        `agents` limits the calls to a subset of self.agents.
+        """
+        def timed_task(agent):
+            start = time.perf_counter()
+            try:
+                return task(agent)
+            finally:
+                # Late calls are observed when they finish, so timeouts show their true latency
+                AGENT_CALL_SECONDS.observe(time.perf_counter() - start, agent=agent.name, call=call)
+
+        for agent, result in self._iter_agent_results(timed_task, agents if agents is not None else self.agents):
+            if isinstance(result, Exception):
+                reason = "timeout" if isinstance(result, TimeoutError) else "error"
+                AGENT_FAILURES.inc(agent=agent.name, call=call, reason=reason)
+            yield agent, result
+
+    def _iter_agent_results(self, task, agents):
+        if not self.parallel:
+            for agent in agents:
+                try:
+                    result = task(agent)
+                except Exception as e:
+                    result = e
+                yield agent, result
+            return
+
+        # Each call's deadline runs from when it starts, not from when it was queued on
+        # the shared pool, and stands still while this generator is suspended at a yield
+        clock = PausableClock()
+        events = queue.Queue()
+
+        def run(agent):
+            events.put((agent, clock.now(), None))
+            try:
+                result = task(agent)
+            except Exception as e:
+                result = e
+            events.put((agent, None, result))
+
+        futures = {agent.name: self.executor.submit(run, agent) for agent in agents}
+        pending = {agent.name: agent for agent in agents}
+        started = {}
+        try:
+            while pending:
+                running = [started[name] for name in pending if name in started]
+                timeout = max(0.0, min(running) + self.agent_timeout - clock.now()) if running else None
+                try:
+                    agent, start, result = events.get(timeout=timeout)
+                except queue.Empty:
+                    now = clock.now()
+                    for name in [n for n in pending if n in started and now - started[n] >= self.agent_timeout]:
+                        # The call keeps running in the pool; its late result is discarded
+                        agent = pending.pop(name)
+                        with clock.paused():
+                            yield agent, TimeoutError(f"No response within {self.agent_timeout}s")
+                    continue
+                if agent.name not in pending:
+                    continue
+                if start is not None:
+                    started[agent.name] = start
+                    continue
+                del pending[agent.name]
+                with clock.paused():
+                    yield agent, result
+        except GeneratorExit:
+            # The consumer stopped listening; don't leave queued calls in the shared pool
+            for name in pending:
+                futures[name].cancel()
+            raise
 
     def _summarize_context(self, opinions):
         summary = "Current Opinions:\n"
@@ -0,0 +1,91 @@
+from config import Config
+
+# Same order as Orchestrator._calculate_consensus, so argmax ties break the same way
+SIGNALS = ("BUY", "SELL", "HOLD")
+
+def weighted_scores(opinions):
+    """Returns ({signal: sum of weight * confidence}, total weight) over opinion entries."""
+    scores = dict.fromkeys(SIGNALS, 0.0)
+    total = 0.0
+    for op in opinions:
+        scores[op['opinion']['signal']] += op['weight'] * float(op['opinion']['confidence'] or 0.0)
+        total += op['weight']
+    return scores, total
+
+class AdaptiveRoundScheduler:
+    """
+    Decides which agents a debate round re-queries.
+
+    An agent is frozen, and keeps its last opinion, when it cannot contribute
+    anything new: it is inactive (no LLM or model, so its reply is a fixed
+    HOLD). Every other agent is mobile and is re-queried.
+
+    The round is skipped altogether once the frozen agents decide the outcome
+    on their own: even if every mobile agent moved all of its weight to the
+    runner-up, the leading signal would still win, and the consensus threshold
+    is either already guaranteed or out of reach. Frozen replies cannot change,
+    so the decision and whether consensus is reached are those of the full
+    debate.
+
+    With `settle` (DEBATE_SETTLE) agents that repeated their previous opinion
+    within `settle_tolerance`, or back the leading signal with at least
+    `settle_confidence`, are frozen as well. That is a heuristic: asked again,
+    such an agent may still move, so an early stop can differ from the full
+    debate.
+    """
+    def __init__(self, threshold=None, settle_tolerance=None, settle_confidence=None, settle=None):
+        self.threshold = threshold if threshold is not None else Config.CONSENSUS_THRESHOLD
+        self.settle = settle if settle is not None else Config.DEBATE_SETTLE
+        self.settle_tolerance = settle_tolerance if settle_tolerance is not None else Config.DEBATE_SETTLE_TOLERANCE
+        self.settle_confidence = settle_confidence if settle_confidence is not None else Config.DEBATE_SETTLE_CONFIDENCE
+        self._previous = {} # agent -> (signal, confidence) before its latest answer
+        self._latest = {}
+
+    def observe(self, opinions):
+        """Records the opinions an agent round actually returned (not carried-over ones)."""
+        for op in opinions:
+            name = op['agent']
+            if name in self._latest:
+                self._previous[name] = self._latest[name]
+            self._latest[name] = (op['opinion']['signal'], float(op['opinion']['confidence'] or 0.0))
+
+    def _settled(self, name, leader):
+        latest = self._latest.get(name)
+        if not self.settle or latest is None:
+            return False
+        if latest[0] == leader and latest[1] >= self.settle_confidence:
+            return True
+        previous = self._previous.get(name)
+        return previous is not None and previous[0] == latest[0] and abs(previous[1] - latest[1]) <= self.settle_tolerance
+
+    def plan(self, agents, opinions):
+        """
+        Returns (agents to query, reason). An empty list means the debate
+        should stop now; reason is then "settled" (nobody left to move) or
+        "decided" (the frozen agents fix the outcome).
+        """
+        scores, _ = weighted_scores(opinions)
+        leader = max(scores, key=scores.get)
+        present = {op['agent']: op for op in opinions}
+
+        mobile, frozen = [], []
+        for agent in agents:
+            if agent.name in present and (not agent.is_active or self._settled(agent.name, leader)):
+                frozen.append(present[agent.name])
+            else:
+                mobile.append(agent)
+        if not mobile:
+            return [], "settled"
+
+        fixed, fixed_weight = weighted_scores(frozen)
+        mobile_weight = sum(agent.weight for agent in mobile)
+        # Agents without an opinion yet only count towards the total if they answer
+        answered_weight = fixed_weight + sum(agent.weight for agent in mobile if agent.name in present)
+        total = fixed_weight + mobile_weight
+        # Worst case for the leader: every mobile agent backs one rival at full confidence
+        locked = all(fixed[leader] > fixed[s] + mobile_weight for s in SIGNALS if s != leader)
+        always_reached = total > 0 and fixed[leader] / total >= self.threshold
+        never_reached = answered_weight > 0 and max(fixed[s] + mobile_weight for s in SIGNALS) / answered_weight < self.threshold
+        if locked and (always_reached or never_reached):
+            return [], "decided"
+        return mobile, None
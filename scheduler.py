@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from config import Config
+
+class DebateScheduler:
+    """
+    Runs debates for many tickers concurrently under a global concurrency cap.
+    The pool is shared by every batch, so concurrent batch requests together
+    never run more than max_concurrency debates at once.
+    """
+    def __init__(self, orchestrator, max_concurrency=None):
+        self.orchestrator = orchestrator
+        self.max_concurrency = max_concurrency or Config.BATCH_MAX_CONCURRENCY
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="debate"
+        )
+
+    def run_batch(self, tickers, timeout=None, max_age=None):
+        """
+        Runs a debate for every ticker and waits up to `timeout` seconds.
+        `max_age` is passed through to Orchestrator.run_debate.
+        Returns:
+            dict: {ticker: debate result} for finished debates, and
+                  {ticker: {"error": "timeout"}} for debates still queued or running.
+        Queued debates are cancelled on timeout; running ones finish in the
+        background so their results still reach memory.
+        """
+        timeout = timeout if timeout is not None else Config.BATCH_TIMEOUT
+        try:
+            # One bulk fetch instead of a quote and news request per debate
+            self.orchestrator.data_feed.prefetch(tickers)
+        except Exception as e:
+            print(f"Warning: Error prefetching market data: {e}")
+        futures = {ticker: self.executor.submit(self.orchestrator.run_debate, ticker, max_age) for ticker in tickers}
+        wait(futures.values(), timeout=timeout)
+
+        results = {}
+        for ticker, future in futures.items():
+            if not future.done():
+                future.cancel()
+                results[ticker] = {"error": "timeout", "details": f"Debate did not finish within {timeout}s"}
+                continue
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                results[ticker] = {"error": "Critical system error", "details": str(e)}
+        return results
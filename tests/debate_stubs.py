@@ -0,0 +1,38 @@
+"""Scripted agents and a bare Orchestrator for debate-level tests; no LLM, data feed or memory."""
+from types import SimpleNamespace
+
+class ScriptedAgent:
+    """Replies from a fixed per-call script; inactive agents give the disabled agents' fixed HOLD."""
+    def __init__(self, name, weight, script, active=True):
+        self.name, self.weight, self.is_active = name, weight, active
+        self.script = script if active else [("HOLD", 0.0)] * len(script)
+        self.calls = 0
+
+    def _next(self):
+        signal, confidence = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        return signal, confidence
+
+    def analyze(self, market_data):
+        signal, confidence = self._next()
+        return {"signal": signal, "confidence": confidence, "reasoning": ""}
+
+    def debate(self, context, round_history):
+        signal, confidence = self._next()
+        return {"revised_signal": signal, "revised_confidence": confidence, "response": ""}
+
+def make_orchestrator(agents, threshold, max_rounds=4, adaptive=False, rag_engine=None):
+    from orchestrator import Orchestrator
+    from utils.single_flight import SingleFlight
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.agents = agents
+    orchestrator.data_feed = SimpleNamespace(get_market_data=lambda ticker: {"ticker": ticker}, get_news=lambda ticker: [])
+    orchestrator.rag_engine = rag_engine or SimpleNamespace(
+        get_context=lambda ticker, market_data: "", store_experience=lambda *a: None, record_discussion=lambda *a: None)
+    orchestrator.consensus_threshold = threshold
+    orchestrator.max_rounds = max_rounds
+    orchestrator.context_delta = False
+    orchestrator.adaptive_rounds = adaptive
+    orchestrator.parallel = False
+    orchestrator.in_flight = SingleFlight()
+    return orchestrator
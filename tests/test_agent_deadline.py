@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from orchestrator import Orchestrator
+
+def _orchestrator(pool_size, timeout):
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.parallel = True
+    orchestrator.agent_timeout = timeout
+    orchestrator.executor = ThreadPoolExecutor(max_workers=pool_size)
+    return orchestrator
+
+def _agents(*seconds):
+    return [SimpleNamespace(name=f"a{i}", seconds=s) for i, s in enumerate(seconds)]
+
+def _sleep(agent):
+    time.sleep(agent.seconds)
+    return agent.name
+
+def test_time_queued_on_the_shared_pool_does_not_count():
+    orchestrator = _orchestrator(pool_size=1, timeout=0.5)
+    # The second call waits 0.3 s for the only thread, then runs 0.3 s: 0.6 s after submission
+    results = dict((a.name, r) for a, r in orchestrator._iter_agent_results(_sleep, _agents(0.3, 0.3)))
+    assert results == {"a0": "a0", "a1": "a1"}
+
+def test_time_suspended_at_a_yield_does_not_count():
+    orchestrator = _orchestrator(pool_size=2, timeout=0.5)
+    results = {}
+    for agent, result in orchestrator._iter_agent_results(_sleep, _agents(0.05, 0.3)):
+        results[agent.name] = result
+        time.sleep(0.6) # a slow stream consumer
+    assert results == {"a0": "a0", "a1": "a1"}
+
+def test_a_call_running_past_the_deadline_times_out():
+    orchestrator = _orchestrator(pool_size=2, timeout=0.2)
+    start = time.perf_counter()
+    results = dict((a.name, r) for a, r in orchestrator._iter_agent_results(_sleep, _agents(0.05, 2.0)))
+    assert results["a0"] == "a0" and isinstance(results["a1"], TimeoutError)
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,47 @@
+import random
+import pytest
+from backtest.replay import SIGNALS, ReplayEngine
+from debate_stubs import ScriptedAgent, make_orchestrator
+
+NAMES = ["a0", "a1", "a2", "a3"]
+WEIGHTS = [[1.0, 1.0, 1.0, 1.0], [2.0, 1.0, 0.5, 1.0], [0.5, 3.0, 1.0, 0.25]]
+
+def _scripts(seed):
+    rng = random.Random(seed)
+    return [[(rng.choice(SIGNALS), round(rng.uniform(0.3, 1.0), 2)) for _ in range(6)] for _ in NAMES]
+
+def _run(scripts, weights, threshold, max_rounds):
+    agents = [ScriptedAgent(name, w, script) for name, w, script in zip(NAMES, weights, scripts)]
+    return make_orchestrator(agents, threshold, max_rounds=max_rounds).run_debate("SYN")
+
+def _boundary_threshold(scripts, weights):
+    """The initial consensus confidence itself, so `confidence >= threshold` holds with equality."""
+    orchestrator = make_orchestrator([], 0.0)
+    opinions = [{"agent": n, "weight": w, "opinion": {"signal": s[0][0], "confidence": s[0][1]}}
+                for n, w, s in zip(NAMES, weights, scripts)]
+    return orchestrator._calculate_consensus(opinions)[1]
+
+@pytest.mark.parametrize("recorded_threshold", [1.01, 0.55]) # never reached (all rounds recorded), or stopped early
+def test_replay_reproduces_run_debate(recorded_threshold):
+    compared = truncated = 0
+    for seed in range(12):
+        scripts = _scripts(seed)
+        log = _run(scripts, WEIGHTS[0], recorded_threshold, max_rounds=5)
+        engine = ReplayEngine([log], agent_names=NAMES)
+        for weights in WEIGHTS:
+            for threshold in (0.45, 0.6, _boundary_threshold(scripts, weights)):
+                for max_rounds in (1, 3, 5):
+                    live = _run(scripts, weights, threshold, max_rounds)
+                    replay = engine.evaluate(weights=[weights], thresholds=[threshold], max_rounds=[max_rounds])
+                    if replay["truncated"][0, 0]:
+                        # The recorded debate stopped before this setting would have
+                        assert live["rounds"] >= log["rounds"]
+                        truncated += 1
+                        continue
+                    key = (seed, weights, threshold, max_rounds)
+                    assert SIGNALS[replay["decision"][0, 0]] == live["decision"], key
+                    assert replay["confidence"][0, 0] == pytest.approx(live["confidence"], abs=1e-6), key
+                    assert replay["rounds"][0, 0] == live["rounds"], key
+                    compared += 1
+    assert compared
+    assert truncated if recorded_threshold < 1 else not truncated
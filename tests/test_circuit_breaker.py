@@ -0,0 +1,60 @@
+import pytest
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+def _tripped(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+def test_open_circuit_lets_one_probe_through_after_the_reset_timeout(clock):
+    breaker = _tripped(clock)
+    clock[0] += 4.9
+    assert not breaker.allow()
+    clock[0] += 0.1
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only the first caller probes; the rest keep using the fallback
+    assert not breaker.allow()
+    assert breaker.stats()["probes"] == 1
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = _tripped(clock)
+    clock[0] += 5.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    # The failure count was reset: one failure doesn't re-open it
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    stats = breaker.stats()
+    assert stats["trips"] == 1
+    assert stats["open_seconds"] == pytest.approx(5.0)
+
+def test_failed_probe_reopens_the_circuit_for_another_timeout(clock):
+    breaker = _tripped(clock)
+    clock[0] += 5.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock[0] += 4.9
+    assert not breaker.allow()
+    clock[0] += 0.1
+    assert breaker.allow()
+    breaker.record_success()
+    stats = breaker.stats()
+    # Still one outage, spanning both timeouts
+    assert stats["trips"] == 1
+    assert stats["probes"] == 2
+    assert stats["open_seconds"] == pytest.approx(10.0)
@@ -0,0 +1,79 @@
+import pytest
+from types import SimpleNamespace
+from config import Config
+from memory.debate_archive import DebateArchive
+
+@pytest.fixture
+def archive(tmp_path):
+    return DebateArchive(path=str(tmp_path / "archive.db"))
+
+def _pages(archive, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        records, cursor = archive.query(limit=limit, cursor=cursor, **filters)
+        pages.append([r["id"] for r in records])
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 10])
+def test_pages_are_continuous_across_equal_timestamps(archive, limit):
+    # Runs of equal ts straddle every page boundary; 0.1 + 0.2 checks the ts survives the cursor exactly
+    timestamps = [1.0, 1.0, 1.0, 0.1 + 0.2, 0.1 + 0.2, 2.0, 2.0, 2.0, 2.0, 0.5]
+    archive.append_many([{"ticker": "SYN", "decision": "HOLD"} for _ in timestamps], timestamps)
+    everything, cursor = archive.query(limit=len(timestamps))
+    assert cursor is None
+    expected = [r["id"] for r in everything]
+    assert [r["ts"] for r in everything] == sorted(timestamps, reverse=True)
+
+    pages = _pages(archive, limit)
+    assert [i for page in pages for i in page] == expected
+    assert all(len(page) == limit for page in pages[:-1])
+
+def test_rows_archived_between_pages_do_not_shift_the_next_page(archive):
+    archive.append_many([{"ticker": "SYN"}] * 4, [5.0, 5.0, 5.0, 5.0])
+    first, cursor = archive.query(limit=2)
+    # Newer than the cursor, and one tied on ts but with a later id: neither belongs after it
+    archive.append_many([{"ticker": "SYN"}] * 2, [6.0, 5.0])
+    second, cursor = archive.query(limit=2, cursor=cursor)
+    assert [r["id"] for r in first + second] == [4, 3, 2, 1]
+    assert cursor is None
+
+def test_filters_apply_on_every_page(archive):
+    archive.append_many([{"ticker": t} for t in "ABABABAB"], [1.0] * 8)
+    assert [i for page in _pages(archive, 3, ticker="B") for i in page] == [8, 6, 4, 2]
+
+@pytest.mark.parametrize("cursor", ["nan:3", "inf:3", "-inf:3", "1.0:x", "3"])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        DebateArchive.decode_cursor(cursor)
+
+@pytest.fixture
+def history(monkeypatch, archive):
+    monkeypatch.setattr(Config, 'WARM_UP', 'off')
+    monkeypatch.setattr(Config, 'ARCHIVE_ENABLED', True)
+    import app
+    monkeypatch.setattr(app, 'orchestrator', SimpleNamespace(rag_engine=SimpleNamespace(archive=archive)))
+    archive.append_many([{"ticker": "SYN"}] * 3, [1.0, 2.0, 3.0])
+    client = app.app.test_client()
+    return lambda **args: client.get('/history', query_string=args)
+
+@pytest.mark.parametrize("args", [
+    {"since": "nan"}, {"until": "inf"}, {"since": "-inf"}, {"until": "NaN"}, {"since": "yesterday"}
+])
+def test_history_rejects_non_finite_bounds(history, args):
+    response = history(**args)
+    assert response.status_code == 400
+    assert "epoch seconds" in response.get_json()["error"]
+
+@pytest.mark.parametrize("cursor", ["nan:2", "inf:2", "-inf:2"])
+def test_history_rejects_non_finite_cursors(history, cursor):
+    response = history(cursor=cursor)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+def test_history_pages_with_finite_arguments(history):
+    first = history(since="1.5", limit=1).get_json()
+    assert [r["ts"] for r in first["debates"]] == [3.0]
+    second = history(since="1.5", limit=1, cursor=first["next_cursor"]).get_json()
+    assert [r["ts"] for r in second["debates"]] == [2.0]
+    assert second["next_cursor"] is None
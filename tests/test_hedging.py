@@ -0,0 +1,54 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import agents.base as base
+from agents.base import BaseAgent
+from config import Config
+
+class SleepyLLM:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.seconds)
+        return SimpleNamespace(content="{}")
+
+class StubAgent(BaseAgent):
+    def __init__(self, llm):
+        super().__init__("stub", "m", "role", 1.0, 0.0)
+        self._llm, self._llm_created = llm, True
+
+    def analyze(self, market_data):
+        return {}
+
+    def debate(self, context, round_history):
+        return {}
+
+def _hedging(monkeypatch, pool_size):
+    monkeypatch.setattr(Config, 'AGENT_HEDGE_ENABLED', True)
+    monkeypatch.setattr(Config, 'AGENT_HEDGE_MIN_SAMPLES', 0)
+    monkeypatch.setattr(Config, 'AGENT_HEDGE_MIN_DELAY', 0.1)
+    pool = ThreadPoolExecutor(max_workers=pool_size)
+    monkeypatch.setattr(base, '_hedge_pool', pool)
+    return pool
+
+def test_time_queued_on_the_pool_does_not_fire_a_hedge(monkeypatch):
+    pool = _hedging(monkeypatch, 1)
+    agent = StubAgent(SleepyLLM(0.01))
+    agent.latency.record(0.01)
+    busy = threading.Event()
+    pool.submit(busy.wait, 5)
+    threading.Timer(0.3, busy.set).start() # The call waits 0.3 s for the only thread, 3x the delay
+
+    agent._invoke([])
+    assert agent.llm.calls == 1
+
+def test_a_slow_running_call_is_hedged(monkeypatch):
+    _hedging(monkeypatch, 2)
+    agent = StubAgent(SleepyLLM(0.3))
+    agent.latency.record(0.01)
+    agent._invoke([])
+    assert agent.llm.calls == 2
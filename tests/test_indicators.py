@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from data.feed import DataFeed
+from data.indicators import compute_indicators
+from data.replay import ReplayProvider, save_ohlcv
+
+def _bars(n):
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return [(float(t), c, c + 1, c - 1, c, 1000.0) for t, c in enumerate(close)]
+
+@pytest.fixture
+def feed(tmp_path):
+    bars = _bars(200)
+    save_ohlcv(str(tmp_path), "SYN", bars)
+    provider = ReplayProvider(str(tmp_path))
+    return DataFeed(provider, ttl=0), provider, np.array([b[4] for b in bars])
+
+def _expected(close, ts):
+    """Indicators computed from scratch over every bar up to and including ts."""
+    window = close[:int(ts) + 1]
+    series, state = compute_indicators(window + 1, window - 1, window)
+    return state["count"], round(float(series["rsi_14"][0, -1]), 4)
+
+def _observed(feed, provider, ts):
+    provider.set_time(ts)
+    indicators = feed.get_market_data("SYN")["indicators"]
+    return indicators["bars"], indicators["rsi_14"]
+
+def test_rewind_never_shows_later_bars(feed):
+    feed, provider, close = feed
+    _observed(feed, provider, 190)
+    assert _observed(feed, provider, 99) == _expected(close, 99)
+
+def test_clock_jump_steps_through_skipped_bars(feed):
+    feed, provider, close = feed
+    _observed(feed, provider, 50)
+    assert _observed(feed, provider, 150) == _expected(close, 150)
+
+def test_consecutive_bars_and_rereads(feed):
+    feed, provider, close = feed
+    for ts in (10, 11, 11, 12):
+        assert _observed(feed, provider, ts) == _expected(close, ts)
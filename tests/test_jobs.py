@@ -0,0 +1,73 @@
+import socket
+import pytest
+from config import Config
+from jobs import webhook_url_error
+
+def _resolving_to(monkeypatch, *addresses):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET6 if ':' in a else socket.AF_INET, socket.SOCK_STREAM, 6, '', (a, port)) for a in addresses]
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+
+@pytest.mark.parametrize("address", [
+    "127.0.0.1", "10.1.2.3", "192.168.0.5", "169.254.169.254", "100.64.0.1", "::1", "fe80::1%eth0", "::ffff:127.0.0.1"
+])
+def test_webhooks_to_non_public_addresses_are_refused(monkeypatch, address):
+    _resolving_to(monkeypatch, address)
+    assert "non-public" in webhook_url_error("https://hooks.example.com/x")
+
+def test_one_private_address_among_public_ones_is_enough_to_refuse(monkeypatch):
+    _resolving_to(monkeypatch, "93.184.216.34", "10.0.0.1")
+    assert webhook_url_error("https://hooks.example.com/x")
+
+def test_public_webhooks_pass(monkeypatch):
+    _resolving_to(monkeypatch, "93.184.216.34")
+    assert webhook_url_error("https://hooks.example.com:8443/x") is None
+
+def test_allowlist_replaces_the_address_check(monkeypatch):
+    _resolving_to(monkeypatch, "10.0.0.1")
+    monkeypatch.setattr(Config, 'JOB_WEBHOOK_ALLOWED_HOSTS', {"hooks.internal"})
+    assert webhook_url_error("http://HOOKS.internal/x") is None
+    assert "not in" in webhook_url_error("http://other.internal/x")
+
+@pytest.mark.parametrize("url", ["ftp://example.com", "http://", 42])
+def test_malformed_webhooks_are_refused(url):
+    assert webhook_url_error(url)
+
+def test_webhook_delivery_does_not_hold_up_the_debate_workers(monkeypatch):
+    import threading
+    from jobs import JobQueue
+    monkeypatch.setattr(Config, 'JOB_WEBHOOK_WORKERS', 1)
+    orchestrator = type("Orchestrator", (), {"run_debate": lambda self, ticker, max_age=None: {"ticker": ticker}})()
+    queue = JobQueue(orchestrator, workers=1)
+    endpoint_down = threading.Event()
+    monkeypatch.setattr(queue, '_deliver', lambda job: endpoint_down.wait(5) and "delivered (200)")
+
+    first = queue.submit("AAA", webhook_url="https://hooks.example.com/x")
+    second = queue.submit("BBB")
+    queue._queue.join()
+    assert queue.get(second["job_id"])["status"] == "completed"
+    assert queue.get(first["job_id"])["webhook_status"] == "pending"
+
+    endpoint_down.set()
+    queue._webhooks.shutdown(wait=True)
+    assert queue.get(first["job_id"])["webhook_status"] == "delivered (200)"
+    assert queue.stats()["webhooks_pending"] == 0
+
+def test_job_store_connects_to_redis_on_first_use():
+    from jobs import JobStore
+    connects = []
+
+    class FakeRedis:
+        values = {}
+
+        def set_value(self, key, value, ttl):
+            self.values[key] = value
+
+        def get_value(self, key):
+            return self.values.get(key)
+
+    store = JobStore(redis=lambda: connects.append(True) or FakeRedis())
+    assert not connects
+    store.save({"job_id": "j1", "status": "queued"})
+    assert store.get("j1")["status"] == "queued"
+    assert connects == [True]
@@ -0,0 +1,24 @@
+import time
+from utils.metrics import StageTimer
+
+class RecordingHistogram:
+    def __init__(self):
+        self.observed = []
+
+    def observe(self, value, **labels):
+        self.observed.append((labels["stage"], value))
+
+def test_paused_blocks_are_left_out_of_running_stages():
+    histogram = RecordingHistogram()
+    timer = StageTimer(histogram)
+    with timer.stage("outer"):
+        with timer.stage("inner"):
+            time.sleep(0.02)
+            with timer.paused():
+                time.sleep(0.2) # e.g. a slow consumer of a yielded event
+        with timer.paused():
+            time.sleep(0.2)
+
+    assert 0.02 <= timer.timings["inner"] < 0.1
+    assert 0.02 <= timer.timings["outer"] < 0.1
+    assert [stage for stage, _ in histogram.observed] == ["inner", "outer"]
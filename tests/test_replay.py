@@ -0,0 +1,16 @@
+import pytest
+from data.replay import ReplayProvider, save_ohlcv
+
+@pytest.mark.parametrize("ticker", ["../SECRET", "..", "A/B", "/etc/passwd", "A\\B", "aapl", "", None])
+def test_tickers_that_could_leave_the_data_directory_are_refused(tmp_path, ticker):
+    data_dir = tmp_path / "replay"
+    data_dir.mkdir()
+    save_ohlcv(str(tmp_path), "SECRET", [(0.0, 1.0, 1.0, 1.0, 1.0, 1.0)])
+    provider = ReplayProvider(str(data_dir))
+    with pytest.raises(ValueError, match="Invalid ticker"):
+        provider.get_market_data(ticker)
+
+@pytest.mark.parametrize("ticker", ["BTC-USD", "^GSPC", "EURUSD=X", "BRK.B"])
+def test_usual_symbols_are_accepted(tmp_path, ticker):
+    save_ohlcv(str(tmp_path), ticker, [(0.0, 1.0, 2.0, 0.5, 1.5, 10.0)])
+    assert ReplayProvider(str(tmp_path)).get_market_data(ticker)["price"] == 1.5
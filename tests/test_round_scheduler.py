@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+from debate_stubs import ScriptedAgent, make_orchestrator
+from round_scheduler import AdaptiveRoundScheduler
+
+def _agent(name, weight, active=True):
+    return SimpleNamespace(name=name, weight=weight, is_active=active)
+
+def _opinion(agent, signal, confidence):
+    return {"agent": agent.name, "weight": agent.weight, "opinion": {"signal": signal, "confidence": confidence}}
+
+def _scheduler(threshold, settle=False):
+    return AdaptiveRoundScheduler(threshold, settle_tolerance=0.05, settle_confidence=0.95, settle=settle)
+
+def test_stops_when_the_frozen_leader_always_reaches_consensus():
+    fixed, mobile = _agent("fixed", 3, active=False), _agent("mobile", 1)
+    opinions = [_opinion(fixed, "BUY", 1.0), _opinion(mobile, "SELL", 0.5)]
+    # BUY 3 beats any rival's 0 + 1, and 3 / 4 >= 0.6 whatever the mobile agent says
+    assert _scheduler(0.6).plan([fixed, mobile], opinions) == ([], "decided")
+
+def test_stops_when_consensus_is_out_of_reach():
+    fixed, mobile = _agent("fixed", 3, active=False), _agent("mobile", 1)
+    opinions = [_opinion(fixed, "BUY", 0.5), _opinion(mobile, "SELL", 0.5)]
+    # Locked (1.5 > 0 + 1), and even 1.5 + 1 is only 0.625 of the weight
+    assert _scheduler(0.9).plan([fixed, mobile], opinions) == ([], "decided")
+
+def test_continues_when_locked_but_consensus_is_open():
+    fixed, mobile = _agent("fixed", 3, active=False), _agent("mobile", 1)
+    opinions = [_opinion(fixed, "BUY", 0.7), _opinion(mobile, "SELL", 0.5)]
+    # 2.1 / 4 < 0.7 now, but 3.1 / 4 >= 0.7 if the mobile agent joins BUY
+    assert _scheduler(0.7).plan([fixed, mobile], opinions) == ([mobile], None)
+
+def test_continues_when_the_mobile_weight_can_overturn_the_leader():
+    fixed, mobile = _agent("fixed", 1, active=False), _agent("mobile", 2)
+    opinions = [_opinion(fixed, "BUY", 1.0), _opinion(mobile, "SELL", 0.1)]
+    assert _scheduler(0.6).plan([fixed, mobile], opinions) == ([mobile], None)
+
+def test_exact_mode_never_freezes_active_agents():
+    a, b = _agent("a", 1), _agent("b", 1)
+    scheduler = _scheduler(0.9)
+    opinions = [_opinion(a, "BUY", 0.99), _opinion(b, "SELL", 0.6)]
+    scheduler.observe(opinions)
+    scheduler.observe(opinions)
+    assert scheduler.plan([a, b], opinions) == ([a, b], None)
+
+def test_repeated_opinions_settle_and_unanswered_rounds_do_not():
+    a, b = _agent("a", 1), _agent("b", 1)
+    scheduler = _scheduler(0.9, settle=True)
+    first = [_opinion(a, "BUY", 0.6), _opinion(b, "SELL", 0.6)]
+    scheduler.observe(first)
+    # b failed the next round: only a's reply is observed, b keeps its carried-over opinion
+    scheduler.observe([_opinion(a, "BUY", 0.62)])
+    assert scheduler.plan([a, b], first) == ([b], None)
+
+    scheduler.observe([_opinion(b, "SELL", 0.6)])
+    assert scheduler.plan([a, b], first) == ([], "settled")
+
+def _debate(agents, threshold, adaptive):
+    return make_orchestrator(agents, threshold, adaptive=adaptive).run_debate("SYN")
+
+def test_exact_mode_matches_the_full_debate(monkeypatch):
+    import random
+    from config import Config
+    monkeypatch.setattr(Config, 'DEBATE_SETTLE', False)
+    for seed in range(60):
+        rng = random.Random(seed)
+        specs = [
+            (f"a{i}", rng.choice([0.5, 1.0, 2.0, 4.0]),
+             [(rng.choice(("BUY", "SELL", "HOLD")), round(rng.random(), 2)) for _ in range(5)],
+             rng.random() < 0.6)
+            for i in range(5)
+        ]
+        threshold = rng.choice([0.3, 0.5, 0.7])
+        full = _debate([ScriptedAgent(*spec) for spec in specs], threshold, adaptive=False)
+        agents = [ScriptedAgent(*spec) for spec in specs]
+        exact = _debate(agents, threshold, adaptive=True)
+        assert exact["decision"] == full["decision"], seed
+        assert (exact["confidence"] >= threshold) == (full["confidence"] >= threshold), seed
+        # Only the initial analysis reaches inactive agents; their fixed reply is reused after it
+        assert all(agent.calls == 1 for agent in agents if not agent.is_active), seed
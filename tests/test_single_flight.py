@@ -0,0 +1,55 @@
+import threading
+import pytest
+from config import Config
+from debate_stubs import ScriptedAgent, make_orchestrator
+
+class GatedAgent(ScriptedAgent):
+    """Holds its first analysis until the test opens the gate, so callers pile up behind it."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = threading.Event()
+
+    def analyze(self, market_data):
+        assert self.gate.wait(5)
+        return super().analyze(market_data)
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(Config, 'WARM_UP', 'off')
+    import app
+    agent = GatedAgent("a", 1.0, [("BUY", 0.9)])
+    orchestrator = make_orchestrator([agent], 0.5, max_rounds=1)
+    monkeypatch.setattr(app, 'orchestrator', orchestrator)
+    return app.app, orchestrator, agent
+
+def test_concurrent_identical_analyze_calls_share_one_debate(client):
+    flask_app, orchestrator, agent = client
+    callers = 4
+    responses = [None] * callers
+
+    def post(i):
+        responses[i] = flask_app.test_client().post('/analyze', json={"ticker": "syn"})
+
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for _ in range(500):
+        if orchestrator.in_flight.stats()["coalesced"] == callers - 1:
+            break
+        threading.Event().wait(0.01)
+    agent.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert [r.status_code for r in responses] == [200] * callers
+    assert len({r.get_data() for r in responses}) == 1
+    assert agent.calls == 1
+    assert orchestrator.in_flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": callers - 1}
+
+def test_the_key_is_released_once_the_debate_finishes(client):
+    flask_app, orchestrator, agent = client
+    agent.gate.set()
+    for _ in range(2):
+        assert flask_app.test_client().post('/analyze', json={"ticker": "SYN"}).status_code == 200
+    assert agent.calls == 2
+    assert orchestrator.in_flight.stats()["executions"] == 2
@@ -0,0 +1,202 @@
+import atexit
+import faiss
+import os
+import threading
+import time
+import numpy as np
+import pytest
+from config import Config
+from memory.index_factory import MappedFlatIndex
+from memory.metadata_store import MetadataStore
+from memory.vector_store import VectorStore
+
+DIM = 8
+
+@pytest.fixture
+def open_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'VECTOR_DB_PATH', str(tmp_path / "store.index"))
+    monkeypatch.setattr(Config, 'EMBEDDING_DIM', DIM)
+    monkeypatch.setattr(Config, 'VECTOR_FLUSH_INTERVAL', 0)
+    monkeypatch.setattr(Config, 'VECTOR_FLUSH_BATCH', 1000)
+    monkeypatch.setattr(Config, 'VECTOR_MULTIPROCESS', False)
+    stores = []
+
+    def open_store(**overrides):
+        for name, value in overrides.items():
+            monkeypatch.setattr(Config, name, value)
+        store = VectorStore()
+        stores.append(store)
+        return store
+
+    yield open_store
+    for store in stores:
+        atexit.unregister(store.flush)
+
+def _vector(i):
+    return np.full(DIM, float(i), dtype='float32')
+
+def _contexts(store):
+    return [store.get_metadata(i) for i in range(store.ntotal)]
+
+def test_unflushed_memories_are_replayed_after_a_crash(open_store):
+    store = open_store()
+    for i in range(5):
+        store.add_memory(_vector(i), f"m{i}", ticker="AAA", timestamp=float(i))
+    # No flush: the journal is all that survives
+    reopened = open_store()
+    assert _contexts(reopened) == [f"m{i}" for i in range(5)]
+    assert reopened.search_memory(_vector(3), k=1, ticker="AAA")[0]["context"] == "m3"
+
+def test_torn_tail_record_is_truncated(open_store):
+    store = open_store()
+    for i in range(3):
+        store.add_memory(_vector(i), f"m{i}")
+    valid_size = os.path.getsize(store.journal_path)
+    with open(store.journal_path, 'ab') as f:
+        f.write(b"\x07" * 11) # a record header cut short by a crash
+
+    reopened = open_store()
+    assert _contexts(reopened) == ["m0", "m1", "m2"]
+    assert os.path.getsize(reopened.journal_path) == valid_size
+    reopened.add_memory(_vector(3), "m3")
+    assert _contexts(open_store()) == ["m0", "m1", "m2", "m3"]
+
+def test_corrupt_record_ends_the_replay(open_store):
+    store = open_store()
+    for i in range(3):
+        store.add_memory(_vector(i), f"m{i}")
+    with open(store.journal_path, 'r+b') as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b"!!") # CRC mismatch in the last record
+    assert _contexts(open_store()) == ["m0", "m1"]
+
+def test_records_already_compacted_are_skipped(open_store):
+    store = open_store()
+    for i in range(3):
+        store.add_memory(_vector(i), f"m{i}")
+    with open(store.journal_path, 'rb') as f:
+        journal = f.read()
+    store.flush()
+    # Crash between compaction and journal truncation: the old records are still there
+    with open(store.journal_path, 'wb') as f:
+        f.write(journal)
+
+    reopened = open_store()
+    assert _contexts(reopened) == ["m0", "m1", "m2"]
+    reopened.add_memory(_vector(3), "m3")
+    assert _contexts(open_store()) == ["m0", "m1", "m2", "m3"]
+
+def test_compaction_runs_on_the_flusher_thread(open_store):
+    store = open_store(VECTOR_FLUSH_BATCH=4)
+    threads = []
+    save_index = store._save_index
+
+    def recording_save_index():
+        threads.append(threading.current_thread().name)
+        save_index()
+
+    store._save_index = recording_save_index
+    for i in range(10):
+        store.add_memory(_vector(i), f"m{i}")
+    deadline = time.time() + 5
+    while len(store._delta) >= 4 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert threads and set(threads) == {"vector-flush"}
+    assert _contexts(store) == [f"m{i}" for i in range(10)]
+
+def test_flat_compaction_appends_without_writing_the_index(open_store):
+    store = open_store()
+    for i in range(10):
+        store.add_memory(_vector(i), f"m{i}", ticker="AAA", timestamp=float(i))
+    store.flush()
+    assert store.index.ntotal == 10 and not len(store._delta)
+    # The raw vector file holds a Flat index exactly, so there is no index file to rewrite
+    assert not os.path.exists(store.index_path)
+
+    reopened = open_store()
+    assert reopened.index.ntotal == 10
+    assert _contexts(reopened) == [f"m{i}" for i in range(10)]
+    assert reopened.search_memory(_vector(7), k=1, ticker="AAA")[0]["context"] == "m7"
+    assert reopened.search_memory(_vector(2), k=1)[0]["context"] == "m2"
+
+def test_flat_base_is_searched_over_the_mapped_raw_vectors(open_store):
+    store = open_store()
+    store.add_memories(np.stack([_vector(i) for i in range(20)]), [f"m{i}" for i in range(20)])
+    store.flush()
+    reopened = open_store()
+    # No copy of the vectors in RAM: searches read the raw vector file's memory map
+    assert isinstance(reopened.index, MappedFlatIndex)
+    assert isinstance(reopened.vectors.array, np.memmap)
+    assert [r["context"] for r in reopened.search_memory(_vector(11), k=2)] == ["m11", "m10"]
+
+def test_legacy_flat_index_files_are_migrated_to_the_raw_vectors(open_store, tmp_path):
+    legacy = faiss.IndexFlatL2(DIM)
+    legacy.add(np.stack([_vector(i) for i in range(5)]))
+    faiss.write_index(legacy, str(tmp_path / "store.index"))
+    MetadataStore(str(tmp_path / "store.index.meta")).append_many([f"m{i}" for i in range(5)])
+
+    store = open_store()
+    assert not os.path.exists(store.index_path) and len(store.vectors) == 5
+    assert store.search_memory(_vector(3), k=1)[0]["context"] == "m3"
+
+def test_ann_checkpoints_are_geometric_and_rows_after_them_are_reloaded(open_store):
+    store = open_store(VECTOR_CHECKPOINT_GROWTH=2.0)
+    store.add_memories(np.stack([_vector(i) for i in range(40)]), [f"m{i}" for i in range(40)])
+    store.flush()
+    store.rebuild_index('hnsw', background=False)
+    assert store._checkpoint_ntotal == 40
+
+    store.add_memories(np.stack([_vector(i) for i in range(40, 60)]), [f"m{i}" for i in range(40, 60)])
+    store.flush()
+    assert store._checkpoint_ntotal == 40 # 60 < 2 x 40: no rewrite yet
+    reopened = open_store(VECTOR_CHECKPOINT_GROWTH=2.0)
+    assert reopened.index.ntotal == 60
+    assert reopened.search_memory(_vector(55), k=1)[0]["context"] == "m55"
+
+    store.add_memories(np.stack([_vector(i) for i in range(60, 80)]), [f"m{i}" for i in range(60, 80)])
+    store.flush()
+    assert store._checkpoint_ntotal == 80
+
+def test_other_processes_add_compactions_in_place_and_reread_only_swaps(open_store):
+    writer = open_store(VECTOR_MULTIPROCESS=True, VECTOR_REFRESH_INTERVAL=0)
+    reader = open_store()
+    reads = []
+    read_index = reader._read_index
+
+    def recording_read_index():
+        reads.append(True)
+        return read_index()
+
+    reader._read_index = recording_read_index
+    writer.add_memories(np.stack([_vector(i) for i in range(40)]), [f"m{i}" for i in range(40)])
+    writer.flush()
+    assert reader.search_memory(_vector(7), k=1)[0]["context"] == "m7"
+    assert reader.index.ntotal == 40 and not len(reader._delta) and not reads
+
+    writer.rebuild_index('hnsw', background=False)
+    writer.add_memories(np.stack([_vector(i) for i in range(40, 50)]), [f"m{i}" for i in range(40, 50)])
+    writer.flush()
+    assert reader.search_memory(_vector(45), k=1)[0]["context"] == "m45"
+    assert len(reads) == 1 and reader.index.ntotal == 50
+
+def test_a_compaction_interrupted_in_another_worker_is_completed_not_duplicated(open_store):
+    dead = open_store(VECTOR_MULTIPROCESS=True, VECTOR_REFRESH_INTERVAL=0)
+    survivor = open_store()
+    dead.add_memories(np.stack([_vector(i) for i in range(2)]), ["m0", "m1"], tickers=["AAA", "AAA"], timestamps=[0.0, 1.0])
+    # The worker is killed mid-compaction: metadata and keys are written, then a torn
+    # record, and neither the raw vectors nor the version file are
+    dead.metadata.append_many(dead._delta_meta)
+    dead.partitions.append_many(dead._delta_keys)
+    with open(dead.metadata.blob_path, 'ab') as f:
+        f.write(b'"torn')
+    with open(dead.partitions.keys_path, 'ab') as f:
+        f.write(b"\x01\x02\x03")
+
+    survivor.add_memories(np.stack([_vector(i) for i in range(2, 4)]), ["m2", "m3"], tickers=["AAA", "BBB"], timestamps=[2.0, 3.0])
+    survivor.flush()
+    for store in (survivor, open_store()):
+        assert store.ntotal == len(store.metadata) == len(store.partitions) == len(store.vectors) == 4
+        assert _contexts(store) == ["m0", "m1", "m2", "m3"]
+        assert store.partitions.tickers == ["AAA", "BBB"]
+        assert [r["context"] for r in store.search_memory(_vector(1), k=3, ticker="AAA")] == ["m1", "m0", "m2"]
@@ -0,0 +1,73 @@
+import threading
+import time
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    While open, calls are refused until `reset_timeout` seconds have passed; then
+    a single half-open probe is let through. A successful probe closes the
+    circuit, a failed one re-opens it for another `reset_timeout`.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=5.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None # Start of the current outage
+        self._retry_at = 0.0
+        self.trips = 0
+        self.probes = 0
+        self.open_seconds = 0.0 # Total time spent open/half-open in completed outages
+
+    def allow(self):
+        """Returns True if the protected call may be attempted now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self._retry_at:
+                # Exactly one caller gets to probe
+                self.state = self.HALF_OPEN
+                self.probes += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                self.open_seconds += time.monotonic() - self._opened_at
+                self._opened_at = None
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self):
+        """Opens the circuit immediately (e.g. when the initial connection fails)."""
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        if self.state == self.CLOSED:
+            self.trips += 1
+            self._opened_at = time.monotonic()
+        self.state = self.OPEN
+        self._retry_at = time.monotonic() + self.reset_timeout
+
+    def stats(self):
+        with self._lock:
+            current = time.monotonic() - self._opened_at if self._opened_at is not None else 0.0
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "probes": self.probes,
+                "open_seconds": self.open_seconds + current
+            }
@@ -0,0 +1,29 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class PausableClock:
+    """
+    Monotonic seconds that stand still inside paused() blocks, e.g. while a
+    generator is suspended at a yield. Safe to read from other threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._offset = 0.0 # Seconds spent paused so far
+        self._paused_at = None
+
+    def now(self):
+        with self._lock:
+            current = self._paused_at if self._paused_at is not None else time.monotonic()
+            return current - self._offset
+
+    @contextmanager
+    def paused(self):
+        with self._lock:
+            self._paused_at = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._offset += time.monotonic() - self._paused_at
+                self._paused_at = None
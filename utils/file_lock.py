@@ -0,0 +1,53 @@
+import fcntl
+import os
+from contextlib import contextmanager
+
+class FileLock:
+    """
+    Advisory lock shared between processes (fcntl.flock on `path`).
+    Reentrant within a process: nested holds reuse the outer one, and a
+    shared hold nested in an exclusive one is already covered. flock locks
+    belong to the open file, not the thread, so callers must serialize their
+    own threads around it (VectorStore does this with its RLock).
+    """
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._pid = None
+        self._depth = 0
+        self._exclusive = False
+
+    @contextmanager
+    def hold(self, exclusive=True, blocking=True):
+        """
+        Holds the lock for the duration of the block and yields True, or
+        yields False right away when `blocking` is off and another process
+        has it.
+        """
+        if self._depth:
+            if exclusive and not self._exclusive:
+                raise RuntimeError(f"Cannot upgrade the shared lock on {self.path}")
+            self._depth += 1
+            try:
+                yield True
+            finally:
+                self._depth -= 1
+            return
+
+        if self._fd is None or self._pid != os.getpid():
+            # A forked worker opens its own file: flock treats processes sharing an open file as one holder
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        try:
+            fcntl.flock(self._fd, flags if blocking else flags | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        self._depth, self._exclusive = 1, exclusive
+        try:
+            yield True
+        finally:
+            self._depth, self._exclusive = 0, False
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
@@ -0,0 +1,36 @@
+import threading
+from collections import deque
+import numpy as np
+
+class LatencyTracker:
+    """
+    Rolling window of the most recent call latencies (seconds), used to
+    derive hedge delays from an agent's own tail latency.
+    """
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, p):
+        """The p-th percentile of the window, or None while it is empty."""
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return None
+        return float(np.percentile(samples, p))
+
+    def stats(self):
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {"count": len(samples), "p50": round(float(p50), 4), "p95": round(float(p95), 4), "p99": round(float(p99), 4)}
@@ -0,0 +1,78 @@
+import queue
+import threading
+import time
+import numpy as np
+
+class _Request:
+    def __init__(self, row):
+        self.row = row
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """
+    Groups single-row calls from concurrent threads into one batched call.
+    `fn` maps an (n, features) array to an (n, ...) array. The first request
+    opens a batch that collects further requests for up to `window` seconds
+    (or until `max_batch` rows), then one worker thread runs fn over all of
+    them and hands each caller its row. A lone caller pays at most `window`.
+    """
+    def __init__(self, fn, max_batch=64, window=0.002, name="micro-batch"):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.window = window
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, row):
+        """Runs fn on `row` as part of a batch and returns its result row."""
+        request = _Request(np.asarray(row))
+        self._ensure_worker()
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                results = self.fn(np.stack([r.row for r in batch]))
+                for request, result in zip(batch, results):
+                    request.result = result
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            self.batches += 1
+            self.rows += len(batch)
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch": round(self.rows / self.batches, 2) if self.batches else None
+        }